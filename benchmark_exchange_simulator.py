@@ -0,0 +1,54 @@
+import argparse
+import logging
+import time
+import numpy as np
+from connection.exchange_simulator import ExchangeSimulator
+from connection.synthetic_market import SyntheticMarket
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+def _rate(count, started):
+    return count / (time.perf_counter() - started)
+
+def benchmark(orders: int, symbols: int):
+    universe = SyntheticMarket(model='regime').generate_universe(symbols, max(orders // symbols, 1) + 1)
+    names = universe['symbols'].tolist()
+    closes = universe['close']
+    simulator = ExchangeSimulator(price_source=lambda symbol: closes[names.index(symbol), 0])
+    rng = np.random.default_rng(7)
+    picks = rng.integers(0, symbols, orders).tolist()
+    offsets = rng.uniform(0.98, 1.02, orders).tolist()
+    sides = ['buy' if flag else 'sell' for flag in (rng.random(orders) < 0.5).tolist()]
+
+    started = time.perf_counter()
+    for i in range(orders):
+        simulator.create_order(names[picks[i]], 'market', sides[i], 1.0)
+    logging.info(f"market orders:          {_rate(orders, started):>12,.0f} orders/s")
+
+    started = time.perf_counter()
+    ids = []
+    for i in range(orders):
+        symbol = names[picks[i]]
+        price = closes[picks[i], 0] * offsets[i]
+        ids.append(simulator.create_order(symbol, 'limit', sides[i], 1.0, price)['id'])
+    logging.info(f"limit orders:           {_rate(orders, started):>12,.0f} orders/s")
+
+    started = time.perf_counter()
+    bars = closes.shape[1]
+    for bar in range(1, bars):
+        for index, symbol in enumerate(names):
+            simulator.update_price(symbol, closes[index, bar], volume=5.0)
+    logging.info(f"price ticks:            {_rate((bars - 1) * symbols, started):>12,.0f} ticks/s")
+
+    started = time.perf_counter()
+    for order_id in ids:
+        simulator.cancel_order(order_id)
+    logging.info(f"cancels:                {_rate(orders, started):>12,.0f} orders/s")
+    logging.info(f"stats: {simulator.stats}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exchange simulator throughput benchmark")
+    parser.add_argument('--orders', type=int, default=200_000)
+    parser.add_argument('--symbols', type=int, default=50)
+    args = parser.parse_args()
+    benchmark(args.orders, args.symbols)
@@ -0,0 +1,44 @@
+import argparse
+import logging
+import time
+from data.trend import analyze_trend
+from test_market_trend import THRESHOLDS, loop_market_trend, random_indicators
+
+logging.basicConfig(level=logging.INFO, format='%(message)s', force=True)
+
+def _time(fn, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        frame = df.copy()
+        started = time.perf_counter()
+        fn(frame, THRESHOLDS)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def benchmark(sizes, loop_limit: int):
+    loop_per_row = None
+    for rows in sizes:
+        df = random_indicators(rows)
+        repeat = 5 if rows <= 10_000 else 1
+        vectorized = _time(analyze_trend, df, repeat)
+
+        if rows <= loop_limit:
+            loop = _time(loop_market_trend, df, 1)
+            loop_per_row = loop / rows
+            note = ''
+        else:
+            # The loop is linear in rows; extrapolate from the largest measured size
+            loop = loop_per_row * rows
+            note = ' (loop extrapolated)'
+        logging.info(
+            f"{rows:>9,} rows: loop {loop * 1000:>11,.1f} ms  vectorized {vectorized * 1000:>8,.2f} ms"
+            f"  speedup {loop / vectorized:>9,.0f}x{note}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DataCollector.analyze_market_trend loop vs vectorized")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 10_000, 1_000_000])
+    parser.add_argument('--loop-limit', type=int, default=10_000,
+                        help='Largest size timed with the row loop; larger sizes are extrapolated')
+    args = parser.parse_args()
+    benchmark(args.sizes, args.loop_limit)
@@ -0,0 +1,49 @@
+import argparse
+import logging
+import time
+import numpy as np
+import pandas as pd
+from connection.synthetic_market import SyntheticMarket, to_ohlcv_rows
+from data.indicator_cache import compute_indicators
+from data.panel import MarketPanel
+from data.trend import analyze_trend
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+THRESHOLDS = {'strong_uptrend': 0.8, 'uptrend': 0.6, 'sideways': 0.4, 'downtrend': 0.3}
+
+def per_symbol(ohlcv):
+    """The current path: one DataFrame and one pandas_ta pass per symbol"""
+    for rows in ohlcv.values():
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df.index = pd.to_datetime(df.pop('timestamp'), unit='ms')
+        df = df.join(compute_indicators(df))
+        analyze_trend(df, THRESHOLDS)
+
+def panel(ohlcv):
+    market_panel = MarketPanel.from_ohlcv(ohlcv)
+    market_panel.compute_indicators()
+    market_panel.analyze_trend(THRESHOLDS)
+
+def benchmark(symbols: int, bars: int):
+    universe = SyntheticMarket(model='regime').generate_universe(symbols, bars)
+    ohlcv = {
+        symbol: to_ohlcv_rows(universe['timestamp'], universe, index)
+        for index, symbol in enumerate(universe['symbols'].tolist())
+    }
+
+    timings = {}
+    for name, fn in (('per-symbol DataFrames', per_symbol), ('panel', panel)):
+        started = time.perf_counter()
+        fn(ohlcv)
+        timings[name] = time.perf_counter() - started
+        logging.info(f"{name:<22} {timings[name] * 1000:>9,.1f} ms")
+    logging.info(f"speedup: {timings['per-symbol DataFrames'] / timings['panel']:.1f}x "
+                 f"({symbols} symbols x {bars} bars)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-symbol DataFrame indicators vs MarketPanel")
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--bars', type=int, default=500)
+    args = parser.parse_args()
+    benchmark(args.symbols, args.bars)
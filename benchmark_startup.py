@@ -0,0 +1,71 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+HEAVY_MODULES = ['ccxt', 'pandas', 'pandas_ta', 'sklearn', 'nltk', 'textblob', 'streamlit', 'plotly', 'pymongo']
+
+# Modules each entry point imports before it can request its first candle
+TRADE_MODULES = [
+    'connection.binance_client', 'data.data_collector', 'analysis.technical_analyzer',
+    'analysis.ml_analyzer', 'analysis.news_analyzer', 'trading.strategy',
+    'trading.advanced_strategies', 'trading.trade_manager', 'database.models'
+]
+SCENARIOS = {
+    'import main': ['main'],
+    'trade': ['main'] + TRADE_MODULES,
+    'collect': ['main', 'connection.binance_client', 'data.data_collector', 'database.models'],
+    'backtest': ['main', 'connection.binance_client', 'data.candle_store', 'data.data_collector'],
+    'dashboard': ['main'] + TRADE_MODULES + ['visualization.dashboard'],
+    # What every run paid before: main imported all of this at module level
+    'eager (before)': TRADE_MODULES + ['visualization.dashboard'],
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+error = None
+for name in {modules!r}:
+    try:
+        __import__(name)
+    except Exception as e:
+        error = f"{{name}}: {{type(e).__name__}}: {{e}}"
+        break
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'error': error,
+                  'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def probe(modules, repeat: int) -> dict:
+    """Import `modules` in fresh interpreters and keep the fastest run"""
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(modules=modules, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, env=env, cwd=SRC_DIR
+        )
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+def benchmark(scenarios, repeat: int):
+    for name in scenarios:
+        result = probe(SCENARIOS[name], repeat)
+        line = f"{name:>15}: {result['seconds'] * 1000:>8,.1f} ms  heavy: {', '.join(result['heavy']) or '-'}"
+        if result['error']:
+            line += f"  (stopped at {result['error']})"
+        logging.info(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold import time per entry point")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per scenario; best is reported')
+    args = parser.parse_args()
+    benchmark(args.scenarios, args.repeat)
@@ -0,0 +1,119 @@
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from config import Config
+from database.backends import MemoryBackend, MongoBackend, SQLiteBackend
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+START = datetime(2024, 1, 1)
+BENCHMARK_DATABASE = 'crypto_trading_benchmark'
+
+def make_candles(symbols, count: int):
+    """Candle documents shaped like DataCollector output (OHLCV plus indicator columns)"""
+    candles = []
+    for s, symbol in enumerate(symbols):
+        for i in range(count):
+            close = 100.0 + s + (i % 50) * 0.1
+            candles.append({
+                'symbol': symbol, 'timeframe': '1h', 'timestamp': START + timedelta(hours=i),
+                'open': close - 0.05, 'high': close + 0.2, 'low': close - 0.2, 'close': close,
+                'volume': 1000.0 + i, 'RSI': 50.0, 'MACD_12_26_9': 0.1, 'MACDs_12_26_9': 0.05,
+                'BBL_20_2.0': close - 1.0, 'BBM_20_2.0': close, 'BBU_20_2.0': close + 1.0,
+                'SMA_20': close, 'EMA_50': close, 'ATRr_14': 0.4
+            })
+    return candles
+
+def open_backend(name: str, args):
+    if name == 'memory':
+        return MemoryBackend(candle_retention=args.candles, document_retention=args.trades)
+    if name == 'sqlite':
+        return SQLiteBackend(os.path.join(args.workdir, 'benchmark.db'))
+    # Start from an empty scratch database; never the bot's own
+    backend = MongoBackend(args.mongo_url, database=BENCHMARK_DATABASE)
+    backend.client.drop_database(BENCHMARK_DATABASE)
+    backend.close()
+    return MongoBackend(args.mongo_url, database=BENCHMARK_DATABASE)
+
+def timed(function, repeat: int):
+    """Per-call latencies in milliseconds"""
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        function(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def report(label: str, samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    logging.info(f"  {label:<28} p50 {statistics.median(samples):>8.3f} ms   p99 {p99:>8.3f} ms")
+
+def benchmark(name: str, args):
+    try:
+        backend = open_backend(name, args)
+    except Exception as e:
+        logging.info(f"{name}: skipped ({type(e).__name__}: {str(e).splitlines()[0][:100]})")
+        return
+
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    candles = make_candles(symbols, args.candles)
+    logging.info(f"{name}:")
+    try:
+        # Write-behind flushes hand the backend batches of DB_BATCH_SIZE
+        started = time.perf_counter()
+        for i in range(0, len(candles), args.batch_size):
+            backend.upsert_candles(candles[i:i + args.batch_size])
+        elapsed = time.perf_counter() - started
+        logging.info(f"  {'candle upserts':<28} {len(candles) / elapsed:>12,.0f} candles/s")
+
+        backend.upsert_latest_indicators([
+            {'symbol': symbol, 'timeframe': '1h', 'timestamp': START + timedelta(hours=args.candles),
+             'technical_indicators': {'trend': {'direction': 'UPTREND', 'strength': 0.5}}}
+            for symbol in symbols
+        ])
+
+        # Trades are written one at a time and synchronously, like save_trade
+        trade_times = [START + timedelta(minutes=i) for i in range(args.trades)]
+        samples = timed(lambda i: backend.insert('trades', [
+            {'timestamp': trade_times[i], 'symbol': symbols[i % len(symbols)], 'side': 'BUY',
+             'price': 100.0, 'quantity': 1.0, 'total': 100.0, 'status': 'FILLED'}
+        ]), args.trades)
+        logging.info(f"  {'trade inserts':<28} {len(samples) / (sum(samples) / 1000):>12,.0f} trades/s")
+
+        pick = lambda i: symbols[i % len(symbols)]
+        report('last_candle_timestamp', timed(lambda i: backend.last_candle_timestamp(pick(i), '1h'), args.queries))
+        report('recent_candles(100, 1h)', timed(lambda i: backend.recent_candles(pick(i), 100, '1h'), args.queries))
+        report('recent_candles(100, all)', timed(lambda i: backend.recent_candles(pick(i), 100), args.queries))
+        report('latest_indicators', timed(lambda i: backend.latest_indicators(pick(i)), args.queries))
+        window = timedelta(hours=1)
+        report('trades range (1h window)', timed(
+            lambda i: backend.find_range('trades', trade_times[i % len(trade_times)],
+                                         trade_times[i % len(trade_times)] + window),
+            args.queries
+        ))
+    finally:
+        if name == 'mongodb':
+            backend.client.drop_database(BENCHMARK_DATABASE)
+        backend.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Storage backend write throughput and query latency")
+    parser.add_argument('--backends', nargs='+', choices=['memory', 'sqlite', 'mongodb'],
+                        default=['memory', 'sqlite', 'mongodb'])
+    parser.add_argument('--symbols', type=int, default=10)
+    parser.add_argument('--candles', type=int, default=5000, help='Candles per symbol')
+    parser.add_argument('--trades', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=1000, help='Calls per query type')
+    parser.add_argument('--batch-size', type=int, default=Config.DB_BATCH_SIZE)
+    parser.add_argument('--mongo-url', default=os.getenv('MONGODB_URL', 'mongodb://localhost:27017/?serverSelectionTimeoutMS=2000'))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        args.workdir = workdir
+        for name in args.backends:
+            benchmark(name, args)
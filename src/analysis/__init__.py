@@ -1,14 +1,13 @@
 """Initialize analysis package"""
-from .enhanced_news_analyzer import EnhancedNewsAnalyzer
-from .advanced_indicators import AdvancedIndicators
-from .technical_analyzer import TechnicalAnalyzer
-from .ml_analyzer import MLAnalyzer
-from .news_analyzer import NewsAnalyzer
+from lazy_exports import lazy_exports
 
-__all__ = [
-    'EnhancedNewsAnalyzer',
-    'AdvancedIndicators',
-    'TechnicalAnalyzer',
-    'MLAnalyzer',
-    'NewsAnalyzer'
-]
\ No newline at end of file
+_EXPORTS = {
+    'EnhancedNewsAnalyzer': '.enhanced_news_analyzer',
+    'AdvancedIndicators': '.advanced_indicators',
+    'TechnicalAnalyzer': '.technical_analyzer',
+    'MLAnalyzer': '.ml_analyzer',
+    'NewsAnalyzer': '.news_analyzer'
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
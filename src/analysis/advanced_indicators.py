@@ -1,11 +1,19 @@
 import pandas as pd
-import pandas_ta as ta
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 import logging
+from data.indicator_cache import (IndicatorCache, COLUMN_ALIASES, GROUP_COLUMNS,
+                                  compute_indicators, compute_indicator_group)
 
 class AdvancedIndicators:
-    def __init__(self):
+    COLUMNS = [
+        'ADX', 'DIplus', 'DIminus', 'EMA_9', 'EMA_21', 'SMA_50', 'SMA_200',
+        'BB_upper', 'BB_middle', 'BB_lower', 'ATR', 'volatility',
+        'RSI', 'MACD', 'Signal', 'SO_K', 'SO_D', 'OBV', 'VOL_MA', 'MFI'
+    ]
+
+    def __init__(self, indicator_cache: Optional[IndicatorCache] = None):
+        self.indicator_cache = indicator_cache or IndicatorCache()
         self.trend_thresholds = {
             'strong_uptrend': 0.8,
             'uptrend': 0.6,
@@ -13,10 +21,18 @@ class AdvancedIndicators:
             'downtrend': 0.3
         }
 
-    def calculate_all_indicators(self, df: pd.DataFrame) -> Dict:
+    def calculate_all_indicators(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                                 timeframe: Optional[str] = None) -> Dict:
         """حساب جميع المؤشرات المتقدمة"""
         try:
             indicators = {}
+            try:
+                self._add_indicator_columns(df, symbol, timeframe)
+            except Exception as e:
+                # فشل مؤشر واحد لا يلغي بقية الأقسام: تحسب كل مجموعة وحدها ويفرغ قسمها فقط عند فشلها
+                logging.error(f"خطأ في حساب المؤشرات دفعة واحدة، يتم الحساب لكل مجموعة: {e}")
+                for group in GROUP_COLUMNS:
+                    self._add_group_columns(df, group)
 
             # المؤشرات الأساسية
             indicators.update(self._calculate_trend_strength(df))
@@ -34,21 +50,29 @@ class AdvancedIndicators:
             logging.error(f"خطأ في حساب المؤشرات: {e}")
             return {}
 
+    def _add_indicator_columns(self, df: pd.DataFrame, symbol: Optional[str], timeframe: Optional[str]) -> None:
+        """إضافة أعمدة المؤشرات من الذاكرة المشتركة مع DataCollector، أو حسابها مرة واحدة"""
+        if symbol and timeframe:
+            self.indicator_cache.apply(symbol, timeframe, df, self.COLUMNS)
+            return
+        indicators = compute_indicators(df)
+        for column in self.COLUMNS:
+            df[column] = indicators[COLUMN_ALIASES.get(column, column)]
+
+    def _add_group_columns(self, df: pd.DataFrame, group: str) -> None:
+        """إضافة أعمدة مجموعة مؤشرات واحدة، أو إزالتها إن فشل حسابها"""
+        columns = [column for column in self.COLUMNS if COLUMN_ALIASES.get(column, column) in GROUP_COLUMNS[group]]
+        try:
+            indicators = compute_indicator_group(df, group)
+            for column in columns:
+                df[column] = indicators[COLUMN_ALIASES.get(column, column)]
+        except Exception as e:
+            logging.error(f"خطأ في حساب مؤشرات {group}: {e}")
+            df.drop(columns=columns, errors='ignore', inplace=True)
+
     def _calculate_trend_strength(self, df: pd.DataFrame) -> Dict:
         """حساب قوة الاتجاه"""
         try:
-            # ADX - Average Directional Index
-            adx = df.ta.adx()
-            df['ADX'] = adx['ADX_14']
-            df['DIplus'] = adx['DMP_14']
-            df['DIminus'] = adx['DMN_14']
-
-            # Moving Averages
-            df['EMA_9'] = df.ta.ema(length=9)
-            df['EMA_21'] = df.ta.ema(length=21)
-            df['SMA_50'] = df.ta.sma(length=50)
-            df['SMA_200'] = df.ta.sma(length=200)
-
             return {
                 'adx': df['ADX'].iloc[-1],
                 'di_plus': df['DIplus'].iloc[-1],
@@ -62,18 +86,6 @@ class AdvancedIndicators:
     def _calculate_volatility(self, df: pd.DataFrame) -> Dict:
         """حساب التقلب"""
         try:
-            # Bollinger Bands
-            bbands = df.ta.bbands()
-            df['BB_upper'] = bbands['BBU_20_2.0']
-            df['BB_middle'] = bbands['BBM_20_2.0']
-            df['BB_lower'] = bbands['BBL_20_2.0']
-
-            # ATR - Average True Range
-            df['ATR'] = df.ta.atr(length=14)
-
-            # حساب التقلب النسبي
-            df['volatility'] = (df['ATR'] / df['close']) * 100
-
             return {
                 'atr': df['ATR'].iloc[-1],
                 'bb_width': (df['BB_upper'].iloc[-1] - df['BB_lower'].iloc[-1]) / df['BB_middle'].iloc[-1],
@@ -87,19 +99,6 @@ class AdvancedIndicators:
     def _calculate_momentum(self, df: pd.DataFrame) -> Dict:
         """حساب الزخم"""
         try:
-            # RSI
-            df['RSI'] = df.ta.rsi(length=14)
-
-            # MACD
-            macd = df.ta.macd()
-            df['MACD'] = macd['MACD_12_26_9']
-            df['Signal'] = macd['MACDs_12_26_9']
-
-            # Stochastic Oscillator
-            stoch = df.ta.stoch()
-            df['SO_K'] = stoch['STOCHk_14_3_3']
-            df['SO_D'] = stoch['STOCHd_14_3_3']
-
             return {
                 'rsi': df['RSI'].iloc[-1],
                 'macd': df['MACD'].iloc[-1],
@@ -115,15 +114,6 @@ class AdvancedIndicators:
     def _calculate_volume_analysis(self, df: pd.DataFrame) -> Dict:
         """تحليل الحجم"""
         try:
-            # On-Balance Volume
-            df['OBV'] = df.ta.obv()
-
-            # Volume Moving Average
-            df['VOL_MA'] = df.ta.sma(close=df['volume'], length=20)
-
-            # Money Flow Index
-            df['MFI'] = df.ta.mfi()
-
             return {
                 'obv': df['OBV'].iloc[-1],
                 'volume_ma': df['VOL_MA'].iloc[-1],
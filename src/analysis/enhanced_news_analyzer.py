@@ -7,57 +7,84 @@ from textblob import TextBlob
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # تغيير استيراد النموذج من مطلق إلى نسبي
 from ..config import Config
 from ..database.models import DatabaseManager
+from .http_session import get_session
+
+# (مسار المورد داخل nltk_data، اسم الحزمة للتحميل)
+NLTK_RESOURCES = [('tokenizers/punkt', 'punkt'), ('tokenizers/punkt_tab', 'punkt_tab')]
+_nltk_checked = False
+_nltk_lock = threading.Lock()
+
+def ensure_nltk_resources() -> None:
+    """البحث عن موارد NLTK محلياً وتحميل المفقود منها فقط، مرة واحدة لكل عملية"""
+    global _nltk_checked
+    with _nltk_lock:
+        if _nltk_checked:
+            return
+        for path, package in NLTK_RESOURCES:
+            try:
+                nltk.data.find(path)
+            except LookupError:
+                try:
+                    nltk.download(package, quiet=True)
+                except Exception as e:
+                    logging.error(f"Error downloading NLTK resource {package}: {e}")
+        _nltk_checked = True
+
 
 class EnhancedNewsAnalyzer:
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, session: Optional[requests.Session] = None):
         self.db_manager = db_manager
+        self._session = session
+        # مجموعة خيوط دائمة لكل مرحلة: خيوط العملات تنتظر خيوط اللغات فلا تتشاركان
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._executors_lock = threading.Lock()
         self.news_cache = {}
         self.sentiment_scores = {}
         self.supported_languages = ['en', 'ar', 'zh', 'es', 'fr']  # اللغات المدعومة
         
-        # تحميل الموارد اللازمة لمعالجة اللغة الطبيعية
-        try:
-            nltk.download('punkt', quiet=True)
-        except Exception as e:
-            logging.error(f"Error downloading NLTK resources: {e}")
+        # التأكد من موارد معالجة اللغة الطبيعية (تحمل مرة واحدة فقط إن لم تكن موجودة)
+        ensure_nltk_resources()
+
+    @property
+    def session(self) -> requests.Session:
+        """الجلسة الممررة، وإلا جلسة الخيط الحالي المجمعة"""
+        return self._session or get_session()
+
+    def _executor(self, stage: str) -> ThreadPoolExecutor:
+        """خيوط جلب دائمة تحتفظ كل منها بجلستها واتصالاتها بين الاستدعاءات"""
+        with self._executors_lock:
+            executor = self._executors.get(stage)
+            if executor is None:
+                executor = self._executors[stage] = ThreadPoolExecutor(
+                    max_workers=Config.NEWS_FETCH_WORKERS, thread_name_prefix=f"news-{stage}"
+                )
+            return executor
+
+    def close(self) -> None:
+        """إيقاف خيوط الجلب"""
+        with self._executors_lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=False)
+            self._executors.clear()
 
     def fetch_crypto_news(self, symbol: str, languages: List[str] = ['en']) -> List[Dict]:
         """جلب الأخبار المتعلقة بالعملة المشفرة بلغات متعددة"""
         try:
             all_articles = []
             search_term = symbol.replace('USDT', '')
-            
-            for lang in languages:
-                if lang not in self.supported_languages:
-                    continue
-                    
-                url = 'https://newsapi.org/v2/everything'
-                params = {
-                    'q': f'cryptocurrency {search_term}',
-                    'apiKey': Config.NEWS_API_KEY,
-                    'language': lang,
-                    'sortBy': 'publishedAt',
-                    'pageSize': 10,
-                    'from': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                }
-                
-                response = requests.get(url, params=params)
-                if response.status_code == 200:
-                    news_data = response.json()
-                    articles = news_data.get('articles', [])
-                    
-                    # معالجة كل مقال
-                    for article in articles:
-                        processed_article = self._process_article(article, lang)
-                        if processed_article:
-                            all_articles.append(processed_article)
-                            
-                else:
-                    logging.error(f"Failed to fetch news for language {lang}: {response.status_code}")
+            languages = [lang for lang in languages if lang in self.supported_languages]
+
+            # جلب اللغات بشكل متزامن مع الحفاظ على ترتيبها
+            if languages:
+                executor = self._executor('languages')
+                for articles in executor.map(lambda lang: self._fetch_language(search_term, lang), languages):
+                    all_articles.extend(articles)
             
             # حفظ في قاعدة البيانات
             if all_articles:
@@ -72,6 +99,36 @@ class EnhancedNewsAnalyzer:
             logging.error(f"Error fetching news: {e}")
             return []
 
+    def _fetch_language(self, search_term: str, lang: str) -> List[Dict]:
+        """جلب ومعالجة الأخبار بلغة واحدة"""
+        try:
+            url = 'https://newsapi.org/v2/everything'
+            params = {
+                'q': f'cryptocurrency {search_term}',
+                'apiKey': Config.NEWS_API_KEY,
+                'language': lang,
+                'sortBy': 'publishedAt',
+                'pageSize': 10,
+                'from': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+            }
+
+            response = self.session.get(url, params=params, timeout=Config.NEWS_HTTP_TIMEOUT)
+            if response.status_code != 200:
+                logging.error(f"Failed to fetch news for language {lang}: {response.status_code}")
+                return []
+
+            # معالجة كل مقال
+            processed = []
+            for article in response.json().get('articles', []):
+                processed_article = self._process_article(article, lang)
+                if processed_article:
+                    processed.append(processed_article)
+            return processed
+
+        except Exception as e:
+            logging.error(f"Error fetching news for language {lang}: {e}")
+            return []
+
     def _process_article(self, article: Dict, language: str) -> Optional[Dict]:
         """معالجة المقال وتنظيفه"""
         try:
@@ -229,6 +286,20 @@ class EnhancedNewsAnalyzer:
             logging.error(f"Error getting market sentiment: {e}")
             return self._get_default_sentiment()
 
+    def get_market_sentiments(self, symbols: List[str], languages: List[str] = ['en']) -> Dict[str, Dict]:
+        """تحليل مشاعر السوق لعدة عملات بشكل متزامن؛ العملات التي فشل تحليلها لا تظهر في النتيجة"""
+        if not symbols:
+            return {}
+        sentiments = {}
+        executor = self._executor('symbols')
+        futures = {symbol: executor.submit(self.get_market_sentiment, symbol, languages) for symbol in symbols}
+        for symbol, future in futures.items():
+            try:
+                sentiments[symbol] = future.result()
+            except Exception as e:
+                logging.error(f"Error getting market sentiment for {symbol}: {e}")
+        return sentiments
+
     def _get_default_sentiment(self) -> Dict:
         """إرجاع تحليل مشاعر افتراضي"""
         return {
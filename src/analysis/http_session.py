@@ -0,0 +1,30 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.config import Config
+
+# requests.Session is not guaranteed to be thread-safe, so each thread keeps its own
+_local = threading.local()
+
+def create_session(retries: int = 3, pool_size: int = 16) -> requests.Session:
+    """Create a keep-alive session that retries idempotent requests with backoff"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session() -> requests.Session:
+    """Pooled keep-alive session for the calling thread, shared by the news analyzers"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = create_session(Config.NEWS_HTTP_RETRIES, pool_size=4)
+    return session
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
 from typing import Tuple, Optional
 import logging
 from src.config import Config
@@ -8,7 +7,15 @@ from src.config import Config
 class MLAnalyzer:
     def __init__(self):
         self.model = None
-        self.scaler = MinMaxScaler()
+        self._scaler = None
+
+    @property
+    def scaler(self):
+        """Created on first use so that importing the analyzer does not load sklearn"""
+        if self._scaler is None:
+            from sklearn.preprocessing import MinMaxScaler
+            self._scaler = MinMaxScaler()
+        return self._scaler
 
     def prepare_data(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare data for ML model"""
@@ -1,13 +1,40 @@
 import requests
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from src.config import Config
+from .http_session import get_session
 
 class NewsAnalyzer:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
+        self._session = session
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         self.news_cache = {}
         self.sentiment_scores = {}
+
+    @property
+    def session(self) -> requests.Session:
+        """The injected session, otherwise the calling thread's own pooled session"""
+        return self._session or get_session()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Long-lived fetch workers, so each keeps its pooled session and connections across calls"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=Config.NEWS_FETCH_WORKERS,
+                                                    thread_name_prefix='news')
+            return self._executor
+
+    def close(self) -> None:
+        """Stop the fetch workers"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
         
     def fetch_crypto_news(self, symbol: str) -> List[Dict]:
         """Fetch news related to cryptocurrency"""
@@ -25,7 +52,7 @@ class NewsAnalyzer:
                 'from': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=Config.NEWS_HTTP_TIMEOUT)
             if response.status_code == 200:
                 news_data = response.json()
                 articles = news_data.get('articles', [])
@@ -87,3 +114,17 @@ class NewsAnalyzer:
                 'confidence': 0,
                 'news_count': 0
             }
+
+    def get_market_sentiments(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Get market sentiment for several symbols concurrently; symbols whose lookup failed are omitted"""
+        if not symbols:
+            return {}
+        sentiments = {}
+        futures = {symbol: self.executor.submit(self.get_market_sentiment, symbol) for symbol in symbols}
+        for symbol, future in futures.items():
+            # A failed lookup is left out so the caller can tell it apart
+            try:
+                sentiments[symbol] = future.result()
+            except Exception as e:
+                logging.error(f"Error getting market sentiment for {symbol}: {e}")
+        return sentiments
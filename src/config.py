@@ -26,6 +26,63 @@ class Config:
         'MATICUSDT' # Polygon
     ]
     TIMEFRAME: str = '1h'
+    HIGHER_TIMEFRAMES: List[str] = ['4h', '1d', '1w']  # Resampled locally from TIMEFRAME
+    CANDLE_BUFFER_SIZE: int = 1000  # Candles kept in memory per (symbol, timeframe)
+    CANDLE_BUFFER_DTYPE: str = 'float64'  # 'float32' halves OHLCV memory
+    CANDLE_MEMORY_BUDGET_MB: float = 256.0  # Least recently used buffers are evicted beyond this
+    INCREMENTAL_INDICATORS: bool = True  # Update indicators per new bar instead of recomputing the frame
+    INDICATOR_CACHE_SIZE: int = 256  # Indicator frames kept in the shared LRU cache
+
+    # Local on-disk data (candle store, backfill checkpoints)
+    LOCAL_DATA_DIR: str = os.getenv('LOCAL_DATA_DIR', 'local_data')
+    PERSIST_CANDLES: bool = True  # Mirror synced candles into the local CandleStore (live data only)
+    BACKFILL_WORKERS: int = 8
+
+    # fetch_multiple_symbols pipeline: bounded fetchers -> analysis stage -> writer
+    FETCH_WORKERS: int = 16
+    ANALYSIS_PROCESSES: int = os.cpu_count() or 1  # Full pandas_ta recomputes only (INCREMENTAL_INDICATORS=False); 0/1 use the analysis threads
+    ANALYSIS_THREADS: int = 4  # Analysis stage for incremental indicators, whose state lives in this process
+
+    # Storage backend: 'mongodb' (MONGODB_URL), 'sqlite' (embedded, single box) or 'memory'
+    DB_BACKEND: str = os.getenv('DB_BACKEND', 'mongodb')
+    SQLITE_PATH: str = os.path.join(LOCAL_DATA_DIR, 'trading.db')
+
+    # Database write-behind queue (trades are always written synchronously)
+    DB_WRITE_BEHIND: bool = True
+    DB_QUEUE_SIZE: int = 10000  # Pending writes before callers block
+    DB_BATCH_SIZE: int = 500  # Writes per flush
+    DB_FLUSH_INTERVAL: float = 1.0  # Seconds before a partial batch is flushed
+    DB_PUT_TIMEOUT: float = 5.0  # Seconds a caller blocks on a full queue before writing inline
+
+    # In-memory fallback store (used when MongoDB is unreachable)
+    MEMORY_CANDLE_RETENTION: int = 5000  # Candles kept per (symbol, timeframe)
+    MEMORY_DOCUMENT_RETENTION: int = 10000  # Analysis/trade records kept per collection in memory
+    LATEST_STATE_TTL: float = 5.0  # Seconds a cached latest-indicators snapshot is served before re-checking the store
+
+    # Market data streaming (WebSocket klines/tickers instead of REST polling)
+    USE_STREAMING: bool = False
+    STREAM_MAX_CANDLES: int = 1000
+    STREAM_STALE_AFTER: float = 30.0  # Seconds without an update before reads fall back to REST
+    STREAM_REPLAY_BARS: int = 100  # Candles replayed after the seeded history in mock mode
+    STREAM_REPLAY_INTERVAL: float = 1.0  # Seconds between replayed messages
+
+    # Bulk ticker snapshot shared by price/volume lookups
+    TICKER_CACHE_TTL: float = 10.0  # seconds
+
+    # Exchange market metadata cached on disk under LOCAL_DATA_DIR
+    MARKETS_CACHE_TTL: float = 86400.0  # seconds before markets are reloaded
+
+    # Request weight budget (Binance spot REQUEST_WEIGHT per minute)
+    REQUEST_WEIGHT_LIMIT: int = 6000
+    ORDER_WEIGHT_RESERVE: float = 0.1  # Share of the budget held back for orders
+
+    # Local exchange simulator used in mock mode
+    SIMULATOR_FEE_RATE: float = 0.001  # 0.1% per fill
+    SIMULATOR_LATENCY_MS: float = 0.0  # Injected delay per order request
+
+    # asyncio client: fetch_multiple_symbols fans out on one event loop instead of fetcher threads
+    ASYNC_FETCH: bool = False
+    ASYNC_MAX_CONCURRENCY: int = 20  # Maximum in-flight requests
 
     # Trading limits per currency
     MAX_CURRENCIES_TRADED: int = 5  # Maximum number of simultaneous positions
@@ -55,4 +112,7 @@ class Config:
 
     # News analysis parameters
     NEWS_UPDATE_INTERVAL: int = 3600  # 1 hour in seconds
-    NEWS_SENTIMENT_WEIGHT: float = 0.3  # Weight for news sentiment in trading decisions
\ No newline at end of file
+    NEWS_SENTIMENT_WEIGHT: float = 0.3  # Weight for news sentiment in trading decisions
+    NEWS_HTTP_TIMEOUT: tuple = (3.05, 10)  # (connect, read) seconds
+    NEWS_HTTP_RETRIES: int = 3
+    NEWS_FETCH_WORKERS: int = 8  # Concurrent news requests across symbols/languages
\ No newline at end of file
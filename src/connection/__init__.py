@@ -1,4 +1,12 @@
 """Initialize connection package"""
-from .binance_client import BinanceClient
+from lazy_exports import lazy_exports
 
-__all__ = ['BinanceClient']
\ No newline at end of file
+_EXPORTS = {
+    'BinanceClient': '.binance_client',
+    'AsyncBinanceClient': '.async_binance_client',
+    'MarketStream': '.market_stream',
+    'ReplayServer': '.market_stream'
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
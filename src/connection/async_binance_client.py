@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+import ccxt.async_support as ccxt_async
+from config import Config
+from .binance_client import exchange_options
+from .market_metadata import MarketMetadata
+from .mock_data import MockBinanceData
+from .request_scheduler import RequestScheduler, REQUEST_WEIGHTS, kline_weight
+
+class AsyncBinanceClient:
+    """Awaitable counterpart of BinanceClient sharing one HTTP session
+
+    All requests go through a single ccxt async exchange (one aiohttp session
+    with keep-alive) and a semaphore caps how many are in flight at once.
+    Admission is charged to a RequestScheduler; pass the sync client's
+    scheduler and market metadata so both clients share one weight budget
+    and one markets cache.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 market_metadata: Optional[MarketMetadata] = None):
+        self.client = None
+        self._markets: Optional[Dict] = None  # markets last handed to the ccxt client
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.mock_data = MockBinanceData()
+        self.use_mock = not (Config.API_KEY and Config.API_SECRET)
+        self.semaphore = asyncio.Semaphore(max_concurrency or Config.ASYNC_MAX_CONCURRENCY)
+        self._markets_lock = asyncio.Lock()
+        self.scheduler = scheduler or RequestScheduler(Config.REQUEST_WEIGHT_LIMIT, Config.ORDER_WEIGHT_RESERVE)
+        if market_metadata is None:
+            network = 'testnet' if Config.USE_TESTNET else 'live'
+            market_metadata = MarketMetadata(
+                os.path.join(Config.LOCAL_DATA_DIR, f"markets_{network}.json"),
+                loader=self._load_markets,
+                refresh_interval=Config.MARKETS_CACHE_TTL,
+                network=network
+            )
+        self.market_metadata = market_metadata
+        self.initialize_client()
+
+    def initialize_client(self) -> None:
+        """Initialize the async ccxt client or mock data"""
+        try:
+            if not self.use_mock:
+                options = exchange_options()
+
+                self.client = ccxt_async.binance(options)
+
+                if Config.USE_TESTNET:
+                    self.client.set_sandbox_mode(True)
+
+                logging.info("Initialized async Binance client")
+            else:
+                logging.info("Using mock data for async client")
+
+        except Exception as e:
+            logging.error(f"Failed to initialize async Binance client: {e}")
+            self.use_mock = True
+
+    async def close(self) -> None:
+        """Close the shared HTTP session"""
+        if self.client is not None:
+            await self.client.close()
+
+    async def _request(self, lane: str, weight: int, method, *args, **kwargs):
+        """Hand ccxt the cached markets, then send a ccxt coroutine through the scheduler"""
+        await self._ensure_markets()
+        return await self._send(lane, weight, method, *args, **kwargs)
+
+    async def _send(self, lane: str, weight: int, method, *args, **kwargs):
+        """Await admission from the weight scheduler, then run a ccxt coroutine"""
+        await self.scheduler.admit_async(lane, weight)
+        async with self.semaphore:
+            result = await method(*args, **kwargs)
+        headers = getattr(self.client, 'last_response_headers', None) or {}
+        for name, value in headers.items():
+            if name.lower() == 'x-mbx-used-weight-1m':
+                self.scheduler.sync_used_weight(int(value))
+                break
+        return result
+
+    async def _ensure_markets(self) -> None:
+        """Hand cached markets to ccxt so it never calls load_markets itself"""
+        metadata = self.market_metadata
+        if metadata.markets is None or metadata.expired():
+            async with self._markets_lock:
+                if metadata.markets is None or metadata.expired():
+                    # Reading the cache file or refreshing it blocks; do it off the event loop
+                    self._loop = asyncio.get_running_loop()
+                    await asyncio.to_thread(metadata.ensure_loaded)
+        markets = metadata.markets
+        if markets is not self._markets or not self.client.markets:
+            self.client.set_markets(markets)
+            self._markets = markets
+
+    def _load_markets(self) -> Dict[str, Dict]:
+        """Download market metadata through the scheduler (called from a worker thread)"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._send('price', REQUEST_WEIGHTS['exchange_info'], self.client.load_markets, True),
+            self._loop
+        )
+        return future.result()
+
+    async def __aenter__(self) -> 'AsyncBinanceClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def get_account_info(self) -> Dict:
+        """Get account information"""
+        try:
+            if self.use_mock:
+                return self.mock_data.get_mock_account()
+            return await self._request('order', REQUEST_WEIGHTS['account'], self.client.fetch_balance)
+        except Exception as e:
+            logging.error(f"Failed to get account info: {e}")
+            return self.mock_data.get_mock_account()
+
+    async def get_symbol_price(self, symbol: str) -> Optional[float]:
+        """Get current price for a symbol"""
+        try:
+            if self.use_mock:
+                return self.mock_data.get_mock_price(symbol)
+            ticker = await self._request('price', REQUEST_WEIGHTS['ticker'], self.client.fetch_ticker, symbol)
+            return float(ticker['last'])
+        except Exception as e:
+            logging.error(f"Failed to get price for {symbol}: {e}")
+            return self.mock_data.get_mock_price(symbol)
+
+    async def place_order(self, symbol: str, side: str, quantity: float) -> Dict:
+        """Place a new market order"""
+        try:
+            if self.use_mock:
+                price = await self.get_symbol_price(symbol)
+                return {
+                    'symbol': symbol,
+                    'side': side,
+                    'type': 'market',
+                    'amount': quantity,
+                    'price': price,
+                    'status': 'closed'
+                }
+
+            order = await self._request(
+                'order', REQUEST_WEIGHTS['order'], self.client.create_order,
+                symbol=symbol,
+                type='market',
+                side=side.lower(),
+                amount=quantity
+            )
+            logging.info(f"Order placed successfully: {order}")
+            return order
+        except Exception as e:
+            logging.error(f"Failed to place order: {e}")
+            return {}
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500, since: Optional[int] = None,
+                          raise_errors: bool = False) -> list:
+        """Fetch OHLCV data, optionally only candles opened at or after `since` (ms)
+
+        With raise_errors a failed request raises instead of returning mock candles.
+        """
+        try:
+            if self.use_mock:
+                return self.mock_data.get_mock_ohlcv(symbol, limit, since=since, timeframe=timeframe)
+            return await self._request(
+                'history', kline_weight(limit), self.client.fetch_ohlcv,
+                symbol=symbol,
+                timeframe=timeframe,
+                since=since,
+                limit=limit
+            )
+        except Exception as e:
+            logging.error(f"Failed to fetch OHLCV data: {e}")
+            if raise_errors:
+                raise
+            return self.mock_data.get_mock_ohlcv(symbol, limit, since=since, timeframe=timeframe)
+
+    async def get_24h_volume(self, symbol: str) -> float:
+        """Get 24h trading volume for a symbol"""
+        try:
+            if self.use_mock:
+                return Config.MIN_VOLUME_24H * 2
+            ticker = await self._request('price', REQUEST_WEIGHTS['ticker'], self.client.fetch_ticker, symbol)
+            return float(ticker['quoteVolume'])
+        except Exception as e:
+            logging.error(f"Failed to get 24h volume for {symbol}: {e}")
+            return 0
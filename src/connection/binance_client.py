@@ -1,36 +1,67 @@
 import ccxt
 import logging
-from typing import Dict, Optional
+import os
+from typing import Callable, Dict, List, Optional, Tuple
 from config import Config
 from .mock_data import MockBinanceData
+from .market_stream import MarketStream, ReplayServer
+from .ticker_cache import TickerCache
+from .exchange_simulator import ExchangeSimulator
+from .market_metadata import MarketMetadata
+from .request_scheduler import RequestScheduler, REQUEST_WEIGHTS, kline_weight
+
+def exchange_options() -> Dict:
+    """ccxt options shared by the sync and async Binance clients"""
+    options = {
+        'apiKey': Config.API_KEY,
+        'secret': Config.API_SECRET,
+        # Throttling is done by RequestScheduler per request weight and lane
+        'enableRateLimit': False,
+        'options': {
+            'defaultType': 'spot'
+        }
+    }
+
+    if Config.USE_TESTNET:
+        options['urls'] = {
+            'api': {
+                'public': 'https://testnet.binance.vision/api/v3',
+                'private': 'https://testnet.binance.vision/api/v3',
+            }
+        }
+    return options
 
 class BinanceClient:
-    def __init__(self):
+    def __init__(self, use_mock: Optional[bool] = None):
+        """use_mock=True keeps the client offline even when API keys are configured"""
         self.client = None
+        self._markets: Optional[Dict] = None  # markets last handed to the ccxt client
         self.mock_data = MockBinanceData()
-        self.use_mock = not (Config.API_KEY and Config.API_SECRET)
+        self.use_mock = use_mock if use_mock is not None else not (Config.API_KEY and Config.API_SECRET)
+        self.stream: Optional[MarketStream] = None
+        self.ticker_cache = TickerCache(self._fetch_all_tickers, Config.TICKER_CACHE_TTL)
+        self.scheduler = RequestScheduler(Config.REQUEST_WEIGHT_LIMIT, Config.ORDER_WEIGHT_RESERVE)
+        self.simulator = ExchangeSimulator(
+            price_source=self.mock_data.get_mock_price,
+            balances=self.mock_data.mock_balances,
+            fee_rate=Config.SIMULATOR_FEE_RATE,
+            latency=Config.SIMULATOR_LATENCY_MS / 1000
+        )
+        network = 'testnet' if Config.USE_TESTNET else 'live'
+        self.market_metadata = MarketMetadata(
+            os.path.join(Config.LOCAL_DATA_DIR, f"markets_{network}.json"),
+            loader=self._load_markets,
+            refresh_interval=Config.MARKETS_CACHE_TTL,
+            network=network
+        )
         self.initialize_client()
 
     def initialize_client(self) -> None:
         """Initialize Binance API client using ccxt or mock data"""
         try:
             if not self.use_mock:
-                options = {
-                    'apiKey': Config.API_KEY,
-                    'secret': Config.API_SECRET,
-                    'enableRateLimit': True,
-                    'options': {
-                        'defaultType': 'spot'
-                    }
-                }
-
+                options = exchange_options()
                 if Config.USE_TESTNET:
-                    options['urls'] = {
-                        'api': {
-                            'public': 'https://testnet.binance.vision/api/v3',
-                            'private': 'https://testnet.binance.vision/api/v3',
-                        }
-                    }
                     logging.info("Connecting to Binance Testnet")
 
                 self.client = ccxt.binance(options)
@@ -47,12 +78,121 @@ class BinanceClient:
             self.use_mock = True
             logging.info("Falling back to mock data")
 
+    def start_stream(self, symbols: List[str], timeframe: str, limit: int = 500) -> None:
+        """Keep klines and prices for symbols current from a push stream"""
+        try:
+            self.stop_stream()
+            # Never seed the stream with mock candles standing in for a failed request
+            history = {symbol: self.fetch_ohlcv(symbol, timeframe, limit, raise_errors=True) for symbol in symbols}
+
+            if self.use_mock:
+                # Replay candles beyond the seeded history through the local server
+                replay = {}
+                for symbol in symbols:
+                    rows = sorted(
+                        self.mock_data.get_mock_ohlcv(symbol, limit + Config.STREAM_REPLAY_BARS, timeframe=timeframe),
+                        key=lambda row: row[0]
+                    )
+                    history[symbol] = rows[:limit]
+                    replay[symbol] = rows[limit:]
+                source = ReplayServer(replay, timeframe, interval=Config.STREAM_REPLAY_INTERVAL)
+            else:
+                source = None
+
+            stream = MarketStream(
+                symbols, timeframe, source=source,
+                max_candles=max(Config.STREAM_MAX_CANDLES, limit),
+                testnet=Config.USE_TESTNET
+            )
+            for symbol, ohlcv in history.items():
+                stream.seed(symbol, ohlcv)
+            if self.use_mock:
+                stream.subscribe(self._feed_simulator)
+            stream.start()
+            self.stream = stream
+            logging.info(f"Started market stream for {len(symbols)} symbols ({timeframe})")
+        except Exception as e:
+            logging.error(f"Failed to start market stream: {e}")
+            self.stream = None
+
+    def _feed_simulator(self, event: str, symbol: str, data: Dict) -> None:
+        """Match resting simulated orders against streamed prices"""
+        if event == 'kline':
+            candle = data['candle']
+            self.simulator.update_price(symbol, candle[4], volume=candle[5])
+
+    def _fresh_stream(self, symbol: str) -> Optional[MarketStream]:
+        """The stream if it is alive and recently updated symbol, otherwise None (use REST)"""
+        stream = self.stream
+        if stream is None:
+            return None
+        if not stream.is_running():
+            # Thread exited (missing websocket-client, replay exhausted, ...): stop serving frozen data
+            logging.warning("Market stream is no longer running, falling back to REST")
+            stream.stop()
+            self.stream = None
+            return None
+        return stream if stream.is_fresh(symbol, Config.STREAM_STALE_AFTER) else None
+
+    def stop_stream(self) -> None:
+        """Stop the push stream and fall back to REST polling"""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+
+    def _load_markets(self) -> Dict[str, Dict]:
+        """Download market metadata from the exchange"""
+        return self.scheduler.submit('price', REQUEST_WEIGHTS['exchange_info'], self.client.load_markets, True)
+
+    def _ensure_markets(self) -> None:
+        """Hand cached markets to ccxt so it never calls load_markets itself"""
+        markets = self.market_metadata.ensure_loaded()
+        if markets is not self._markets or not self.client.markets:
+            self.client.set_markets(markets)
+            self._markets = markets
+
+    def _prepare_order(self, symbol: str, quantity: float, price: Optional[float]) -> Tuple[float, Optional[float]]:
+        """Round quantity and price to the symbol's lot and tick sizes and check its filters"""
+        quantity = self.market_metadata.round_quantity(symbol, quantity)
+        if price is not None:
+            price = self.market_metadata.round_price(symbol, price)
+        error = self.market_metadata.validate_order(symbol, quantity, price or self.get_symbol_price(symbol))
+        if error:
+            raise ValueError(f"{symbol} order rejected locally: {error}")
+        return quantity, price
+
+    def _request(self, lane: str, weight: int, method: Callable, *args, **kwargs):
+        """Run a ccxt call through the weight-aware scheduler"""
+        self._ensure_markets()
+        result = self.scheduler.submit(lane, weight, method, *args, **kwargs)
+        headers = getattr(self.client, 'last_response_headers', None) or {}
+        for name, value in headers.items():
+            if name.lower() == 'x-mbx-used-weight-1m':
+                self.scheduler.sync_used_weight(int(value))
+                break
+        return result
+
+    def get_scheduler_metrics(self) -> Dict:
+        """Weight usage, queue depth and wait times per request lane"""
+        return self.scheduler.get_metrics()
+
+    def _fetch_all_tickers(self) -> Dict[str, Dict]:
+        """Fetch 24h tickers for every market in a single request"""
+        return self._request('price', REQUEST_WEIGHTS['tickers'], self.client.fetch_tickers)
+
+    def _get_ticker(self, symbol: str) -> Dict:
+        """Get a ticker from the bulk snapshot, falling back to a single request"""
+        ticker = self.ticker_cache.get(symbol)
+        if ticker is None:
+            ticker = self._request('price', REQUEST_WEIGHTS['ticker'], self.client.fetch_ticker, symbol)
+        return ticker
+
     def get_account_info(self) -> Dict:
         """Get account information"""
         try:
             if self.use_mock:
-                return self.mock_data.get_mock_account()
-            return self.client.fetch_balance()
+                return self.simulator.fetch_balance()
+            return self._request('order', REQUEST_WEIGHTS['account'], self.client.fetch_balance)
         except Exception as e:
             logging.error(f"Failed to get account info: {e}")
             return self.mock_data.get_mock_account()
@@ -60,34 +200,47 @@ class BinanceClient:
     def get_symbol_price(self, symbol: str) -> Optional[float]:
         """Get current price for a symbol"""
         try:
+            stream = self._fresh_stream(symbol)
+            if stream is not None:
+                price = stream.get_price(symbol)
+                if price is not None:
+                    return price
             if self.use_mock:
-                return self.mock_data.get_mock_price(symbol)
-            ticker = self.client.fetch_ticker(symbol)
+                price = self.mock_data.get_mock_price(symbol)
+                self.simulator.update_price(symbol, price)
+                return price
+            ticker = self._get_ticker(symbol)
             return float(ticker['last'])
         except Exception as e:
             logging.error(f"Failed to get price for {symbol}: {e}")
             return self.mock_data.get_mock_price(symbol)
 
-    def place_order(self, symbol: str, side: str, quantity: float) -> Dict:
-        """Place a new order"""
+    def place_order(self, symbol: str, side: str, quantity: float,
+                    price: Optional[float] = None, order_type: str = 'MARKET',
+                    stop_price: Optional[float] = None) -> Dict:
+        """Place a new market, limit or stop (STOP_LOSS / STOP_LOSS_LIMIT) order"""
         try:
             if self.use_mock:
-                # Simulate successful order placement
-                price = self.get_symbol_price(symbol)
-                return {
-                    'symbol': symbol,
-                    'side': side,
-                    'type': 'market',
-                    'amount': quantity,
-                    'price': price,
-                    'status': 'closed'
-                }
-
-            order = self.client.create_order(
+                # Route through the local exchange simulator
+                order = self.simulator.create_order(
+                    symbol=symbol,
+                    type=order_type,
+                    side=side,
+                    amount=quantity,
+                    price=price,
+                    stop_price=stop_price
+                )
+                return order if order.get('status') != 'rejected' else {}
+
+            quantity, price = self._prepare_order(symbol, quantity, price)
+            order = self._request(
+                'order', REQUEST_WEIGHTS['order'], self.client.create_order,
                 symbol=symbol,
-                type='market',
+                type=order_type.lower(),
                 side=side.lower(),
-                amount=quantity
+                amount=quantity,
+                price=price,
+                params={'stopPrice': stop_price} if stop_price is not None else {}
             )
             logging.info(f"Order placed successfully: {order}")
             return order
@@ -95,30 +248,64 @@ class BinanceClient:
             logging.error(f"Failed to place order: {e}")
             return {}
 
-    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500) -> list:
-        """Fetch OHLCV data using ccxt or mock data"""
+    def cancel_order(self, order_id: str, symbol: str) -> Dict:
+        """Cancel an open order"""
+        try:
+            if self.use_mock:
+                return self.simulator.cancel_order(order_id, symbol)
+            return self._request(
+                'order', REQUEST_WEIGHTS['order'], self.client.cancel_order, order_id, symbol
+            )
+        except Exception as e:
+            logging.error(f"Failed to cancel order {order_id}: {e}")
+            return {}
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500, since: Optional[int] = None,
+                    raise_errors: bool = False) -> list:
+        """Fetch OHLCV data using ccxt or mock data, optionally only candles opened at or after `since` (ms)
+
+        With raise_errors a failed request raises instead of being replaced by mock
+        candles, so callers that persist or checkpoint the result only see real bars.
+        """
         try:
+            stream = self._fresh_stream(symbol)
+            if stream is not None and timeframe == stream.timeframe:
+                ohlcv = stream.get_ohlcv(symbol, limit)
+                # The stream only holds recent bars; older ranges come from REST
+                if ohlcv and (since is None or ohlcv[0][0] <= since):
+                    if since is not None:
+                        ohlcv = [row for row in ohlcv if row[0] >= since]
+                    return ohlcv
             if self.use_mock:
-                return self.mock_data.get_mock_ohlcv(symbol, limit)
+                return self.mock_data.get_mock_ohlcv(symbol, limit, since=since, timeframe=timeframe)
 
-            ohlcv = self.client.fetch_ohlcv(
+            ohlcv = self._request(
+                'history', kline_weight(limit), self.client.fetch_ohlcv,
                 symbol=symbol,
                 timeframe=timeframe,
+                since=since,
                 limit=limit
             )
             return ohlcv
         except Exception as e:
             logging.error(f"Failed to fetch OHLCV data: {e}")
-            return self.mock_data.get_mock_ohlcv(symbol, limit)
+            if raise_errors:
+                raise
+            return self.mock_data.get_mock_ohlcv(symbol, limit, since=since, timeframe=timeframe)
 
     def get_24h_volume(self, symbol: str) -> float:
         """Get 24h trading volume for a symbol"""
         try:
+            stream = self._fresh_stream(symbol)
+            if stream is not None:
+                volume = stream.get_24h_volume(symbol)
+                if volume is not None:
+                    return volume
             if self.use_mock:
                 # Return mock volume above minimum threshold for testing
                 return Config.MIN_VOLUME_24H * 2
 
-            ticker = self.client.fetch_ticker(symbol)
+            ticker = self._get_ticker(symbol)
             return float(ticker['quoteVolume'])
         except Exception as e:
             logging.error(f"Failed to get 24h volume for {symbol}: {e}")
@@ -0,0 +1,370 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+QUOTE_ASSETS = ('USDT', 'BUSD', 'USDC', 'FDUSD', 'BTC', 'ETH', 'BNB')
+STOP_TYPES = ('stop_loss', 'stop_loss_limit')
+ORDER_TYPES = ('market', 'limit') + STOP_TYPES
+
+@lru_cache(maxsize=None)
+def split_symbol(symbol: str) -> Tuple[str, str]:
+    """Split a market id such as 'BTCUSDT' or 'BTC/USDT' into (base, quote)"""
+    if '/' in symbol:
+        base, quote = symbol.split('/', 1)
+        return base, quote
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return symbol, 'USDT'
+
+
+class SimulatedOrderBook:
+    """Resting limit orders for one symbol with price-time priority
+
+    Heaps hold (price key, sequence, order) entries. Cancelled or filled
+    orders are dropped lazily when they reach the top of the heap. Pending
+    stop orders wait in their own heaps keyed by stop price until triggered.
+    """
+
+    def __init__(self):
+        self.bids: List[tuple] = []  # (-price, seq, order)
+        self.asks: List[tuple] = []  # (price, seq, order)
+        self.sell_stops: List[tuple] = []  # (-stopPrice, seq, order): triggered when price <= stop
+        self.buy_stops: List[tuple] = []  # (stopPrice, seq, order): triggered when price >= stop
+
+    def add(self, order: Dict, seq: int) -> None:
+        if order['side'] == 'buy':
+            heapq.heappush(self.bids, (-order['price'], seq, order))
+        else:
+            heapq.heappush(self.asks, (order['price'], seq, order))
+
+    def add_stop(self, order: Dict, seq: int) -> None:
+        if order['side'] == 'sell':
+            heapq.heappush(self.sell_stops, (-order['stopPrice'], seq, order))
+        else:
+            heapq.heappush(self.buy_stops, (order['stopPrice'], seq, order))
+
+    def pop_triggered(self, price: float) -> List[Dict]:
+        """Remove and return open stop orders triggered by `price`, in trigger priority"""
+        triggered = []
+        for heap, sign in ((self.sell_stops, -1), (self.buy_stops, 1)):
+            # Both heaps are keyed so that sign * price >= key means triggered
+            while heap and (heap[0][2]['status'] != 'open' or sign * price >= heap[0][0]):
+                _, _, order = heapq.heappop(heap)
+                if order['status'] == 'open':
+                    triggered.append(order)
+        return triggered
+
+    def best(self, side: str) -> Optional[Dict]:
+        """Best open order on `side` ('buy' -> highest bid, 'sell' -> lowest ask)"""
+        heap = self.bids if side == 'buy' else self.asks
+        while heap and heap[0][2]['status'] != 'open':
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def depth(self) -> Dict[str, int]:
+        return {
+            'bids': sum(1 for entry in self.bids if entry[2]['status'] == 'open'),
+            'asks': sum(1 for entry in self.asks if entry[2]['status'] == 'open')
+        }
+
+
+class ExchangeSimulator:
+    """In-process exchange with per-symbol order books and a matching engine
+
+    Incoming orders first match resting orders on the opposite side of the
+    book, then trade against the market at the last price fed through
+    update_price() if they cross it. Unfilled limit orders rest on the book;
+    each later price update fills those it crosses, capped by the update's
+    volume, so large orders fill partially over several ticks.
+
+    Stop orders ('stop_loss', 'stop_loss_limit') wait until a price update
+    reaches their stopPrice, then execute as a market or limit order.
+
+    Public methods are serialized by one lock, since the market stream thread
+    feeds prices while the trading thread places and cancels orders.
+    """
+
+    def __init__(self, price_source: Callable[[str], Optional[float]],
+                 balances: Optional[Dict[str, Dict[str, float]]] = None,
+                 fee_rate: float = 0.001, latency: float = 0.0,
+                 enforce_balances: bool = False):
+        self.price_source = price_source
+        self.fee_rate = fee_rate
+        self.latency = latency
+        self.enforce_balances = enforce_balances
+        self.balances: Dict[str, Dict[str, float]] = {
+            asset: dict(balance) for asset, balance in (balances or {}).items()
+        }
+
+        self.books: Dict[str, SimulatedOrderBook] = {}
+        self.orders: Dict[str, Dict] = {}
+        self.last_prices: Dict[str, float] = {}
+        self._reserved: Dict[str, float] = {}  # order id -> funds held for resting orders
+        self._ids = itertools.count(1)
+        self.stats = {'orders': 0, 'fills': 0, 'cancels': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float,
+                     price: Optional[float] = None, stop_price: Optional[float] = None) -> Dict:
+        """Place a market, limit or stop order and return it in ccxt format"""
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            return self._create_order(symbol, type, side, amount, price, stop_price)
+
+    def _create_order(self, symbol: str, type: str, side: str, amount: float,
+                      price: Optional[float], stop_price: Optional[float]) -> Dict:
+        order_type = type.lower()
+        side = side.lower()
+        seq = next(self._ids)
+        order = {
+            'id': str(seq),
+            'timestamp': int(time.time() * 1000),
+            'symbol': symbol,
+            'type': order_type,
+            'side': side,
+            'price': float(price) if price is not None else None,
+            'stopPrice': float(stop_price) if stop_price is not None else None,
+            'amount': float(amount),
+            'filled': 0.0,
+            'remaining': float(amount),
+            'cost': 0.0,
+            'average': None,
+            'status': 'open',
+            'fee': {'cost': 0.0, 'currency': split_symbol(symbol)[1]},
+            'trades': []
+        }
+        self.stats['orders'] += 1
+
+        if (amount <= 0 or order_type not in ORDER_TYPES
+                or (order_type in ('limit', 'stop_loss_limit') and not price)
+                or (order_type in STOP_TYPES and not stop_price)):
+            return self._reject(order, 'invalid order parameters')
+
+        market_price = self._get_price(symbol)
+        if market_price is None:
+            return self._reject(order, 'no market price')
+        if order_type in STOP_TYPES and self._stop_hit(side, stop_price, market_price):
+            # Binance rejects stops that would trigger immediately
+            return self._reject(order, 'stop price would trigger immediately')
+        if self.enforce_balances and not self._reserve(order, price or stop_price or market_price):
+            return self._reject(order, 'insufficient balance')
+
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = SimulatedOrderBook()
+
+        self.orders[order['id']] = order
+        if order_type in STOP_TYPES:
+            book.add_stop(order, seq)
+            return dict(order)
+        self._execute(order, book, market_price, seq)
+        return dict(order)
+
+    @staticmethod
+    def _stop_hit(side: str, stop_price: float, price: float) -> bool:
+        return price <= stop_price if side == 'sell' else price >= stop_price
+
+    def _execute(self, order: Dict, book: SimulatedOrderBook, market_price: float, seq: int) -> None:
+        """Match an active order against the book and the market, resting any limit remainder"""
+        order_type, side = order['type'], order['side']
+        self._match_book(order, book)
+
+        if order['remaining'] > 0:
+            crosses_market = (
+                order_type == 'market' or
+                (side == 'buy' and order['price'] >= market_price) or
+                (side == 'sell' and order['price'] <= market_price)
+            )
+            if crosses_market:
+                self._fill(order, order['remaining'], market_price, maker=False)
+
+        if order_type == 'market':
+            order['price'] = order['average']
+        if order['remaining'] > 0:
+            book.add(order, seq)
+
+    def cancel_order(self, order_id: str, symbol: Optional[str] = None) -> Dict:
+        """Cancel a resting order; filled or unknown orders are returned unchanged"""
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            order = self.orders.get(str(order_id))
+            if order is None:
+                return {}
+            if order['status'] == 'open':
+                order['status'] = 'canceled'
+                self._release(order)
+                self.stats['cancels'] += 1
+            return dict(order)
+
+    def fetch_order(self, order_id: str) -> Dict:
+        with self._lock:
+            order = self.orders.get(str(order_id))
+            return dict(order) if order else {}
+
+    def fetch_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            return [
+                dict(order) for order in self.orders.values()
+                if order['status'] == 'open' and (symbol is None or order['symbol'] == symbol)
+            ]
+
+    def fetch_balance(self) -> Dict:
+        with self._lock:
+            return {
+                'balances': [{'asset': asset, **balance} for asset, balance in self.balances.items()]
+            }
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        with self._lock:
+            return self._get_price(symbol)
+
+    def _get_price(self, symbol: str) -> Optional[float]:
+        price = self.last_prices.get(symbol)
+        if price is None:
+            price = self.price_source(symbol)
+            if price:
+                self.last_prices[symbol] = price
+        return price or None
+
+    def update_price(self, symbol: str, price: float, volume: Optional[float] = None) -> int:
+        """Feed a new market price and fill resting orders it crosses
+
+        `volume` caps the quantity that can trade at this update, producing
+        partial fills; None means unlimited liquidity. Returns the number of
+        orders that traded.
+        """
+        with self._lock:
+            return self._update_price(symbol, price, volume)
+
+    def _update_price(self, symbol: str, price: float, volume: Optional[float]) -> int:
+        self.last_prices[symbol] = price
+        book = self.books.get(symbol)
+        if book is None:
+            return 0
+
+        traded = 0
+        for order in book.pop_triggered(price) if book.sell_stops or book.buy_stops else ():
+            # A triggered stop becomes a market order, or a limit order at its price
+            order['type'] = 'market' if order['type'] == 'stop_loss' else 'limit'
+            filled_before = order['filled']
+            self._execute(order, book, price, int(order['id']))
+            traded += order['filled'] > filled_before
+
+        for side in ('buy', 'sell'):
+            available = float('inf') if volume is None else volume
+            while available > 0:
+                order = book.best(side)
+                if order is None:
+                    break
+                if (side == 'buy' and order['price'] < price) or (side == 'sell' and order['price'] > price):
+                    break
+                quantity = min(order['remaining'], available)
+                self._fill(order, quantity, order['price'], maker=True)
+                available -= quantity
+                traded += 1
+        return traded
+
+    def _match_book(self, order: Dict, book: SimulatedOrderBook) -> None:
+        opposite = 'sell' if order['side'] == 'buy' else 'buy'
+        while order['remaining'] > 0:
+            resting = book.best(opposite)
+            if resting is None:
+                break
+            if order['type'] == 'limit':
+                if order['side'] == 'buy' and resting['price'] > order['price']:
+                    break
+                if order['side'] == 'sell' and resting['price'] < order['price']:
+                    break
+            quantity = min(order['remaining'], resting['remaining'])
+            self._fill(resting, quantity, resting['price'], maker=True)
+            self._fill(order, quantity, resting['price'], maker=False)
+
+    def _fill(self, order: Dict, quantity: float, price: float, maker: bool) -> None:
+        cost = quantity * price
+        fee = cost * self.fee_rate
+        order['filled'] += quantity
+        order['remaining'] -= quantity
+        if order['remaining'] <= 1e-12:
+            order['remaining'] = 0.0
+            order['status'] = 'closed'
+        order['cost'] += cost
+        order['average'] = order['cost'] / order['filled']
+        order['fee']['cost'] += fee
+        order['trades'].append({
+            'price': price,
+            'amount': quantity,
+            'cost': cost,
+            'fee': fee,
+            'takerOrMaker': 'maker' if maker else 'taker'
+        })
+        self.stats['fills'] += 1
+        self._settle(order, quantity, cost, fee)
+
+    def _settle(self, order: Dict, quantity: float, cost: float, fee: float) -> None:
+        base, quote = split_symbol(order['symbol'])
+        base_balance = self.balances.get(base) or self._new_balance(base)
+        quote_balance = self.balances.get(quote) or self._new_balance(quote)
+
+        if order['side'] == 'buy':
+            base_delta, quote_delta = quantity, -(cost + fee)
+        else:
+            base_delta, quote_delta = -quantity, cost - fee
+
+        # Reserved funds of resting orders are released as they fill
+        reserved = self._reserved.get(order['id'], 0.0)
+        if reserved:
+            spent = quantity if order['side'] == 'sell' else cost + fee
+            spent = min(spent, reserved)
+            self._reserved[order['id']] = reserved - spent
+            balance = base_balance if order['side'] == 'sell' else quote_balance
+            balance['used'] -= spent
+            balance['free'] += spent
+
+        for balance, delta in ((base_balance, base_delta), (quote_balance, quote_delta)):
+            balance['free'] += delta
+            balance['total'] = balance['free'] + balance['used']
+
+        if order['status'] == 'closed':
+            self._release(order)
+
+    def _new_balance(self, asset: str) -> Dict[str, float]:
+        balance = self.balances[asset] = {'free': 0.0, 'used': 0.0, 'total': 0.0}
+        return balance
+
+    def _reserve(self, order: Dict, price: float) -> bool:
+        base, quote = split_symbol(order['symbol'])
+        asset = base if order['side'] == 'sell' else quote
+        required = order['amount'] if order['side'] == 'sell' else order['amount'] * price * (1 + self.fee_rate)
+        balance = self.balances.get(asset)
+        if balance is None or balance['free'] < required:
+            return False
+        balance['free'] -= required
+        balance['used'] += required
+        self._reserved[order['id']] = required
+        return True
+
+    def _release(self, order: Dict) -> None:
+        reserved = self._reserved.pop(order['id'], 0.0)
+        if not reserved:
+            return
+        base, quote = split_symbol(order['symbol'])
+        balance = self.balances[base if order['side'] == 'sell' else quote]
+        balance['used'] -= reserved
+        balance['free'] += reserved
+        balance['total'] = balance['free'] + balance['used']
+
+    def _reject(self, order: Dict, reason: str) -> Dict:
+        order['status'] = 'rejected'
+        order['info'] = {'reason': reason}
+        self.stats['rejected'] += 1
+        logging.warning(f"Simulated order rejected ({reason}): {order['symbol']} {order['side']} {order['amount']}")
+        return dict(order)
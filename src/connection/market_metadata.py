@@ -0,0 +1,183 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+# Bump when the cached file layout or the rule extraction changes
+CACHE_VERSION = 1
+
+
+class SymbolRules(NamedTuple):
+    """Exchange trading rules for one market, as plain numbers"""
+    symbol: str
+    tick_size: float
+    step_size: float
+    min_qty: float
+    max_qty: float
+    min_notional: float
+
+
+def _as_float(value, default: float = 0.0) -> float:
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+def extract_rules(market: Dict) -> SymbolRules:
+    """Build SymbolRules from a ccxt market, preferring Binance's raw filters"""
+    filters = {f.get('filterType'): f for f in (market.get('info') or {}).get('filters', [])}
+    price_filter = filters.get('PRICE_FILTER', {})
+    lot_size = filters.get('LOT_SIZE', {})
+    notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+
+    limits = market.get('limits') or {}
+    precision = market.get('precision') or {}
+    return SymbolRules(
+        symbol=market['id'],
+        tick_size=_as_float(price_filter.get('tickSize'), _as_float(precision.get('price'))),
+        step_size=_as_float(lot_size.get('stepSize'), _as_float(precision.get('amount'))),
+        min_qty=_as_float(lot_size.get('minQty'), _as_float((limits.get('amount') or {}).get('min'))),
+        max_qty=_as_float(lot_size.get('maxQty'), _as_float((limits.get('amount') or {}).get('max'), math.inf)),
+        min_notional=_as_float(notional.get('minNotional'), _as_float((limits.get('cost') or {}).get('min')))
+    )
+
+def _floor_to_step(value: float, step: float) -> float:
+    if step <= 0:
+        return value
+    decimals = max(0, -int(math.floor(math.log10(step))))
+    return round(math.floor(value / step + 1e-9) * step, decimals)
+
+def _round_to_step(value: float, step: float) -> float:
+    if step <= 0:
+        return value
+    decimals = max(0, -int(math.floor(math.log10(step))))
+    return round(round(value / step) * step, decimals)
+
+
+class MarketMetadata:
+    """Lazily loaded, disk-cached exchange markets with per-symbol order rules
+
+    The cache file is reused while it is younger than `refresh_interval` and
+    was written by the same cache version, ccxt version and network
+    (testnet/live); otherwise markets are reloaded through `loader`. The age is
+    checked on every use, so a long-running process picks up new listings and
+    filter changes; if a refresh fails the previous markets stay in use.
+    """
+
+    def __init__(self, path: str, loader: Callable[[], Dict], refresh_interval: float = 86400,
+                 network: str = 'live'):
+        self.path = path
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.network = network
+        self.markets: Optional[Dict[str, Dict]] = None
+        self.rules: Dict[str, SymbolRules] = {}
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _version_tag(self) -> Dict:
+        import ccxt
+        return {'cache_version': CACHE_VERSION, 'ccxt_version': ccxt.__version__, 'network': self.network}
+
+    def expired(self) -> bool:
+        """True once the loaded markets are older than refresh_interval"""
+        return time.time() - self.loaded_at > self.refresh_interval
+
+    def ensure_loaded(self) -> Dict[str, Dict]:
+        """Return markets, loading them from disk or the exchange on first use or once expired"""
+        if self.markets is not None and not self.expired():
+            return self.markets
+        with self._lock:
+            if self.markets is None:
+                cached = self._read_cache()
+                if cached is not None:
+                    self._index(*cached)
+                else:
+                    self._reload()
+            elif self.expired():
+                try:
+                    self._reload()
+                except Exception as e:
+                    # Keep trading on the previous rules; retry after another interval
+                    logging.warning(f"Failed to refresh markets, keeping cached rules: {e}")
+                    self.loaded_at = time.time()
+        return self.markets
+
+    def refresh(self) -> None:
+        """Reload markets from the exchange and rewrite the cache file"""
+        with self._lock:
+            self._reload()
+
+    def _reload(self) -> None:
+        markets = self.loader()
+        self._write_cache(markets)
+        self._index(markets, time.time())
+
+    def get_rules(self, symbol: str) -> Optional[SymbolRules]:
+        self.ensure_loaded()
+        return self.rules.get(symbol)
+
+    def round_quantity(self, symbol: str, quantity: float) -> float:
+        rules = self.get_rules(symbol)
+        return _floor_to_step(quantity, rules.step_size) if rules else quantity
+
+    def round_price(self, symbol: str, price: float) -> float:
+        rules = self.get_rules(symbol)
+        return _round_to_step(price, rules.tick_size) if rules else price
+
+    def validate_order(self, symbol: str, quantity: float, price: float) -> Optional[str]:
+        """Return why an order would be rejected by the exchange filters, or None"""
+        rules = self.get_rules(symbol)
+        if rules is None:
+            return None
+        if quantity < rules.min_qty:
+            return f"quantity {quantity} below minimum {rules.min_qty}"
+        if quantity > rules.max_qty:
+            return f"quantity {quantity} above maximum {rules.max_qty}"
+        if price and quantity * price < rules.min_notional:
+            return f"notional {quantity * price:.8f} below minimum {rules.min_notional}"
+        return None
+
+    def _index(self, markets: Dict[str, Dict], loaded_at: float) -> None:
+        rules = {}
+        for symbol, market in markets.items():
+            try:
+                market_rules = extract_rules(market)
+            except Exception as e:
+                logging.warning(f"Skipping market rules for {symbol}: {e}")
+                continue
+            rules[symbol] = market_rules
+            rules[market_rules.symbol] = market_rules
+        self.rules = rules
+        self.markets = markets
+        self.loaded_at = loaded_at
+
+    def _read_cache(self) -> Optional[Tuple[Dict[str, Dict], float]]:
+        """Cached markets and the time they were written, or None if missing or stale"""
+        try:
+            if not os.path.exists(self.path):
+                return None
+            written_at = os.path.getmtime(self.path)
+            if time.time() - written_at > self.refresh_interval:
+                return None
+            with open(self.path) as f:
+                cached = json.load(f)
+            if cached.get('version') != self._version_tag():
+                return None
+            return cached['markets'], written_at
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable markets cache {self.path}: {e}")
+            return None
+
+    def _write_cache(self, markets: Dict[str, Dict]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': self._version_tag(), 'markets': markets}, f, default=str)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"Failed to write markets cache {self.path}: {e}")
@@ -0,0 +1,298 @@
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import websocket  # websocket-client
+except ImportError:  # pragma: no cover - optional dependency
+    websocket = None
+
+BINANCE_STREAM_URL = 'wss://stream.binance.com:9443/stream'
+BINANCE_TESTNET_STREAM_URL = 'wss://testnet.binance.vision/stream'
+
+
+class BinanceStreamSource:
+    """Combined kline/miniTicker WebSocket stream from Binance"""
+
+    def __init__(self, symbols: List[str], timeframe: str, testnet: bool = True,
+                 reconnect_delay: float = 5.0):
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.base_url = BINANCE_TESTNET_STREAM_URL if testnet else BINANCE_STREAM_URL
+        self.reconnect_delay = reconnect_delay
+        self._connection = None
+
+    @property
+    def url(self) -> str:
+        streams = []
+        for symbol in self.symbols:
+            name = symbol.lower()
+            streams.append(f"{name}@kline_{self.timeframe}")
+            streams.append(f"{name}@miniTicker")
+        return f"{self.base_url}?streams={'/'.join(streams)}"
+
+    def messages(self, stop_event: threading.Event) -> Iterator[str]:
+        """Yield raw text frames, reconnecting until stop_event is set"""
+        if websocket is None:
+            raise RuntimeError("websocket-client is not installed")
+
+        while not stop_event.is_set():
+            try:
+                self._connection = websocket.create_connection(self.url, timeout=30)
+                logging.info(f"Connected to Binance stream ({len(self.symbols)} symbols)")
+                while not stop_event.is_set():
+                    message = self._connection.recv()
+                    if message:
+                        yield message
+            except Exception as e:
+                if stop_event.is_set():
+                    break
+                logging.error(f"Binance stream error: {e}, reconnecting in {self.reconnect_delay}s")
+                stop_event.wait(self.reconnect_delay)
+            finally:
+                self.close()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class ReplayServer:
+    """Local stand-in for the Binance stream that replays recorded candles
+
+    Each candle is emitted as a few forming kline updates followed by the
+    closed kline and a miniTicker, using the same JSON frames as Binance so
+    MarketStream parses live and replayed data through one code path.
+    """
+
+    def __init__(self, candles: Dict[str, List[list]], timeframe: str,
+                 interval: float = 0.0, updates_per_candle: int = 3):
+        self.candles = {
+            symbol: sorted(rows, key=lambda row: row[0])
+            for symbol, rows in candles.items()
+        }
+        self.timeframe = timeframe
+        self.interval = interval
+        self.updates_per_candle = max(1, updates_per_candle)
+        self.messages_sent = 0
+
+    def _kline_frame(self, symbol: str, candle: list, closed: bool) -> str:
+        timestamp, open_, high, low, close, volume = candle[:6]
+        return json.dumps({
+            'stream': f"{symbol.lower()}@kline_{self.timeframe}",
+            'data': {
+                'e': 'kline',
+                'E': int(timestamp),
+                's': symbol,
+                'k': {
+                    't': int(timestamp),
+                    's': symbol,
+                    'i': self.timeframe,
+                    'o': str(open_),
+                    'h': str(high),
+                    'l': str(low),
+                    'c': str(close),
+                    'v': str(volume),
+                    'x': closed
+                }
+            }
+        })
+
+    def _ticker_frame(self, symbol: str, candle: list) -> str:
+        return json.dumps({
+            'stream': f"{symbol.lower()}@miniTicker",
+            'data': {
+                'e': '24hrMiniTicker',
+                'E': int(candle[0]),
+                's': symbol,
+                'c': str(candle[4]),
+                'q': str(candle[4] * candle[5] * 24)
+            }
+        })
+
+    def _frames(self) -> Iterator[str]:
+        length = max((len(rows) for rows in self.candles.values()), default=0)
+        for index in range(length):
+            for symbol, rows in self.candles.items():
+                if index >= len(rows):
+                    continue
+                timestamp, open_, high, low, close, volume = rows[index][:6]
+
+                # Forming updates move the close from open towards the final close
+                for step in range(1, self.updates_per_candle):
+                    fraction = step / self.updates_per_candle
+                    partial_close = open_ + (close - open_) * fraction
+                    partial = [
+                        timestamp, open_,
+                        max(open_, partial_close), min(open_, partial_close),
+                        partial_close, volume * fraction
+                    ]
+                    yield self._kline_frame(symbol, partial, closed=False)
+
+                yield self._kline_frame(symbol, rows[index], closed=True)
+                yield self._ticker_frame(symbol, rows[index])
+
+    def messages(self, stop_event: threading.Event) -> Iterator[str]:
+        """Yield replayed frames until exhausted or stop_event is set"""
+        for frame in self._frames():
+            if stop_event.is_set():
+                break
+            self.messages_sent += 1
+            yield frame
+            if self.interval:
+                stop_event.wait(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class MarketStream:
+    """In-memory klines and last prices kept current from a push stream"""
+
+    def __init__(self, symbols: List[str], timeframe: str, source=None,
+                 max_candles: int = 1000, testnet: bool = True):
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.timeframe = timeframe
+        self.source = source or BinanceStreamSource(self.symbols, timeframe, testnet)
+        self.max_candles = max_candles
+
+        self.klines: Dict[str, List[list]] = {}
+        self.prices: Dict[str, float] = {}
+        self.volumes: Dict[str, float] = {}
+        self.last_update: Dict[str, float] = {}
+
+        self._subscribers: List[Callable[[str, str, Dict], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def seed(self, symbol: str, ohlcv: List[list]) -> None:
+        """Initialize the kline buffer for a symbol from REST history"""
+        rows = [list(row[:6]) for row in sorted(ohlcv, key=lambda row: row[0])]
+        with self._lock:
+            self.klines[symbol] = rows[-self.max_candles:]
+            if rows:
+                self.prices.setdefault(symbol, float(rows[-1][4]))
+
+    def subscribe(self, callback: Callable[[str, str, Dict], None]) -> None:
+        """Register callback(event, symbol, data) for 'kline' and 'ticker' events"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str, str, Dict], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self) -> None:
+        """Start consuming the stream on a background thread"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='market-stream', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        self.source.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_fresh(self, symbol: str, max_age: float) -> bool:
+        """True if the stream is running and pushed an update for symbol within max_age seconds"""
+        updated = self.last_update.get(symbol)
+        return self.is_running() and updated is not None and time.time() - updated <= max_age
+
+    def get_ohlcv(self, symbol: str, limit: int = 500) -> Optional[list]:
+        """Return the latest `limit` candles, or None if the buffer is too short"""
+        with self._lock:
+            rows = self.klines.get(symbol)
+            if not rows or len(rows) < limit:
+                return None
+            return [list(row) for row in rows[-limit:]]
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        return self.prices.get(symbol)
+
+    def get_24h_volume(self, symbol: str) -> Optional[float]:
+        return self.volumes.get(symbol)
+
+    def _run(self) -> None:
+        try:
+            for message in self.source.messages(self._stop_event):
+                self.handle_message(message)
+        except Exception as e:
+            logging.error(f"Market stream stopped: {e}")
+
+    def handle_message(self, message: str) -> None:
+        """Apply one combined-stream frame to the in-memory state"""
+        try:
+            payload = json.loads(message)
+            data = payload.get('data', payload)
+            event_type = data.get('e')
+
+            if event_type == 'kline':
+                self._apply_kline(data['s'], data['k'])
+            elif event_type in ('24hrMiniTicker', '24hrTicker'):
+                self._apply_ticker(data['s'], data)
+        except Exception as e:
+            logging.error(f"Failed to handle stream message: {e}")
+
+    def _apply_kline(self, symbol: str, kline: Dict) -> None:
+        candle = [
+            int(kline['t']),
+            float(kline['o']),
+            float(kline['h']),
+            float(kline['l']),
+            float(kline['c']),
+            float(kline['v'])
+        ]
+        closed = bool(kline.get('x'))
+
+        with self._lock:
+            rows = self.klines.setdefault(symbol, [])
+            if rows and rows[-1][0] == candle[0]:
+                rows[-1] = candle
+            elif not rows or rows[-1][0] < candle[0]:
+                rows.append(candle)
+                if len(rows) > self.max_candles:
+                    del rows[:len(rows) - self.max_candles]
+            else:
+                # Stale update for a candle older than the buffer head
+                return
+            self.prices[symbol] = candle[4]
+            self.last_update[symbol] = time.time()
+
+        self._notify('kline', symbol, {
+            'candle': candle,
+            'closed': closed,
+            'timeframe': kline.get('i', self.timeframe)
+        })
+
+    def _apply_ticker(self, symbol: str, ticker: Dict) -> None:
+        price = float(ticker['c'])
+        with self._lock:
+            self.prices[symbol] = price
+            if 'q' in ticker:
+                self.volumes[symbol] = float(ticker['q'])
+            self.last_update[symbol] = time.time()
+
+        self._notify('ticker', symbol, {
+            'price': price,
+            'quote_volume': self.volumes.get(symbol)
+        })
+
+    def _notify(self, event: str, symbol: str, data: Dict) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(event, symbol, data)
+            except Exception as e:
+                logging.error(f"Stream subscriber failed: {e}")
@@ -1,9 +1,21 @@
-import pandas as pd
+import threading
+import time
 import numpy as np
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from .synthetic_market import SyntheticMarket, symbol_seed, default_base_price, to_ohlcv_rows
+
+TIMEFRAME_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+# Fixed origin of the mock time grid (2024-01-01 00:00 UTC, a Monday) so
+# candle timestamps line up with Binance's and are the same in every run.
+DEFAULT_ANCHOR_TS = 1_704_067_200_000
 
 class MockBinanceData:
-    def __init__(self):
+    # Bars generated per deterministic chunk of the mock series
+    CHUNK_BARS = 4096
+
+    def __init__(self, seed: int = 42, model: str = 'regime', anchor_ts: int = DEFAULT_ANCHOR_TS,
+                 price_timeframe: str = '1h'):
         self.mock_prices = {
             'BTCUSDT': 45000.0,
             'ETHUSDT': 3000.0
@@ -15,9 +27,20 @@ class MockBinanceData:
             'ETH': {'free': 10.0, 'used': 0.0, 'total': 10.0}
         }
 
+        self.seed = seed
+        self.anchor_ts = anchor_ts
+        self.price_timeframe = price_timeframe
+        self.market = SyntheticMarket(model=model)
+        # Log close preceding each chunk, per (symbol, timeframe)
+        self._chunk_offsets: Dict[Tuple[str, str], List[float]] = {}
+        self._offsets_lock = threading.Lock()
+        # Most recently built chunk per (symbol, timeframe): (chunk index, candles)
+        self._recent_chunks: Dict[Tuple[str, str], Tuple[int, Dict[str, np.ndarray]]] = {}
+
     def get_mock_price(self, symbol: str) -> float:
-        """Get mock current price for a symbol"""
-        return self.mock_prices.get(symbol, 0.0)
+        """Get mock current price for a symbol (close of the current bar)"""
+        rows = self.get_mock_ohlcv(symbol, 1, timeframe=self.price_timeframe)
+        return rows[-1][4] if rows else 0.0
 
     def get_mock_account(self) -> dict:
         """Get mock account information"""
@@ -27,32 +50,81 @@ class MockBinanceData:
             ]
         }
 
-    def get_mock_ohlcv(self, symbol: str, limit: int = 500) -> list:
-        """Generate mock OHLCV data"""
-        base_price = self.mock_prices.get(symbol, 1000.0)
-        timestamps = [
-            int((datetime.now() - timedelta(hours=i)).timestamp() * 1000)
-            for i in range(limit)
-        ]
-
-        # Generate mock prices with some randomness
-        np.random.seed(42)  # For reproducibility
-        prices = base_price + np.random.normal(0, base_price * 0.02, limit)
-
-        # Create mock trend patterns
-        trend = np.sin(np.linspace(0, 4*np.pi, limit)) * base_price * 0.1
-        prices += trend
-
-        ohlcv_data = []
-        for i, timestamp in enumerate(timestamps):
-            price = prices[i]
-            ohlcv_data.append([
-                timestamp,  # timestamp
-                price * 0.99,  # open
-                price * 1.01,  # high
-                price * 0.98,  # low
-                price,  # close
-                1000.0 + np.random.normal(0, 100)  # volume
-            ])
-
-        return ohlcv_data
\ No newline at end of file
+    def get_mock_ohlcv(self, symbol: str, limit: int = 500, since: Optional[int] = None,
+                       timeframe: str = '1h', now: Optional[int] = None) -> list:
+        """Generate mock OHLCV data on a fixed time grid, oldest candle first
+
+        The series for a (symbol, timeframe) is fully determined by the seed,
+        so repeated or overlapping requests return identical candles.
+        """
+        timeframe_ms = self._timeframe_ms(timeframe)
+        now_ms = int(time.time() * 1000) if now is None else now
+        last_index = (now_ms - self.anchor_ts) // timeframe_ms
+        if last_index < 0 or limit <= 0:
+            return []
+
+        if since is not None:
+            start = max(-(-(since - self.anchor_ts) // timeframe_ms), 0)
+            end = min(start + limit - 1, last_index)
+        else:
+            end = last_index
+            start = max(end - limit + 1, 0)
+        if start > end:
+            return []
+
+        candles = self._generate_range(symbol, timeframe, start, end + 1)
+        timestamps = self.anchor_ts + np.arange(start, end + 1, dtype=np.int64) * timeframe_ms
+        return to_ohlcv_rows(timestamps, candles)
+
+    def _timeframe_ms(self, timeframe: str) -> int:
+        return int(timeframe[:-1]) * TIMEFRAME_SECONDS[timeframe[-1]] * 1000
+
+    def _chunk_returns(self, symbol: str, timeframe: str, chunk: int) -> Dict[str, np.ndarray]:
+        rng = np.random.default_rng([
+            self.seed, symbol_seed(symbol), self._timeframe_ms(timeframe), chunk
+        ])
+        return self.market.generate_returns(
+            rng, 1, self.CHUNK_BARS, self._timeframe_ms(timeframe) / 3_600_000
+        )
+
+    def _chunk_offset(self, symbol: str, timeframe: str, chunk: int) -> float:
+        """Log close of the bar before `chunk`, extending the cached offsets as needed"""
+        key = (symbol, timeframe)
+        with self._offsets_lock:
+            offsets = self._chunk_offsets.get(key)
+            if offsets is None:
+                base_price = self.mock_prices.get(symbol) or default_base_price(symbol)
+                offsets = self._chunk_offsets[key] = [float(np.log(base_price))]
+
+            while len(offsets) <= chunk:
+                returns = self._chunk_returns(symbol, timeframe, len(offsets) - 1)
+                offsets.append(offsets[-1] + float(returns['log_returns'].sum()))
+            return offsets[chunk]
+
+    def _chunk_candles(self, symbol: str, timeframe: str, chunk: int) -> Dict[str, np.ndarray]:
+        """Candles of one chunk; the latest chunk per key is kept so price polls don't rebuild it"""
+        key = (symbol, timeframe)
+        recent = self._recent_chunks.get(key)
+        if recent is not None and recent[0] == chunk:
+            return recent[1]
+        returns = self._chunk_returns(symbol, timeframe, chunk)
+        offset = np.array([self._chunk_offset(symbol, timeframe, chunk)])
+        candles = self.market.build_candles(returns, offset)
+        if recent is None or chunk >= recent[0]:
+            self._recent_chunks[key] = (chunk, candles)
+        return candles
+
+    def _generate_range(self, symbol: str, timeframe: str, start: int, end: int) -> Dict[str, np.ndarray]:
+        """Candles for bar indexes [start, end) of the mock series, shape (1, bars)"""
+        first_chunk = start // self.CHUNK_BARS
+        last_chunk = (end - 1) // self.CHUNK_BARS
+
+        parts = []
+        for chunk in range(first_chunk, last_chunk + 1):
+            parts.append(self._chunk_candles(symbol, timeframe, chunk))
+
+        base = first_chunk * self.CHUNK_BARS
+        return {
+            field: np.concatenate([part[field] for part in parts], axis=1)[:, start - base:end - base]
+            for field in parts[0]
+        }
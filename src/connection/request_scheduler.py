@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+# Lanes in priority order: a waiting order is always admitted before prices,
+# and prices before history downloads.
+LANES: Tuple[str, ...] = ('order', 'price', 'history')
+
+# Binance spot request weights for the endpoints the bot uses
+REQUEST_WEIGHTS = {
+    'order': 1,
+    'account': 20,
+    'ticker': 2,
+    'tickers': 80,
+    'exchange_info': 20
+}
+
+def kline_weight(limit: int) -> int:
+    """Request weight of GET /api/v3/klines for a given limit"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class RequestScheduler:
+    """Admits exchange requests by priority lane within a per-minute weight budget
+
+    Callers block in submit() until their request is at the head of the
+    highest-priority non-empty lane and its weight fits in the sliding
+    one-minute window. A share of the budget is held back for the order lane
+    so bulk history downloads can never starve an exit order. Coroutines
+    await admit_async() instead, which queues in the same lanes without
+    holding a thread while they wait.
+    """
+
+    def __init__(self, max_weight_per_minute: int = 6000, order_reserve: float = 0.1,
+                 window: float = 60.0):
+        self.max_weight = max_weight_per_minute
+        self.order_reserve = int(max_weight_per_minute * order_reserve)
+        self.window = window
+
+        self._cond = threading.Condition()
+        self._spent: deque = deque()  # (monotonic time, weight)
+        self._used_weight = 0
+        self._queues: Dict[str, deque] = {lane: deque() for lane in LANES}
+        self._async_waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+        self._stats: Dict[str, Dict[str, float]] = {
+            lane: {'submitted': 0, 'total_wait': 0.0, 'max_wait': 0.0, 'last_wait': 0.0}
+            for lane in LANES
+        }
+
+    def submit(self, lane: str, weight: int, fn: Callable, *args, **kwargs) -> Any:
+        """Wait for admission in `lane`, then run fn(*args, **kwargs) on the caller's thread"""
+        self.admit(lane, weight)
+        return fn(*args, **kwargs)
+
+    def admit(self, lane: str, weight: int) -> None:
+        """Block until a request of `weight` in `lane` may be sent, and charge it to the window
+
+        Callers that issue the request themselves (e.g. an awaited ccxt call)
+        use this directly instead of submit().
+        """
+        ticket = object()
+        enqueued_at = time.monotonic()
+
+        with self._cond:
+            queue = self._queues[lane]
+            queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._expire(now)
+                    if self._is_next(lane, ticket) and self._fits(lane, weight):
+                        break
+                    self._cond.wait(self._retry_after(now))
+            finally:
+                queue.remove(ticket)
+            self._charge(lane, weight, enqueued_at)
+
+    async def admit_async(self, lane: str, weight: int) -> None:
+        """Awaitable admit(): waits on the event loop instead of blocking a thread"""
+        loop = asyncio.get_running_loop()
+        ticket = object()
+        enqueued_at = time.monotonic()
+
+        with self._cond:
+            queue = self._queues[lane]
+            queue.append(ticket)
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    self._expire(now)
+                    if self._is_next(lane, ticket) and self._fits(lane, weight):
+                        queue.remove(ticket)
+                        self._charge(lane, weight, enqueued_at)
+                        return
+                    waiter = (loop, loop.create_future())
+                    self._async_waiters.add(waiter)
+                    timeout = self._retry_after(now)
+                try:
+                    await asyncio.wait({waiter[1]}, timeout=timeout)
+                finally:
+                    with self._cond:
+                        self._async_waiters.discard(waiter)
+        except BaseException:
+            # Cancelled while queued: let the requests behind this one move up
+            with self._cond:
+                if ticket in queue:
+                    queue.remove(ticket)
+                    self._notify_all()
+            raise
+
+    def sync_used_weight(self, server_used_weight: Optional[int]) -> None:
+        """Reconcile with the X-MBX-USED-WEIGHT-1M header reported by Binance"""
+        if server_used_weight is None:
+            return
+        with self._cond:
+            now = time.monotonic()
+            self._expire(now)
+            missing = int(server_used_weight) - self._used_weight
+            if missing > 0:
+                self._spent.append((now, missing))
+                self._used_weight += missing
+
+    def get_metrics(self) -> Dict:
+        """Current weight usage plus queue depth and wait times per lane"""
+        with self._cond:
+            self._expire(time.monotonic())
+            lanes = {}
+            for lane in LANES:
+                stats = self._stats[lane]
+                submitted = stats['submitted']
+                lanes[lane] = {
+                    'queue_depth': len(self._queues[lane]),
+                    'submitted': int(submitted),
+                    'avg_wait': stats['total_wait'] / submitted if submitted else 0.0,
+                    'max_wait': stats['max_wait'],
+                    'last_wait': stats['last_wait']
+                }
+            return {
+                'used_weight': self._used_weight,
+                'max_weight': self.max_weight,
+                'lanes': lanes
+            }
+
+    def _charge(self, lane: str, weight: int, enqueued_at: float) -> None:
+        now = time.monotonic()
+        self._spent.append((now, weight))
+        self._used_weight += weight
+        self._record_wait(lane, now - enqueued_at)
+        self._notify_all()
+
+    def _notify_all(self) -> None:
+        """Wake blocked threads and queued coroutines to re-check their turn"""
+        self._cond.notify_all()
+        for loop, future in self._async_waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        self._async_waiters.clear()
+
+    def _expire(self, now: float) -> None:
+        while self._spent and now - self._spent[0][0] >= self.window:
+            _, weight = self._spent.popleft()
+            self._used_weight -= weight
+
+    def _is_next(self, lane: str, ticket: object) -> bool:
+        for other in LANES:
+            if other == lane:
+                return self._queues[lane][0] is ticket
+            if self._queues[other]:
+                return False
+        return False
+
+    def _fits(self, lane: str, weight: int) -> bool:
+        budget = self.max_weight if lane == 'order' else self.max_weight - self.order_reserve
+        # A request heavier than the whole budget is admitted once the window is empty
+        return self._used_weight + weight <= budget or self._used_weight == 0
+
+    def _retry_after(self, now: float) -> Optional[float]:
+        if not self._spent:
+            return None
+        return max(self._spent[0][0] + self.window - now, 0.001)
+
+    def _record_wait(self, lane: str, wait: float) -> None:
+        stats = self._stats[lane]
+        stats['submitted'] += 1
+        stats['total_wait'] += wait
+        stats['last_wait'] = wait
+        stats['max_wait'] = max(stats['max_wait'], wait)
@@ -0,0 +1,116 @@
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# (log drift, volatility) per hourly bar for the regime-switching model:
+# calm uptrend, volatile downtrend and a quiet range.
+DEFAULT_REGIMES: Tuple[Tuple[float, float], ...] = (
+    (0.0002, 0.006),
+    (-0.0002, 0.015),
+    (0.0, 0.004)
+)
+
+def symbol_seed(symbol: str, seed: int = 0) -> int:
+    """Stable per-symbol seed, independent of PYTHONHASHSEED"""
+    return zlib.crc32(symbol.encode()) ^ seed
+
+def default_base_price(symbol: str) -> float:
+    """Deterministic starting price between 0.01 and 10000 for unknown symbols"""
+    return float(10 ** (-2 + 6 * (zlib.crc32(symbol[::-1].encode()) % 10_000) / 10_000))
+
+
+class SyntheticMarket:
+    """Vectorized OHLCV generator using GBM or regime-switching GBM
+
+    Paths are generated as 2D arrays of shape (paths, bars), so a whole
+    universe is produced with a handful of NumPy passes and no Python loop
+    over candles. Drift and volatility are per hourly bar and applied to the
+    log price; other bar sizes are scaled with `timeframe_hours`.
+    """
+
+    def __init__(self, model: str = 'gbm', drift: float = 0.0, volatility: float = 0.008,
+                 regimes: Sequence[Tuple[float, float]] = DEFAULT_REGIMES,
+                 switch_probability: float = 0.01, volume_mean: float = 1000.0):
+        if model not in ('gbm', 'regime'):
+            raise ValueError(f"Unknown synthetic market model: {model}")
+        self.model = model
+        self.drift = drift
+        self.volatility = volatility
+        self.regime_drift = np.array([regime[0] for regime in regimes])
+        self.regime_volatility = np.array([regime[1] for regime in regimes])
+        self.switch_probability = switch_probability
+        self.volume_mean = volume_mean
+
+    def _drift_and_volatility(self, rng: np.random.Generator,
+                              shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        if self.model == 'gbm':
+            return np.float64(self.drift), np.float64(self.volatility)
+
+        # Markov regime switching: every switch starts a new segment whose
+        # regime is drawn at random; segments are expanded with take_along_axis.
+        switches = rng.random(shape) < self.switch_probability
+        segment = np.cumsum(switches, axis=1)
+        choices = rng.integers(0, len(self.regime_drift), size=(shape[0], shape[1] + 1))
+        regime = np.take_along_axis(choices, segment, axis=1)
+        return self.regime_drift[regime], self.regime_volatility[regime]
+
+    def generate_returns(self, rng: np.random.Generator, n_paths: int, n_bars: int,
+                         timeframe_hours: float = 1.0) -> Dict[str, np.ndarray]:
+        """Log returns plus the noise needed to build candles, shape (paths, bars)"""
+        shape = (n_paths, n_bars)
+        drift, volatility = self._drift_and_volatility(rng, shape)
+        drift = drift * timeframe_hours
+        volatility = volatility * np.sqrt(timeframe_hours)
+        shocks = rng.standard_normal(shape)
+        return {
+            'log_returns': drift + volatility * shocks,
+            'wick_noise': np.abs(rng.standard_normal((2,) + shape)) * (volatility * 0.5),
+            'volume_noise': rng.lognormal(0.0, 0.5, shape)
+        }
+
+    def build_candles(self, returns: Dict[str, np.ndarray], start_log_price: np.ndarray) -> Dict[str, np.ndarray]:
+        """Turn log returns into open/high/low/close/volume arrays
+
+        `start_log_price` is the log close of the bar preceding the first bar
+        of each path, shape (paths,).
+        """
+        log_returns = returns['log_returns']
+        log_close = start_log_price[:, None] + np.cumsum(log_returns, axis=1)
+        log_open = np.concatenate([start_log_price[:, None], log_close[:, :-1]], axis=1)
+
+        close = np.exp(log_close)
+        open_ = np.exp(log_open)
+        high = np.maximum(open_, close) * (1 + returns['wick_noise'][0])
+        low = np.minimum(open_, close) * (1 - returns['wick_noise'][1])
+        volume = self.volume_mean * returns['volume_noise'] * (1 + 10 * np.abs(log_returns))
+
+        return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+    def generate_universe(self, n_symbols: int, n_bars: int, timeframe_ms: int = 3_600_000,
+                          start_ts: int = 1_704_067_200_000, seed: int = 42,
+                          start_prices: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Generate a synthetic universe in one pass for load testing
+
+        Returns 'timestamp' of shape (bars,) and OHLCV arrays of shape
+        (symbols, bars), plus 'symbols' with generated names.
+        """
+        rng = np.random.default_rng(seed)
+        if start_prices is None:
+            start_prices = 10 ** rng.uniform(-2, 4, n_symbols)
+
+        candles = self.build_candles(
+            self.generate_returns(rng, n_symbols, n_bars, timeframe_ms / 3_600_000),
+            np.log(np.asarray(start_prices, dtype=float))
+        )
+        candles['timestamp'] = start_ts + np.arange(n_bars, dtype=np.int64) * timeframe_ms
+        candles['symbols'] = np.array([f"SYN{i}USDT" for i in range(n_symbols)])
+        return candles
+
+
+def to_ohlcv_rows(timestamps: np.ndarray, candles: Dict[str, np.ndarray], path: int = 0) -> List[list]:
+    """Convert one path of generated arrays into ccxt-style OHLCV rows"""
+    stacked = np.column_stack([
+        candles['open'][path], candles['high'][path], candles['low'][path],
+        candles['close'][path], candles['volume'][path]
+    ])
+    return [[int(ts)] + row for ts, row in zip(timestamps.tolist(), stacked.tolist())]
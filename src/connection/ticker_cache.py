@@ -0,0 +1,56 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class TickerCache:
+    """Thread-safe snapshot of all tickers refreshed by one bulk request"""
+
+    def __init__(self, fetch_tickers: Callable[[], Dict[str, Dict]], ttl: float = 10.0):
+        self._fetch_tickers = fetch_tickers
+        self.ttl = ttl
+        self._snapshot: Dict[str, Dict] = {}
+        self._updated_at = float('-inf')  # never fetched: stale regardless of monotonic() origin
+        self._lock = threading.Lock()
+        self.refresh_count = 0
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._updated_at >= self.ttl
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Return the cached ticker for a market id ('BTCUSDT') or unified symbol ('BTC/USDT')"""
+        if self.is_stale():
+            self.refresh()
+        return self._snapshot.get(symbol)
+
+    def refresh(self) -> None:
+        """Replace the snapshot with a fresh bulk fetch
+
+        Concurrent callers wait on the lock and reuse the snapshot fetched by
+        whichever thread got there first instead of issuing their own request.
+        """
+        with self._lock:
+            if not self.is_stale():
+                return
+            try:
+                tickers = self._fetch_tickers()
+            except Exception as e:
+                # Keep serving the previous snapshot until the next TTL expiry
+                self._updated_at = time.monotonic()
+                logging.error(f"Failed to refresh ticker snapshot: {e}")
+                return
+
+            snapshot = {}
+            for symbol, ticker in tickers.items():
+                info = ticker.get('info') or {}
+                market_id = info.get('symbol') or symbol.replace('/', '')
+                snapshot[symbol] = ticker
+                snapshot[market_id] = ticker
+
+            self._snapshot = snapshot
+            self._updated_at = time.monotonic()
+            self.refresh_count += 1
+
+    def invalidate(self) -> None:
+        self._updated_at = float('-inf')
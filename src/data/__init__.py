@@ -1,4 +1,9 @@
 """Initialize data package"""
-from .data_collector import DataCollector
+from lazy_exports import lazy_exports
 
-__all__ = ['DataCollector']
\ No newline at end of file
+_EXPORTS = {
+    'DataCollector': '.data_collector'
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
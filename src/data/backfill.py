@@ -0,0 +1,128 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+from connection.binance_client import BinanceClient
+from config import Config
+from .candle_buffer import timeframe_to_ms
+from .candle_store import CandleStore
+
+class BackfillCheckpoint:
+    """ملف تقدم لمهمة تعبئة حتى يمكن استئنافها بعد الانقطاع"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.completed: Set[int] = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.completed = set(json.load(f).get('completed_pages', []))
+
+    def mark_done(self, page_start: int) -> None:
+        with self._lock:
+            self.completed.add(page_start)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'completed_pages': sorted(self.completed)}, f)
+            os.replace(tmp_path, self.path)
+
+
+class HistoricalBackfill:
+    """تحميل متوازٍ لبيانات تاريخية طويلة على شكل صفحات ضمن حدود وزن الطلبات
+
+    يتم تقسيم المدى الزمني إلى صفحات بحجم `page_limit` شمعة، وتجلب الصفحات
+    بشكل متوازٍ عبر BinanceClient (الذي ينظم الوزن عبر مسار history) ثم تكتب
+    في CandleStore، ويسجل كل صفحة مكتملة في ملف التقدم. الصفحة التي يفشل جلبها
+    لا تكتب ولا تسجل، فلا تختلط شموع وهمية بالبيانات الحقيقية. لا تعمل التعبئة
+    مع عميل في وضع البيانات الوهمية لأن المخزن يقرأ لاحقاً كتاريخ حقيقي.
+    """
+
+    def __init__(self, client: BinanceClient, store: Optional[CandleStore] = None,
+                 checkpoint_dir: Optional[str] = None, max_workers: Optional[int] = None,
+                 page_limit: int = 1000):
+        if getattr(client, 'use_mock', False):
+            raise RuntimeError("لا يمكن تعبئة المخزن المحلي ببيانات وهمية، تحقق من مفاتيح API")
+        self.client = client
+        self.store = store or CandleStore()
+        self.checkpoint_dir = checkpoint_dir or os.path.join(Config.LOCAL_DATA_DIR, 'backfill')
+        self.max_workers = max_workers or Config.BACKFILL_WORKERS
+        self.page_limit = page_limit
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+    def plan_pages(self, timeframe: str, start: int, end: int) -> List[int]:
+        """بدايات الصفحات (ms) التي تغطي المدى [start, end)"""
+        step = timeframe_to_ms(timeframe)
+        aligned_start = start - start % step
+        return list(range(aligned_start, end, self.page_limit * step))
+
+    def run(self, symbols: List[str], timeframe: str, start: int, end: int) -> Dict[str, int]:
+        """تنفيذ التعبئة وإرجاع عدد الشموع المكتوبة لكل عملة"""
+        pages = self.plan_pages(timeframe, start, end)
+        checkpoints = {
+            symbol: BackfillCheckpoint(os.path.join(
+                self.checkpoint_dir, f"{symbol}_{timeframe}_{start}_{end}.json"
+            ))
+            for symbol in symbols
+        }
+        written = {symbol: 0 for symbol in symbols}
+
+        tasks = [
+            (symbol, page_start)
+            for symbol in symbols
+            for page_start in pages
+            if page_start not in checkpoints[symbol].completed
+        ]
+        skipped = len(symbols) * len(pages) - len(tasks)
+        logging.info(f"بدء التعبئة التاريخية: {len(tasks)} صفحة ({skipped} مكتملة مسبقاً)")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._fetch_page, symbol, timeframe, page_start, end): (symbol, page_start)
+                for symbol, page_start in tasks
+            }
+            for future in as_completed(futures):
+                symbol, page_start = futures[future]
+                try:
+                    written[symbol] += future.result()
+                    checkpoints[symbol].mark_done(page_start)
+                except Exception as e:
+                    logging.error(f"خطأ في تعبئة صفحة {symbol} عند {page_start}: {e}")
+
+        logging.info(f"اكتملت التعبئة التاريخية: {written}")
+        return written
+
+    def _fetch_page(self, symbol: str, timeframe: str, page_start: int, end: int) -> int:
+        page_end = min(page_start + self.page_limit * timeframe_to_ms(timeframe), end)
+        # الفشل يرفع استثناءً فلا تكتب الصفحة ولا تسجل كمكتملة، ويعاد جلبها عند الاستئناف
+        ohlcv = self.client.fetch_ohlcv(symbol, timeframe, self.page_limit, since=page_start, raise_errors=True)
+        rows = [row for row in ohlcv if page_start <= row[0] < page_end]
+        return self.store.write(symbol, timeframe, rows)
+
+
+def _parse_date(value: str) -> int:
+    return int(datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="تعبئة البيانات التاريخية في المخزن المحلي")
+    parser.add_argument('--symbols', nargs='+', default=Config.TRADING_PAIRS)
+    parser.add_argument('--timeframe', default=Config.TIMEFRAME)
+    parser.add_argument('--start', required=True, help='YYYY-MM-DD')
+    parser.add_argument('--end', required=True, help='YYYY-MM-DD')
+    parser.add_argument('--workers', type=int, default=Config.BACKFILL_WORKERS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        backfill = HistoricalBackfill(BinanceClient(), max_workers=args.workers)
+    except RuntimeError as e:
+        logging.error(f"تعذر بدء التعبئة التاريخية: {e}")
+        sys.exit(1)
+    backfill.run(args.symbols, args.timeframe, _parse_date(args.start), _parse_date(args.end))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_UNITS_MS = {
+    'm': 60_000,
+    'h': 3_600_000,
+    'd': 86_400_000,
+    'w': 604_800_000,
+    'M': 2_592_000_000
+}
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """تحويل الإطار الزمني (مثل '1h' أو '15m') إلى ميلي ثانية"""
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS_MS[timeframe[-1]]
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+class CandleBuffer:
+    """سجل شموع OHLCV مرتب زمنياً لزوج (عملة، إطار زمني) في مصفوفات NumPy محجوزة مسبقاً
+
+    الطوابع الزمنية في مصفوفة int64 والأسعار والحجم في مصفوفة (n, 5) من النوع
+    المحدد (float64 افتراضياً أو float32 لتوفير الذاكرة). تحجز مساحة إضافية بعد
+    السعة، وعند امتلائها تنقل آخر الشموع إلى البداية مرة واحدة، فتبقى الشموع
+    متجاورة في الذاكرة ويمكن إرجاعها كعروض دون نسخ.
+    """
+
+    def __init__(self, capacity: int = 1000, dtype=np.float64):
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        size = capacity + max(capacity // 4, 16)
+        self._timestamps = np.empty(size, dtype=np.int64)
+        self._values = np.empty((size, len(OHLCV_COLUMNS)), dtype=self.dtype)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def nbytes(self) -> int:
+        return self._timestamps.nbytes + self._values.nbytes
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._timestamps[self._end - 1]) if self._end > self._start else None
+
+    def merge(self, ohlcv) -> int:
+        """دمج شموع جديدة مع استبدال الشمعة التي ما زالت قيد التكوين
+
+        يتم حذف كل الشموع المخزنة ابتداءً من أول طابع زمني في البيانات الجديدة
+        ثم إلحاق البيانات الجديدة، ويعاد عدد الشموع المضافة أو المحدثة.
+        """
+        if len(ohlcv) == 0:
+            return 0
+
+        rows = np.asarray(ohlcv, dtype=np.float64)
+        rows = rows.reshape(len(rows), -1)[:, :6]
+        timestamps = rows[:, 0].astype(np.int64)
+        if len(rows) > 1:
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, rows = timestamps[order], rows[order]
+            # عند تكرار الطابع الزمني تبقى آخر نسخة
+            keep = np.append(timestamps[1:] != timestamps[:-1], True)
+            timestamps, rows = timestamps[keep], rows[keep]
+
+        count = len(timestamps)
+        if count >= self.capacity:
+            self._start, position = 0, 0
+            timestamps, rows = timestamps[-self.capacity:], rows[-self.capacity:]
+            count = self.capacity
+        else:
+            position = self._start + int(np.searchsorted(
+                self._timestamps[self._start:self._end], timestamps[0], side='left'))
+            drop = max(position - self._start + count - self.capacity, 0)
+            self._start += drop
+            if position + count > len(self._timestamps):
+                kept = position - self._start
+                self._timestamps[:kept] = self._timestamps[self._start:position]
+                self._values[:kept] = self._values[self._start:position]
+                self._start, position = 0, kept
+
+        self._timestamps[position:position + count] = timestamps
+        self._values[position:position + count] = rows[:, 1:]
+        self._end = position + count
+        return len(ohlcv)
+
+    def arrays(self, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """آخر `limit` شمعة كعرضين للقراءة فقط: (الطوابع الزمنية، قيم OHLCV)"""
+        start = self._start if limit is None else max(self._end - limit, self._start)
+        return (_readonly(self._timestamps[start:self._end]),
+                _readonly(self._values[start:self._end]))
+
+    def frame(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """آخر `limit` شمعة كـ DataFrame يشير إلى نفس الذاكرة دون نسخ"""
+        timestamps, values = self.arrays(limit)
+        index = pd.DatetimeIndex(timestamps.view('datetime64[ms]'), name='timestamp', copy=False)
+        return pd.DataFrame(values, index=index, columns=OHLCV_COLUMNS, copy=False)
+
+    def tail(self, limit: int) -> List[list]:
+        """آخر `limit` شمعة"""
+        timestamps, values = self.arrays(limit)
+        return [[timestamp, *row] for timestamp, row in zip(timestamps.tolist(), values.tolist())]
+
+    def since(self, timestamp: Optional[int]) -> List[list]:
+        """الشموع ابتداءً من الطابع `timestamp` (كل السجل إن كان None)"""
+        timestamps, values = self.arrays()
+        start = 0 if timestamp is None else int(np.searchsorted(timestamps, timestamp, side='left'))
+        return [[t, *row] for t, row in zip(timestamps[start:].tolist(), values[start:].tolist())]
+
+
+class CandleBufferPool:
+    """سجلات الشموع لكل (عملة، إطار زمني) ضمن ميزانية ذاكرة إجمالية
+
+    تعامل كقاموس. عند تجاوز الميزانية تحذف السجلات الأقدم استخداماً (LRU)، ويتم
+    إبلاغ `on_evict` بالمفتاح المحذوف لتحرير الحالات المرتبطة به.
+    """
+
+    def __init__(self, max_bytes: int, dtype=np.float64,
+                 on_evict: Optional[Callable[[Hashable], None]] = None):
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self.on_evict = on_evict
+        self.evictions = 0
+        self._buffers: 'OrderedDict[Hashable, CandleBuffer]' = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._buffers
+
+    def __getitem__(self, key: Hashable) -> CandleBuffer:
+        buffer = self.get(key)
+        if buffer is None:
+            raise KeyError(key)
+        return buffer
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(self, key: Hashable, default: Optional[CandleBuffer] = None) -> Optional[CandleBuffer]:
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                return default
+            self._buffers.move_to_end(key)
+            return buffer
+
+    def create(self, key: Hashable, capacity: int) -> CandleBuffer:
+        """إنشاء سجل جديد (أو استبدال القائم) ثم إخلاء السجلات الباردة عند الحاجة"""
+        buffer = CandleBuffer(capacity, self.dtype)
+        evicted = []
+        with self._lock:
+            previous = self._buffers.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+            self._buffers[key] = buffer
+            self._nbytes += buffer.nbytes
+            # لا يحذف السجل الذي أنشئ للتو حتى لو تجاوز الميزانية وحده
+            while self._nbytes > self.max_bytes and len(self._buffers) > 1:
+                cold_key, cold = self._buffers.popitem(last=False)
+                self._nbytes -= cold.nbytes
+                self.evictions += 1
+                evicted.append(cold_key)
+
+        if self.on_evict is not None:
+            for cold_key in evicted:
+                self.on_evict(cold_key)
+        return buffer
+
+    def pop(self, key: Hashable, default: Optional[CandleBuffer] = None) -> Optional[CandleBuffer]:
+        with self._lock:
+            buffer = self._buffers.pop(key, None)
+            if buffer is None:
+                return default
+            self._nbytes -= buffer.nbytes
+            return buffer
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._buffers)
+
+    def stats(self) -> dict:
+        return {'buffers': len(self._buffers), 'bytes': self._nbytes,
+                'max_bytes': self.max_bytes, 'evictions': self.evictions}
@@ -0,0 +1,170 @@
+import os
+import struct
+import threading
+from typing import Dict, Optional, Tuple
+import numpy as np
+from config import Config
+
+# ترويسة الملف: التوقيع، الإصدار، عدد الأعمدة، عدد الصفوف الصالحة
+MAGIC = b'CNDL'
+VERSION = 1
+COLUMNS = 6  # timestamp, open, high, low, close, volume
+HEADER = struct.Struct('<4sIIQ')
+HEADER_SIZE = 64
+ROW_SIZE = COLUMNS * 8
+MIN_ROWS = 1024  # أقل سعة محجوزة للملف؛ تتضاعف عند الامتلاء
+
+def _readonly_copy(rows: np.ndarray) -> np.ndarray:
+    rows = np.array(rows)
+    rows.flags.writeable = False
+    return rows
+
+class _Series:
+    """ملف شموع واحد مفتوح بذاكرة مُعيَّنة (memmap) للقراءة"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.inode: Optional[int] = None
+        self.capacity = 0
+        self.data: Optional[np.ndarray] = None
+
+    def view(self) -> np.ndarray:
+        """كل الصفوف الصالحة كعرض للقراءة فقط على الملف"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return np.empty((0, COLUMNS))
+
+        with open(self.path, 'rb') as f:
+            magic, version, columns, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or columns != COLUMNS:
+            raise ValueError(f"ملف شموع غير متوافق: {self.path}")
+
+        capacity = (stat.st_size - HEADER_SIZE) // ROW_SIZE
+        if self.data is None or stat.st_ino != self.inode or capacity != self.capacity:
+            # إعادة الربط فقط عند إعادة كتابة الملف أو تكبيره
+            self.inode, self.capacity = stat.st_ino, capacity
+            self.data = np.memmap(self.path, dtype=np.float64, mode='r', offset=HEADER_SIZE,
+                                  shape=(capacity, COLUMNS)) if capacity else None
+        if self.data is None:
+            return np.empty((0, COLUMNS))
+        return self.data[:count]
+
+
+class CandleStore:
+    """مخزن محلي للشموع على القرص بملف لكل (عملة، إطار زمني)
+
+    كل ملف يبدأ بترويسة صغيرة تحمل عدد الصفوف، تليها صفوف float64 بالأعمدة
+    [timestamp, open, high, low, close, volume] مرتبة زمنياً وبدون تكرار. الشموع
+    الأحدث تلحق بنهاية الملف (وتستبدل الشمعة الأخيرة إن كانت قيد التكوين)، وفي
+    الحالات الأخرى يعاد دمج الملف وكتابته ذرياً. القراءة عبر memmap وترجع عروضاً
+    دون نسخ، والطابع الزمني (العمود الأول المرتب) هو فهرس البحث الثنائي.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(Config.LOCAL_DATA_DIR, 'candles')
+        os.makedirs(self.root, exist_ok=True)
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, f"{symbol}_{timeframe}.candles")
+
+    def _lock(self, symbol: str, timeframe: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, timeframe), threading.Lock())
+
+    def _get_series(self, symbol: str, timeframe: str) -> _Series:
+        with self._locks_guard:
+            key = (symbol, timeframe)
+            if key not in self._series:
+                self._series[key] = _Series(self._path(symbol, timeframe))
+            return self._series[key]
+
+    def write(self, symbol: str, timeframe: str, ohlcv) -> int:
+        """دمج شموع جديدة مع المخزنة، والشمعة الأحدث تستبدل القديمة لنفس الطابع الزمني"""
+        rows = np.asarray(ohlcv, dtype=np.float64).reshape(-1, COLUMNS)
+        if not len(rows):
+            return 0
+
+        series = self._get_series(symbol, timeframe)
+        with self._lock(symbol, timeframe):
+            new_rows = self._dedup(rows)
+            existing = series.view()
+            count = len(existing)
+
+            # الحالة الشائعة: شموع أحدث فقط، مع استبدال الشمعة الأخيرة على الأكثر
+            position = int(np.searchsorted(existing[:, 0], new_rows[0, 0], side='left')) if count else 0
+            if position == count or (position == count - 1 and existing[-1, 0] == new_rows[0, 0]):
+                self._append(series.path, position, new_rows)
+            else:
+                self._rewrite(series.path, self._dedup(np.concatenate([existing, new_rows])))
+            return len(rows)
+
+    def read(self, symbol: str, timeframe: str, start: Optional[int] = None,
+             end: Optional[int] = None) -> np.ndarray:
+        """قراءة الشموع ضمن المدى [start, end) بالميلي ثانية للقراءة فقط
+
+        الصفوف المثبتة ترجع كعرض على الملف دون نسخ. الشمعة الأخيرة قد تعاد كتابتها
+        في مكانها (قيد التكوين)، فإذا شملها المدى ترجع نسخة تؤخذ تحت القفل.
+        """
+        series = self._get_series(symbol, timeframe)
+        with self._lock(symbol, timeframe):
+            data = series.view()
+            if not len(data):
+                return data
+            lo = 0 if start is None else np.searchsorted(data[:, 0], start, side='left')
+            hi = len(data) if end is None else np.searchsorted(data[:, 0], end, side='left')
+            if hi < len(data):
+                return data[lo:hi]
+            return _readonly_copy(data[lo:hi])
+
+    def tail(self, symbol: str, timeframe: str, limit: int) -> np.ndarray:
+        """آخر `limit` شمعة مخزنة (نسخة متسقة تؤخذ تحت القفل)"""
+        series = self._get_series(symbol, timeframe)
+        with self._lock(symbol, timeframe):
+            data = series.view()
+            return _readonly_copy(data[max(len(data) - limit, 0):])
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        series = self._get_series(symbol, timeframe)
+        with self._lock(symbol, timeframe):
+            data = series.view()
+            return int(data[-1, 0]) if len(data) else None
+
+    @staticmethod
+    def _dedup(rows: np.ndarray) -> np.ndarray:
+        """الترتيب مع الإبقاء على آخر نسخة لكل طابع زمني"""
+        order = np.argsort(rows[:, 0], kind='stable')
+        rows = rows[order]
+        keep = np.append(rows[1:, 0] != rows[:-1, 0], True)
+        return rows[keep]
+
+    @staticmethod
+    def _append(path: str, position: int, rows: np.ndarray) -> None:
+        """كتابة الصفوف ابتداءً من `position` ثم تحديث العدد في الترويسة"""
+        new_count = position + len(rows)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, COLUMNS, 0).ljust(HEADER_SIZE, b'\0'))
+
+        with open(path, 'r+b') as f:
+            capacity = (os.fstat(f.fileno()).st_size - HEADER_SIZE) // ROW_SIZE
+            if new_count > capacity:
+                f.truncate(HEADER_SIZE + max(new_count, capacity * 2, MIN_ROWS) * ROW_SIZE)
+            f.seek(HEADER_SIZE + position * ROW_SIZE)
+            f.write(rows.tobytes())
+            f.flush()
+            # العدد يكتب أخيراً فلا تظهر صفوف غير مكتملة بعد انقطاع مفاجئ
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, COLUMNS, new_count))
+
+    @staticmethod
+    def _rewrite(path: str, rows: np.ndarray) -> None:
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        CandleStore._append(tmp_path, 0, rows)
+        os.replace(tmp_path, path)
+
@@ -1,18 +1,55 @@
+import asyncio
+import threading
+import time
 import pandas as pd
 import numpy as np
-from typing import Optional, List, Dict, Tuple
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, FrozenSet, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from connection.binance_client import BinanceClient
+from connection.async_binance_client import AsyncBinanceClient
 from config import Config
 from database.models import DatabaseManager
+from .candle_buffer import CandleBufferPool, timeframe_to_ms
+from .candle_store import CandleStore
+from .trend import analyze_trend
+from .incremental_indicators import IndicatorEngine
+from .indicator_cache import IndicatorCache, compute_indicators
+from .panel import MarketPanel
+from .quality import DataQualityMonitor, repair_ohlcv
+from .resampler import TimeframeResampler
 import logging
-import pandas_ta as ta
 
 class DataCollector:
-    def __init__(self, binance_client: BinanceClient, db_manager: DatabaseManager):
+    INDICATOR_COLUMNS = [
+        'ADX', 'DIplus', 'DIminus', 'EMA_9', 'EMA_21', 'SMA_50', 'SMA_200', 'RSI',
+        'MACD', 'MACD_Signal', 'BB_upper', 'BB_middle', 'BB_lower', 'Volume_MA', 'OBV', 'MFI'
+    ]
+
+    def __init__(self, binance_client: BinanceClient, db_manager: DatabaseManager,
+                 indicator_cache: Optional[IndicatorCache] = None,
+                 candle_store: Optional[CandleStore] = None):
         self.client = binance_client
         self.db_manager = db_manager
+        self.indicator_cache = indicator_cache or IndicatorCache()
+        # لا تحفظ الشموع الوهمية حتى لا تختلط بالبيانات الحقيقية على القرص
+        if candle_store is None and Config.PERSIST_CANDLES and not binance_client.use_mock:
+            candle_store = CandleStore()
+        self.candle_store = candle_store
+        self.data_quality = DataQualityMonitor()
+        # طوابع الشموع المضافة لملء الفجوات في كل سجل؛ تبقى في الذاكرة ولا تحفظ أبداً
+        self._filled_bars: Dict[Tuple[str, str], FrozenSet[int]] = {}
         self.symbol_data = {}
+        self.candle_buffers = CandleBufferPool(
+            int(Config.CANDLE_MEMORY_BUDGET_MB * 1024 * 1024),
+            dtype=Config.CANDLE_BUFFER_DTYPE,
+            on_evict=self._on_buffer_evicted
+        )
+        self.indicator_engine = IndicatorEngine(history=Config.CANDLE_BUFFER_SIZE)
+        self._analysis_pool: Optional[ProcessPoolExecutor] = None
+        self.resamplers: Dict[Tuple[str, str, str], TimeframeResampler] = {}
+        # أقفال لكل مفتاح: خيط البث وخيوط الجلب يحدثان نفس الحالات
+        self._locks: Dict[Tuple[str, ...], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
         self.trend_thresholds = {
             'strong_uptrend': 0.8,
             'uptrend': 0.6,
@@ -20,101 +57,382 @@ class DataCollector:
             'downtrend': 0.3
         }
 
+    def _lock(self, *key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
     def fetch_multiple_symbols(self, symbols: List[str], interval: str, limit: int = 500) -> Dict[str, pd.DataFrame]:
-        """جلب البيانات التاريخية لعدة عملات باستخدام threading"""
+        """جلب وتحليل وحفظ بيانات عدة عملات عبر خط معالجة متداخل
+
+        المراحل: جلب بعدد محدود من الخيوط، ثم التحليل في مرحلة مستقلة (خيوط
+        تحليل مع المؤشرات التزايدية، وعمليات منفصلة عند إعادة الحساب الكامل)، ثم
+        الحفظ في خيط مستقل. تعالج كل نتيجة فور اكتمالها، ولا يحلل خيط التنسيق شيئاً.
+        مع Config.ASYNC_FETCH يتم الجلب عبر asyncio بدلاً من خيوط الجلب.
+        """
+        if Config.ASYNC_FETCH:
+            return asyncio.run(self.fetch_multiple_symbols_async(symbols, interval, limit))
         try:
-            # استخدام ThreadPoolExecutor لجلب البيانات بشكل متوازي
-            with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
-                # تنفيذ عمليات الجلب بشكل متوازي
-                future_to_symbol = {
-                    executor.submit(self.fetch_historical_data, symbol, interval, limit): symbol 
+            results = {}
+            pool = self._get_analysis_pool()
+            fetch_workers = max(1, min(Config.FETCH_WORKERS, len(symbols)))
+            analysis_workers = max(1, min(Config.ANALYSIS_THREADS, len(symbols)))
+
+            with ThreadPoolExecutor(max_workers=fetch_workers) as fetchers, \
+                    ThreadPoolExecutor(max_workers=analysis_workers, thread_name_prefix='analysis') as analyzers, \
+                    ThreadPoolExecutor(max_workers=1) as writer:
+                pending: Dict[Future, Tuple[str, str]] = {
+                    fetchers.submit(self.fetch_historical_data, symbol, interval, limit): ('fetch', symbol)
                     for symbol in symbols
                 }
 
-                results = {}
-                for future in future_to_symbol:
-                    symbol = future_to_symbol[future]
-                    try:
-                        df = future.result()
-                        if df is not None:
-                            # إضافة المؤشرات الفنية وتحليل الاتجاه
-                            df = self.add_technical_indicators(df)
-                            df = self.analyze_market_trend(df)
-                            results[symbol] = df
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, symbol = pending.pop(future)
+                        try:
+                            if stage == 'fetch':
+                                df = future.result()
+                                if df is None:
+                                    continue
+                                if pool is None:
+                                    analysis = analyzers.submit(self._analyze_symbol, symbol, df, interval)
+                                    pending[analysis] = ('analyze', symbol)
+                                else:
+                                    analysis = pool.submit(analyze_symbol_frame, df, self.trend_thresholds)
+                                    pending[analysis] = ('recompute', symbol)
+                                continue
+                            elif stage == 'recompute':
+                                df, indicators = future.result()
+                                self.indicator_cache.put(symbol, interval, df, indicators)
+                            else:
+                                df = future.result()
 
-                            # حفظ البيانات في قاعدة البيانات
-                            self.db_manager.save_market_data(symbol, {
-                                'data': df.to_dict(orient='records'),
-                                'interval': interval,
-                                'indicators': self._get_latest_indicators(df)
-                            })
-                            logging.info(f"تم جلب وتحليل بيانات {symbol} بنجاح")
-                    except Exception as e:
-                        logging.error(f"خطأ في جلب بيانات {symbol}: {e}")
+                            results[symbol] = df
+                            writer.submit(self._save_symbol_data, symbol, df, interval)
+                        except Exception as e:
+                            logging.error(f"خطأ في معالجة بيانات {symbol}: {e}")
 
-                return results
+            return results
 
         except Exception as e:
             logging.error(f"خطأ في جلب البيانات المتعددة: {e}")
             return {}
 
+    def _get_analysis_pool(self) -> Optional[ProcessPoolExecutor]:
+        """مجمع العمليات للتحليل الكامل (INCREMENTAL_INDICATORS=False)
+
+        المؤشرات التزايدية تحفظ حالتها في هذه العملية، فتحلل في خيوط التحليل بدلاً
+        من المجمع ولا يتم إنشاؤه.
+        """
+        if Config.INCREMENTAL_INDICATORS or Config.ANALYSIS_PROCESSES <= 1:
+            return None
+        if self._analysis_pool is None:
+            self._analysis_pool = ProcessPoolExecutor(max_workers=Config.ANALYSIS_PROCESSES)
+        return self._analysis_pool
+
+    def close(self) -> None:
+        """إيقاف مجمع عمليات التحليل"""
+        if self._analysis_pool is not None:
+            self._analysis_pool.shutdown(wait=True)
+            self._analysis_pool = None
+
     def fetch_historical_data(self, symbol: str, interval: str, limit: int = 500) -> Optional[pd.DataFrame]:
-        """جلب البيانات التاريخية من Binance"""
+        """جلب البيانات التاريخية من Binance كنسخة مستقلة عن سجل الذاكرة"""
         try:
-            ohlcv = self.client.fetch_ohlcv(symbol, interval, limit)
+            since, request_limit = self._plan_sync(symbol, interval, limit)
+            # الفشل يرفع استثناءً بدلاً من شموع وهمية حتى لا تدخل السجل أو تحفظ على القرص
+            ohlcv = self.client.fetch_ohlcv(symbol, interval, request_limit, since=since, raise_errors=True)
+            # العرض يتغير مع كل دمج أو ضغط للسجل وهو للقراءة فقط، فيعاد للمستدعي نسخة
+            return self._apply_sync(symbol, interval, limit, since, ohlcv).copy()
 
-            df = pd.DataFrame(ohlcv, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume'
-            ])
+        except Exception as e:
+            logging.error(f"خطأ في جلب البيانات التاريخية: {e}")
+            return None
 
-            # تحويل البيانات الرقمية
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-            df[numeric_columns] = df[numeric_columns].astype(float)
+    async def fetch_multiple_symbols_async(self, symbols: List[str], interval: str, limit: int = 500,
+                                           async_client: Optional[AsyncBinanceClient] = None) -> Dict[str, pd.DataFrame]:
+        """جلب البيانات التاريخية لعدة عملات باستخدام asyncio عبر جلسة HTTP واحدة"""
+        owns_client = async_client is None
+        # نفس ميزانية أوزان الطلبات المستخدمة في العميل المتزامن
+        client = async_client or AsyncBinanceClient(scheduler=getattr(self.client, 'scheduler', None),
+                                                     market_metadata=getattr(self.client, 'market_metadata', None))
+        try:
+            plans = {symbol: self._plan_sync(symbol, interval, limit) for symbol in symbols}
+            ohlcv_list = await asyncio.gather(
+                *(client.fetch_ohlcv(symbol, interval, plans[symbol][1], since=plans[symbol][0],
+                                     raise_errors=True)
+                  for symbol in symbols),
+                return_exceptions=True
+            )
 
-            # تحويل الطابع الزمني
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            results = {}
+            for symbol, ohlcv in zip(symbols, ohlcv_list):
+                try:
+                    if isinstance(ohlcv, Exception):
+                        raise ohlcv
+                    df = self._apply_sync(symbol, interval, limit, plans[symbol][0], ohlcv).copy()
+                    results[symbol] = self._process_symbol_data(symbol, df, interval)
+                except Exception as e:
+                    logging.error(f"خطأ في جلب بيانات {symbol}: {e}")
 
-            return df
+            return results
 
         except Exception as e:
-            logging.error(f"خطأ في جلب البيانات التاريخية: {e}")
+            logging.error(f"خطأ في جلب البيانات المتعددة: {e}")
+            return {}
+        finally:
+            if owns_client:
+                await client.close()
+
+    def get_resampled_data(self, symbol: str, timeframe: str, base_interval: Optional[str] = None,
+                           limit: int = 500) -> Optional[pd.DataFrame]:
+        """بيانات إطار أعلى مجمعة محلياً من سجل الإطار الأساسي مع مؤشراتها، دون طلبات إضافية
+
+        تغذى المجمعات بالشموع الأساسية الجديدة منذ آخر استدعاء فقط. إذا كان السجل
+        الأساسي أقصر من أن يغطي `limit` شمعة من الإطار الأعلى (مثل 1d من 1000 شمعة
+        1h) تجلب الشموع الأقدم من المنصة مرة واحدة لكل مجمع، ثم يستمر التجميع محلياً؛
+        وإن تعذر ذلك يرجع السجل المحلي الأقصر.
+        """
+        try:
+            base_interval = base_interval or Config.TIMEFRAME
+            if timeframe == base_interval:
+                df = self.fetch_historical_data(symbol, timeframe, limit)
+                return self._analyze_symbol(symbol, df, timeframe) if df is not None else None
+
+            base_buffer = self.candle_buffers.get((symbol, base_interval))
+            if base_buffer is None or not len(base_buffer):
+                logging.warning(f"لا يوجد سجل {base_interval} لـ {symbol} لتجميع {timeframe}")
+                return None
+
+            resampler = self._get_resampler(symbol, base_interval, timeframe, limit)
+            key = (symbol, base_interval, timeframe)
+            with self._lock(*key):
+                resampler.update_many(base_buffer.since(resampler.last_base_timestamp))
+                ohlcv = resampler.tail(limit)
+                seeded = resampler.history_seeded
+
+            if len(ohlcv) < limit and not seeded:
+                try:
+                    older = self.client.fetch_ohlcv(symbol, timeframe, limit, raise_errors=True)
+                    with self._lock(*key):
+                        resampler.prepend_history(older)
+                        ohlcv = resampler.tail(limit)
+                except Exception as e:
+                    logging.warning(f"تعذر جلب سجل {timeframe} الأقدم لـ {symbol}، يستخدم السجل المحلي: {e}")
+            if not ohlcv:
+                return None
+            return self._analyze_symbol(symbol, self._ohlcv_to_frame(ohlcv), timeframe)
+
+        except Exception as e:
+            logging.error(f"خطأ في تجميع {symbol} إلى {timeframe}: {e}")
             return None
 
-    def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """إضافة المؤشرات الفنية المتقدمة"""
+    def get_multi_timeframe_data(self, symbol: str, timeframes: Optional[List[str]] = None,
+                                 limit: int = 500) -> Dict[str, pd.DataFrame]:
+        """الإطار الأساسي والإطارات الأعلى المجمعة محلياً لعملة واحدة"""
+        results = {}
+        for timeframe in [Config.TIMEFRAME] + list(timeframes or Config.HIGHER_TIMEFRAMES):
+            df = self.get_resampled_data(symbol, timeframe, limit=limit)
+            if df is not None:
+                results[timeframe] = df
+        return results
+
+    def _get_resampler(self, symbol: str, base_interval: str, timeframe: str,
+                       limit: int = 0) -> TimeframeResampler:
+        key = (symbol, base_interval, timeframe)
+        resampler = self.resamplers.get(key)
+        if resampler is None:
+            # setdefault: خيطان قد ينشئان نفس المجمع في نفس الوقت
+            resampler = self.resamplers.setdefault(
+                key, TimeframeResampler(base_interval, timeframe, max(limit, Config.CANDLE_BUFFER_SIZE)))
+        return resampler
+
+    def build_panel(self, symbols: List[str], interval: str, limit: int = 500) -> MarketPanel:
+        """لوحة (عملات × شموع) من سجلات الذاكرة مع المؤشرات والاتجاه محسوبة دفعة واحدة"""
+        ohlcv = {}
+        for symbol in symbols:
+            buffer = self.candle_buffers.get((symbol, interval))
+            if buffer is not None and len(buffer):
+                ohlcv[symbol] = buffer.tail(limit)
+        panel = MarketPanel.from_ohlcv(ohlcv, limit)
+        panel.compute_indicators()
+        panel.analyze_trend(self.trend_thresholds)
+        return panel
+
+    def _plan_sync(self, symbol: str, interval: str, limit: int) -> Tuple[Optional[int], int]:
+        """تحديد بداية الجلب وعدد الشموع المطلوبة للمزامنة التزايدية
+
+        عند وجود سجل كافٍ في الذاكرة يتم الطلب ابتداءً من آخر شمعة مخزنة
+        (التي قد تكون ما زالت قيد التكوين) بدلاً من إعادة تحميل السجل كاملاً.
+        """
+        buffer = self.candle_buffers.get((symbol, interval))
+        if buffer is None:
+            buffer = self._load_from_store(symbol, interval, limit)
+        if buffer is None or len(buffer) < limit:
+            return None, limit
+
+        since = buffer.last_timestamp
+        now_ms = int(time.time() * 1000)
+        expected = (now_ms - since) // timeframe_to_ms(interval) + 2
+        if expected >= limit:
+            return None, limit
+        return since, max(int(expected), 1)
+
+    def _apply_sync(self, symbol: str, interval: str, limit: int,
+                    since: Optional[int], ohlcv: list) -> pd.DataFrame:
+        """دمج الشموع المجلوبة في سجل الذاكرة وإرجاع آخر `limit` شمعة كعرض دون نسخ
+
+        العرض للاستخدام الداخلي الفوري فقط؛ الواجهات العامة تعيد نسخة منه.
+        """
+        key = (symbol, interval)
+        buffer = self.candle_buffers.get(key)
+        if since is None or buffer is None:
+            buffer = self.candle_buffers.create(key, max(limit, Config.CANDLE_BUFFER_SIZE))
+        ohlcv, filled = self.data_quality.process(symbol, interval, ohlcv)
+        buffer.merge(ohlcv)
+        self._track_filled(key, buffer, ohlcv, filled, reset=since is None)
+        if self.candle_store is not None and not self.client.use_mock:
+            try:
+                self.candle_store.write(symbol, interval, ohlcv[~filled])
+            except Exception as e:
+                logging.error(f"خطأ في حفظ شموع {symbol} محلياً: {e}")
+        return buffer.frame(limit)
+
+    def _track_filled(self, key: Tuple[str, str], buffer, ohlcv: np.ndarray, filled: np.ndarray,
+                      reset: bool) -> None:
+        """تحديث طوابع الشموع المضافة: الجديدة تضاف، وما وصل حقيقياً أو خرج من السجل يحذف"""
+        timestamps = ohlcv[:, 0].astype(np.int64)
+        previous = frozenset() if reset else self._filled_bars.get(key, frozenset())
+        current = (previous - set(timestamps[~filled].tolist())) | set(timestamps[filled].tolist())
+        if current:
+            oldest = buffer.arrays()[0][0]
+            current = {t for t in current if t >= oldest}
+        # استبدال المجموعة كاملة حتى يقرأها خيط الحفظ دون قفل
+        self._filled_bars[key] = frozenset(current)
+
+    def _load_from_store(self, symbol: str, interval: str, limit: int):
+        """تهيئة سجل الذاكرة من المخزن المحلي بعد إعادة التشغيل بدلاً من إعادة الجلب"""
+        if self.candle_store is None:
+            return None
         try:
-            # ADX - Average Directional Index
-            adx = df.ta.adx()
-            df['ADX'] = adx['ADX_14']
-            df['DIplus'] = adx['DMP_14']
-            df['DIminus'] = adx['DMN_14']
-
-            # المتوسطات المتحركة
-            df['EMA_9'] = df.ta.ema(length=9)
-            df['EMA_21'] = df.ta.ema(length=21)
-            df['SMA_50'] = df.ta.sma(length=50)
-            df['SMA_200'] = df.ta.sma(length=200)
-
-            # RSI
-            df['RSI'] = df.ta.rsi(length=14)
-
-            # MACD
-            macd = df.ta.macd()
-            df['MACD'] = macd['MACD_12_26_9']
-            df['MACD_Signal'] = macd['MACDs_12_26_9']
-
-            # Bollinger Bands
-            bbands = df.ta.bbands()
-            df['BB_upper'] = bbands['BBU_20_2.0']
-            df['BB_middle'] = bbands['BBM_20_2.0']
-            df['BB_lower'] = bbands['BBL_20_2.0']
-
-            # حجم التداول
-            df['Volume_MA'] = df.ta.sma(close=df['volume'], length=20)
-            df['OBV'] = df.ta.obv()
-            df['MFI'] = df.ta.mfi()
+            rows = self.candle_store.tail(symbol, interval, max(limit, Config.CANDLE_BUFFER_SIZE))
+            if len(rows) < limit:
+                return None
+            # المخزن لا يحوي الشموع المضافة، فتملأ الفجوات من جديد عند التحميل
+            rows, filled, _ = repair_ohlcv(rows, interval)
+            buffer = self.candle_buffers.create((symbol, interval), max(limit, Config.CANDLE_BUFFER_SIZE))
+            buffer.merge(rows)
+            self._track_filled((symbol, interval), buffer, rows, filled, reset=True)
+            return buffer
+        except Exception as e:
+            logging.error(f"خطأ في قراءة شموع {symbol} من المخزن المحلي: {e}")
+            return None
+
+    def _on_buffer_evicted(self, key: Tuple[str, str]) -> None:
+        """تحرير حالات المؤشرات والتجميع المرتبطة بسجل تم إخلاؤه"""
+        symbol, interval = key
+        self.indicator_engine.states.pop(key, None)
+        self._filled_bars.pop(key, None)
+        for resampler_key in [k for k in self.resamplers if k[:2] == key]:
+            self.resamplers.pop(resampler_key, None)
+            self.indicator_engine.states.pop((symbol, resampler_key[2]), None)
+        logging.info(f"تم إخلاء سجل {symbol} {interval} من الذاكرة لتجاوز الميزانية")
+
+    def _ohlcv_to_frame(self, ohlcv: list) -> pd.DataFrame:
+        """تحويل بيانات OHLCV الخام إلى DataFrame"""
+        df = pd.DataFrame(ohlcv, columns=[
+            'timestamp', 'open', 'high', 'low', 'close', 'volume'
+        ])
+
+        # تحويل البيانات الرقمية
+        numeric_columns = ['open', 'high', 'low', 'close', 'volume']
+        df[numeric_columns] = df[numeric_columns].astype(float)
 
+        # تحويل الطابع الزمني
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+
+        return df
+
+    def _process_symbol_data(self, symbol: str, df: pd.DataFrame, interval: str) -> pd.DataFrame:
+        """إضافة المؤشرات الفنية وتحليل الاتجاه ثم حفظ البيانات"""
+        df = self._analyze_symbol(symbol, df, interval)
+        self._save_symbol_data(symbol, df, interval)
+        return df
+
+    def _analyze_symbol(self, symbol: str, df: pd.DataFrame, interval: str) -> pd.DataFrame:
+        """إضافة المؤشرات الفنية وتحليل الاتجاه"""
+        if Config.INCREMENTAL_INDICATORS:
+            df = self._apply_incremental_indicators(symbol, interval, df)
+        else:
+            df = self.add_technical_indicators(df, symbol, interval)
+        return self.analyze_market_trend(df)
+
+    def _save_symbol_data(self, symbol: str, df: pd.DataFrame, interval: str) -> None:
+        """حفظ البيانات في قاعدة البيانات"""
+        try:
+            # الشموع ابتداءً من آخر شمعة محفوظة فقط (التي قد تكون قيد التكوين)
+            saved_until = self.db_manager.last_candle_timestamp(symbol, interval)
+            new_rows = df if saved_until is None else df[df.index >= saved_until]
+            # الشموع المضافة لملء الفجوات لا تحفظ كأنها بيانات حقيقية
+            filled = self._filled_bars.get((symbol, interval))
+            if filled:
+                new_rows = new_rows[~new_rows.index.isin(pd.to_datetime(sorted(filled), unit='ms'))]
+            self.db_manager.save_market_data(symbol, {
+                'data': new_rows.reset_index().to_dict(orient='records'),
+                'interval': interval,
+                'indicators': self._get_latest_indicators(df)
+            })
+            logging.info(f"تم جلب وتحليل بيانات {symbol} بنجاح")
+        except Exception as e:
+            logging.error(f"خطأ في حفظ بيانات {symbol}: {e}")
+
+    def _apply_incremental_indicators(self, symbol: str, interval: str, df: pd.DataFrame) -> pd.DataFrame:
+        """تحديث المؤشرات بالشموع الجديدة فقط ونسخ قيمها إلى الإطار"""
+        try:
+            ohlcv = np.column_stack([
+                df.index.values.astype('datetime64[ms]').astype(np.int64),
+                df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64)
+            ])
+            with self._lock(symbol, interval):
+                state = self.indicator_engine.update(symbol, interval, ohlcv)
+                indicators = state.frame(len(df)).reindex(df.index)
+            for column in indicators.columns:
+                df[column] = indicators[column].to_numpy()
+
+            # مشاركة النتائج مع بقية المستخدمين عبر الذاكرة المؤقتة
+            indicators['volatility'] = (indicators['ATR'] / df['close']) * 100
+            self.indicator_cache.put(symbol, interval, df, indicators)
+            return df
+        except Exception as e:
+            logging.error(f"خطأ في تحديث المؤشرات التزايدية لـ {symbol}: {e}")
+            return self.add_technical_indicators(df, symbol, interval)
+
+    def on_stream_event(self, event: str, symbol: str, data: Dict) -> None:
+        """تحديث المؤشرات مع كل تحديث شمعة من البث المباشر"""
+        if event == 'kline':
+            with self._lock(symbol, data['timeframe']):
+                self.indicator_engine.update_candle(symbol, data['timeframe'], data['candle'])
+
+            # تحديث الإطارات الأعلى المجمعة من نفس الشمعة الأساسية
+            for (resampled_symbol, base_interval, timeframe), resampler in list(self.resamplers.items()):
+                if resampled_symbol == symbol and base_interval == data['timeframe']:
+                    with self._lock(symbol, base_interval, timeframe):
+                        bar = resampler.update(data['candle'])
+                    if bar is not None:
+                        with self._lock(symbol, timeframe):
+                            self.indicator_engine.update_candle(symbol, timeframe, bar)
+
+    def add_technical_indicators(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                                 interval: Optional[str] = None) -> pd.DataFrame:
+        """إضافة المؤشرات الفنية المتقدمة (من الذاكرة المشتركة عند تحديد العملة والإطار)"""
+        try:
+            if symbol and interval:
+                return self.indicator_cache.apply(symbol, interval, df, self.INDICATOR_COLUMNS)
+
+            indicators = compute_indicators(df)
+            for column in self.INDICATOR_COLUMNS:
+                df[column] = indicators[column]
             return df
 
         except Exception as e:
@@ -124,56 +442,7 @@ class DataCollector:
     def analyze_market_trend(self, df: pd.DataFrame) -> pd.DataFrame:
         """تحليل وتحديد اتجاه السوق"""
         try:
-            # حساب قوة الاتجاه
-            trend_strength = np.zeros(len(df))
-            confidence = np.zeros(len(df))
-
-            for i in range(len(df)):
-                # تحليل ADX
-                if df['ADX'].iloc[i] > 25:
-                    if df['DIplus'].iloc[i] > df['DIminus'].iloc[i]:
-                        trend_strength[i] += 0.3
-                    else:
-                        trend_strength[i] -= 0.3
-                    confidence[i] += 0.2
-
-                # تحليل RSI
-                rsi = df['RSI'].iloc[i]
-                if rsi > 70:
-                    trend_strength[i] -= 0.2
-                elif rsi < 30:
-                    trend_strength[i] += 0.2
-                confidence[i] += 0.1
-
-                # تحليل MACD
-                if df['MACD'].iloc[i] > df['MACD_Signal'].iloc[i]:
-                    trend_strength[i] += 0.2
-                else:
-                    trend_strength[i] -= 0.2
-                confidence[i] += 0.2
-
-                # تحليل المتوسطات المتحركة
-                if df['EMA_9'].iloc[i] > df['EMA_21'].iloc[i] > df['SMA_50'].iloc[i]:
-                    trend_strength[i] += 0.2
-                elif df['EMA_9'].iloc[i] < df['EMA_21'].iloc[i] < df['SMA_50'].iloc[i]:
-                    trend_strength[i] -= 0.2
-                confidence[i] += 0.1
-
-            # تحديد الاتجاه
-            df['trend_strength'] = trend_strength
-            df['trend_confidence'] = confidence
-            df['market_trend'] = pd.cut(
-                trend_strength,
-                bins=[-np.inf, -self.trend_thresholds['strong_uptrend'],
-                      -self.trend_thresholds['uptrend'],
-                      self.trend_thresholds['uptrend'],
-                      self.trend_thresholds['strong_uptrend'], np.inf],
-                labels=['STRONG_DOWNTREND', 'DOWNTREND', 'SIDEWAYS',
-                       'UPTREND', 'STRONG_UPTREND']
-            )
-
-            return df
-
+            return analyze_trend(df, self.trend_thresholds)
         except Exception as e:
             logging.error(f"خطأ في تحليل اتجاه السوق: {e}")
             return df
@@ -209,4 +478,12 @@ class DataCollector:
             }
         except Exception as e:
             logging.error(f"خطأ في استخراج المؤشرات: {e}")
-            return {}
\ No newline at end of file
+            return {}
+
+
+def analyze_symbol_frame(df: pd.DataFrame, thresholds: Dict[str, float]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """تحليل إطار عملة واحدة في عملية منفصلة: المؤشرات ثم الاتجاه"""
+    indicators = compute_indicators(df)
+    for column in DataCollector.INDICATOR_COLUMNS:
+        df[column] = indicators[column]
+    return analyze_trend(df, thresholds), indicators
@@ -0,0 +1,362 @@
+import math
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import Config
+
+NAN = float('nan')
+
+# كل مؤشر أولي يدعم step(x, commit): مع commit=False يحسب القيمة لو أضيفت x
+# دون تعديل الحالة (للشمعة قيد التكوين)، ومع commit=True يثبتها. كلاهما O(1).
+
+class _RollingSum:
+    """مجموع نافذة متحركة مثل rolling(n).sum()"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window = deque()
+        self.total = 0.0
+        self._pushes = 0
+
+    def step(self, x: float, commit: bool) -> float:
+        full = len(self.window) == self.length
+        total = self.total + x - (self.window[0] if full else 0.0)
+        count = len(self.window) + (0 if full else 1)
+        if commit:
+            self.window.append(x)
+            if full:
+                self.window.popleft()
+            self._pushes += 1
+            # إعادة الجمع دورياً لمنع تراكم أخطاء التقريب (تكلفة ثابتة في المتوسط)
+            if self._pushes % self.length == 0:
+                total = math.fsum(self.window)
+            self.total = total
+        return total if count >= self.length else NAN
+
+
+class _Sma(_RollingSum):
+    """متوسط متحرك بسيط مثل ta.sma"""
+
+    def step(self, x: float, commit: bool) -> float:
+        return super().step(x, commit) / self.length
+
+
+class _RollingStd:
+    """انحراف معياري لنافذة متحركة (ddof=0) بتحديث Welford المنزلق"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._pushes = 0
+
+    def step(self, x: float, commit: bool) -> float:
+        n = len(self.window)
+        if n < self.length:
+            count = n + 1
+            delta = x - self.mean
+            mean = self.mean + delta / count
+            m2 = self.m2 + delta * (x - mean)
+        else:
+            count = n
+            oldest = self.window[0]
+            mean = self.mean + (x - oldest) / n
+            m2 = self.m2 + (x - oldest) * (x - mean + oldest - self.mean)
+        if commit:
+            self.window.append(x)
+            if n == self.length:
+                self.window.popleft()
+            self._pushes += 1
+            if self._pushes % self.length == 0:
+                mean = math.fsum(self.window) / len(self.window)
+                m2 = math.fsum((value - mean) ** 2 for value in self.window)
+            self.mean, self.m2 = mean, m2
+        return math.sqrt(max(m2, 0.0) / count) if count >= self.length else NAN
+
+
+class _Ema:
+    """متوسط أسي مبدوء بالمتوسط البسيط لأول n قيمة، مثل ta.ema"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self.count = 0
+        self.seed = 0.0
+        self.value = NAN
+
+    def step(self, x: float, commit: bool) -> float:
+        if self.count < self.length - 1:
+            value = NAN
+        elif self.count == self.length - 1:
+            value = (self.seed + x) / self.length
+        else:
+            old_wt = 1 - self.alpha
+            value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        if commit:
+            if self.count < self.length:
+                self.seed += x
+            self.count += 1
+            self.value = value
+        return value
+
+
+class _Rma:
+    """متوسط Wilder كما في ta.rma: ewm(alpha=1/n, adjust=True, min_periods=n)"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.decay = 1 - 1 / length
+        self.avg = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def step(self, x: float, commit: bool) -> float:
+        avg, old_wt, nobs = self.avg, self.old_wt, self.nobs
+        if avg != avg:  # لم تبدأ السلسلة بعد
+            if x == x:
+                avg, old_wt, nobs = x, 1.0, 1
+        else:
+            old_wt *= self.decay
+            if x == x:
+                nobs += 1
+                if avg != x:
+                    avg = (old_wt * avg + x) / (old_wt + 1.0)
+                old_wt += 1.0
+        if commit:
+            self.avg, self.old_wt, self.nobs = avg, old_wt, nobs
+        return avg if nobs >= self.length else NAN
+
+
+class _RollingExtreme:
+    """أعلى أو أدنى قيمة في نافذة متحركة عبر طابور رتيب"""
+
+    def __init__(self, length: int, largest: bool):
+        self.length = length
+        self.largest = largest
+        self.queue = deque()  # (index, value) بترتيب رتيب
+        self.count = 0
+
+    def _better(self, a: float, b: float) -> bool:
+        return a >= b if self.largest else a <= b
+
+    def step(self, x: float, commit: bool) -> float:
+        index = self.count
+        start = index - self.length + 1
+        if commit:
+            while self.queue and self._better(x, self.queue[-1][1]):
+                self.queue.pop()
+            self.queue.append((index, x))
+            while self.queue[0][0] < start:
+                self.queue.popleft()
+            self.count += 1
+            result = self.queue[0][1]
+        else:
+            result = x
+            for queued_index, value in self.queue:
+                if queued_index >= start:
+                    if self._better(value, result):
+                        result = value
+                    break
+        return result if index + 1 >= self.length else NAN
+
+
+def _zero(x: float) -> float:
+    return 0.0 if abs(x) < 2.220446049250313e-16 else x
+
+
+class IncrementalIndicators:
+    """حالة متدفقة لمؤشرات عملة واحدة وإطار زمني واحد
+
+    تحسب نفس مؤشرات pandas_ta (بنفس المعادلات والإعدادات الافتراضية) بتكلفة
+    ثابتة لكل شمعة: الشمعة الأخيرة تعتبر قيد التكوين ويمكن تحديثها مراراً، وتثبت
+    عند وصول شمعة بطابع زمني أحدث.
+    """
+
+    COLUMNS = (
+        'ADX', 'DIplus', 'DIminus', 'EMA_9', 'EMA_21', 'SMA_50', 'SMA_200', 'RSI',
+        'MACD', 'MACD_Signal', 'BB_upper', 'BB_middle', 'BB_lower',
+        'Volume_MA', 'OBV', 'MFI', 'ATR', 'SO_K', 'SO_D'
+    )
+
+    def __init__(self, history: int = 1000):
+        self.history = history
+        self.timestamps = deque(maxlen=history)
+        self.rows = deque(maxlen=history)
+        self.latest: Optional[Tuple[float, ...]] = None
+        self._forming: Optional[Tuple[float, ...]] = None
+        self._prev: Optional[Tuple[float, ...]] = None
+        self._obv = 0.0
+        self._lock = threading.Lock()
+
+        self._ema9, self._ema21 = _Ema(9), _Ema(21)
+        self._sma50, self._sma200 = _Sma(50), _Sma(200)
+        self._rsi_gain, self._rsi_loss = _Rma(14), _Rma(14)
+        self._macd_fast, self._macd_slow, self._macd_signal = _Ema(12), _Ema(26), _Ema(9)
+        self._bb_mid, self._bb_std = _Sma(20), _RollingStd(20)
+        self._volume_ma = _Sma(20)
+        self._mfi_pos, self._mfi_neg = _RollingSum(14), _RollingSum(14)
+        self._atr = _Rma(14)
+        self._dm_pos, self._dm_neg, self._adx = _Rma(14), _Rma(14), _Rma(14)
+        self._stoch_low, self._stoch_high = _RollingExtreme(14, largest=False), _RollingExtreme(14, largest=True)
+        self._stoch_k, self._stoch_d = _Sma(3), _Sma(3)
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._forming[0]) if self._forming is not None else None
+
+    def update(self, candle) -> Dict[str, float]:
+        """إضافة شمعة جديدة أو تحديث الشمعة قيد التكوين وإرجاع آخر قيم المؤشرات"""
+        candle = tuple(float(value) for value in candle[:6])
+        with self._lock:
+            if self._forming is not None:
+                if candle[0] < self._forming[0]:
+                    raise ValueError("لا يمكن تعديل شمعة مثبتة بشكل تزايدي")
+                if candle[0] > self._forming[0]:
+                    self.rows.append(self._compute(self._forming, commit=True))
+                    self.timestamps.append(int(self._forming[0]))
+                    self._prev = self._forming
+            self._forming = candle
+            self.latest = self._compute(candle, commit=False)
+            return dict(zip(self.COLUMNS, self.latest))
+
+    def frame(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """قيم المؤشرات لآخر `limit` شمعة (شاملة الشمعة قيد التكوين)"""
+        with self._lock:
+            timestamps = list(self.timestamps)
+            rows = list(self.rows)
+            if self._forming is not None:
+                timestamps.append(int(self._forming[0]))
+                rows.append(self.latest)
+        if limit is not None:
+            timestamps, rows = timestamps[-limit:], rows[-limit:]
+        return pd.DataFrame(
+            np.array(rows, dtype=np.float64).reshape(-1, len(self.COLUMNS)),
+            index=pd.to_datetime(timestamps, unit='ms'),
+            columns=list(self.COLUMNS)
+        )
+
+    def _compute(self, candle: Tuple[float, ...], commit: bool) -> Tuple[float, ...]:
+        _, _, high, low, close, volume = candle
+        prev = self._prev
+
+        # المتوسطات المتحركة
+        ema_9 = self._ema9.step(close, commit)
+        ema_21 = self._ema21.step(close, commit)
+        sma_50 = self._sma50.step(close, commit)
+        sma_200 = self._sma200.step(close, commit)
+
+        # MACD (الإشارة تبدأ من أول قيمة صالحة لـ MACD)
+        macd = self._macd_fast.step(close, commit) - self._macd_slow.step(close, commit)
+        macd_signal = self._macd_signal.step(macd, commit) if macd == macd else NAN
+
+        # Bollinger Bands
+        bb_middle = self._bb_mid.step(close, commit)
+        bb_std = self._bb_std.step(close, commit)
+        bb_upper = bb_middle + 2.0 * bb_std
+        bb_lower = bb_middle - 2.0 * bb_std
+
+        volume_ma = self._volume_ma.step(volume, commit)
+        typical = (high + low + close) / 3
+        money_flow = typical * volume
+
+        if prev is None:
+            rsi = atr = adx = di_plus = di_minus = NAN
+            obv = volume
+            mfi_pos = mfi_neg = 0.0
+        else:
+            _, _, prev_high, prev_low, prev_close, _ = prev
+
+            # RSI
+            change = close - prev_close
+            gain = self._rsi_gain.step(change if change > 0 else 0.0, commit)
+            loss = self._rsi_loss.step(change if change < 0 else 0.0, commit)
+            denominator = gain + abs(loss)
+            rsi = 100 * gain / denominator if denominator else NAN
+
+            # OBV
+            direction = 1.0 if close > prev_close else -1.0 if close < prev_close else 0.0
+            obv = self._obv + direction * volume
+
+            # MFI
+            prev_typical = (prev_high + prev_low + prev_close) / 3
+            mfi_pos = money_flow if typical > prev_typical else 0.0
+            mfi_neg = money_flow if typical < prev_typical else 0.0
+
+            # ATR و ADX
+            true_range = max(abs(high - low), abs(high - prev_close), abs(prev_close - low))
+            atr = self._atr.step(true_range, commit)
+            up = high - prev_high
+            down = prev_low - low
+            dm_pos = self._dm_pos.step(_zero(up if up > down and up > 0 else 0.0), commit)
+            dm_neg = self._dm_neg.step(_zero(down if down > up and down > 0 else 0.0), commit)
+            k = 100 / atr if atr else NAN
+            di_plus = k * dm_pos
+            di_minus = k * dm_neg
+            di_sum = di_plus + di_minus
+            dx = 100 * abs(di_plus - di_minus) / di_sum if di_sum else NAN
+            adx = self._adx.step(dx, commit)
+
+        positive_flow = self._mfi_pos.step(mfi_pos, commit)
+        negative_flow = self._mfi_neg.step(mfi_neg, commit)
+        flow_sum = positive_flow + negative_flow
+        mfi = 100 * positive_flow / flow_sum if flow_sum else NAN
+
+        # Stochastic (%K و %D تبدآن من أول قيمة صالحة)
+        lowest = self._stoch_low.step(low, commit)
+        highest = self._stoch_high.step(high, commit)
+        if lowest == lowest:
+            price_range = highest - lowest
+            stoch = 100 * (close - lowest) / price_range if price_range else 0.0
+            stoch_k = self._stoch_k.step(stoch, commit)
+            stoch_d = self._stoch_d.step(stoch_k, commit) if stoch_k == stoch_k else NAN
+        else:
+            stoch_k = stoch_d = NAN
+
+        if commit:
+            self._obv = obv
+
+        return (
+            adx, di_plus, di_minus, ema_9, ema_21, sma_50, sma_200, rsi,
+            macd, macd_signal, bb_upper, bb_middle, bb_lower,
+            volume_ma, obv, mfi, atr, stoch_k, stoch_d
+        )
+
+
+class IndicatorEngine:
+    """مؤشرات متدفقة لكل (عملة، إطار زمني) تغذى بالشموع الجديدة فقط"""
+
+    def __init__(self, history: Optional[int] = None):
+        self.history = history or Config.CANDLE_BUFFER_SIZE
+        self.states: Dict[Tuple[str, str], IncrementalIndicators] = {}
+
+    def update(self, symbol: str, timeframe: str, ohlcv) -> IncrementalIndicators:
+        """تغذية الشموع الأحدث من آخر شمعة معالجة، وإعادة البناء عند وجود فجوة"""
+        rows = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+        key = (symbol, timeframe)
+        state = self.states.get(key)
+
+        start = 0
+        if state is not None and len(rows):
+            last = state.last_timestamp
+            start = int(np.searchsorted(rows[:, 0], last, side='left'))
+            if start == len(rows):
+                return state  # لا جديد
+            if rows[start, 0] != last:
+                state = None  # فجوة أو سجل مختلف
+                start = 0
+        if state is None:
+            state = self.states[key] = IncrementalIndicators(self.history)
+
+        for row in rows[start:].tolist():
+            state.update(row)
+        return state
+
+    def update_candle(self, symbol: str, timeframe: str, candle) -> Optional[Dict[str, float]]:
+        """تحديث شمعة واحدة من البث المباشر؛ تتجاهل الحالات غير المهيأة أو القديمة"""
+        state = self.states.get((symbol, timeframe))
+        if state is None or state.last_timestamp is None or candle[0] < state.last_timestamp:
+            return None
+        return state.update(candle)
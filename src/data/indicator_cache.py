@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import pandas as pd
+from config import Config
+
+# إعدادات المؤشرات الافتراضية المشتركة بين DataCollector و AdvancedIndicators
+DEFAULT_PARAMS: Tuple[Tuple[str, object], ...] = (
+    ('adx', 14),
+    ('ema', (9, 21)),
+    ('sma', (50, 200)),
+    ('rsi', 14),
+    ('macd', (12, 26, 9)),
+    ('bbands', (20, 2.0)),
+    ('volume_ma', 20),
+    ('mfi', 14),
+    ('atr', 14),
+    ('stoch', (14, 3, 3))
+)
+
+# أسماء بديلة تستخدمها AdvancedIndicators لنفس الأعمدة
+COLUMN_ALIASES = {'Signal': 'MACD_Signal', 'VOL_MA': 'Volume_MA'}
+
+def _trend_indicators(df: pd.DataFrame, p: Dict) -> Dict[str, pd.Series]:
+    ema_fast, ema_slow = p['ema']
+    sma_fast, sma_slow = p['sma']
+    adx = df.ta.adx(length=p['adx'])
+    return {
+        'ADX': adx[f"ADX_{p['adx']}"],
+        'DIplus': adx[f"DMP_{p['adx']}"],
+        'DIminus': adx[f"DMN_{p['adx']}"],
+        'EMA_9': df.ta.ema(length=ema_fast),
+        'EMA_21': df.ta.ema(length=ema_slow),
+        'SMA_50': df.ta.sma(length=sma_fast),
+        'SMA_200': df.ta.sma(length=sma_slow)
+    }
+
+def _volatility_indicators(df: pd.DataFrame, p: Dict) -> Dict[str, pd.Series]:
+    bb_length, bb_std = p['bbands']
+    bbands = df.ta.bbands(length=bb_length, std=bb_std)
+    bb_suffix = f"{bb_length}_{float(bb_std)}"
+    atr = df.ta.atr(length=p['atr'])
+    return {
+        'BB_upper': bbands[f"BBU_{bb_suffix}"],
+        'BB_middle': bbands[f"BBM_{bb_suffix}"],
+        'BB_lower': bbands[f"BBL_{bb_suffix}"],
+        'ATR': atr,
+        'volatility': (atr / df['close']) * 100
+    }
+
+def _momentum_indicators(df: pd.DataFrame, p: Dict) -> Dict[str, pd.Series]:
+    macd_fast, macd_slow, macd_signal = p['macd']
+    stoch_k, stoch_d, stoch_smooth = p['stoch']
+    macd = df.ta.macd(fast=macd_fast, slow=macd_slow, signal=macd_signal)
+    stoch = df.ta.stoch(k=stoch_k, d=stoch_d, smooth_k=stoch_smooth)
+    macd_suffix = f"{macd_fast}_{macd_slow}_{macd_signal}"
+    stoch_suffix = f"{stoch_k}_{stoch_d}_{stoch_smooth}"
+    return {
+        'RSI': df.ta.rsi(length=p['rsi']),
+        'MACD': macd[f"MACD_{macd_suffix}"],
+        'MACD_Signal': macd[f"MACDs_{macd_suffix}"],
+        'SO_K': stoch[f"STOCHk_{stoch_suffix}"],
+        'SO_D': stoch[f"STOCHd_{stoch_suffix}"]
+    }
+
+def _volume_indicators(df: pd.DataFrame, p: Dict) -> Dict[str, pd.Series]:
+    return {
+        'Volume_MA': df.ta.sma(close=df['volume'], length=p['volume_ma']),
+        'OBV': df.ta.obv(),
+        'MFI': df.ta.mfi(length=p['mfi'])
+    }
+
+# مجموعات المؤشرات، كل منها يحسب باستدعاءات pandas_ta مستقلة
+INDICATOR_GROUPS = {
+    'trend': _trend_indicators,
+    'volatility': _volatility_indicators,
+    'momentum': _momentum_indicators,
+    'volume': _volume_indicators
+}
+GROUP_COLUMNS = {
+    'trend': ('ADX', 'DIplus', 'DIminus', 'EMA_9', 'EMA_21', 'SMA_50', 'SMA_200'),
+    'volatility': ('BB_upper', 'BB_middle', 'BB_lower', 'ATR', 'volatility'),
+    'momentum': ('RSI', 'MACD', 'MACD_Signal', 'SO_K', 'SO_D'),
+    'volume': ('Volume_MA', 'OBV', 'MFI')
+}
+
+def compute_indicator_group(df: pd.DataFrame, group: str,
+                            params: Tuple[Tuple[str, object], ...] = DEFAULT_PARAMS) -> pd.DataFrame:
+    """حساب مجموعة مؤشرات واحدة فقط، حتى لا يُسقط فشل مؤشر المجموعات الأخرى"""
+    import pandas_ta  # noqa: F401 - يسجل df.ta عند أول حساب فقط
+    return pd.DataFrame(INDICATOR_GROUPS[group](df, dict(params)), index=df.index)
+
+def compute_indicators(df: pd.DataFrame, params: Tuple[Tuple[str, object], ...] = DEFAULT_PARAMS) -> pd.DataFrame:
+    """حساب جميع المؤشرات مرة واحدة وإرجاعها كإطار منفصل بنفس فهرس df"""
+    import pandas_ta  # noqa: F401 - يسجل df.ta عند أول حساب كامل فقط
+    p = dict(params)
+    columns = {}
+    for compute_group in INDICATOR_GROUPS.values():
+        columns.update(compute_group(df, p))
+    return pd.DataFrame(columns, index=df.index)
+
+class IndicatorCache:
+    """ذاكرة مؤقتة (LRU) للمؤشرات المحسوبة يشترك فيها كل من يحتاجها
+
+    المفتاح هو (العملة، الإطار الزمني، طابع آخر شمعة، إعدادات المؤشرات). يتم
+    التحقق أيضاً من طول الإطار وقيم آخر شمعة حتى لا تعاد نتائج قديمة لشمعة
+    ما زالت قيد التكوين.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or Config.INDICATOR_CACHE_SIZE
+        self._entries: 'OrderedDict[tuple, Tuple[tuple, pd.DataFrame]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _fingerprint(df: pd.DataFrame) -> tuple:
+        last = df[['open', 'high', 'low', 'close', 'volume']].iloc[-1]
+        return (len(df), df.index[0], *last.tolist())
+
+    def get(self, symbol: str, timeframe: str, df: pd.DataFrame,
+            params: Tuple[Tuple[str, object], ...] = DEFAULT_PARAMS) -> pd.DataFrame:
+        """إرجاع مؤشرات df من الذاكرة أو حسابها وتخزينها"""
+        key = (symbol, timeframe, df.index[-1], params)
+        fingerprint = self._fingerprint(df)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        indicators = compute_indicators(df, params)
+        self.put(symbol, timeframe, df, indicators, params)
+        return indicators
+
+    def put(self, symbol: str, timeframe: str, df: pd.DataFrame, indicators: pd.DataFrame,
+            params: Tuple[Tuple[str, object], ...] = DEFAULT_PARAMS) -> None:
+        """تخزين مؤشرات محسوبة مسبقاً (مثلاً من المحرك التزايدي)"""
+        key = (symbol, timeframe, df.index[-1], params)
+        with self._lock:
+            self._entries[key] = (self._fingerprint(df), indicators)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def apply(self, symbol: str, timeframe: str, df: pd.DataFrame,
+              columns: Optional[Iterable[str]] = None,
+              params: Tuple[Tuple[str, object], ...] = DEFAULT_PARAMS) -> pd.DataFrame:
+        """نسخ أعمدة المؤشرات (أو المحددة منها بأسمائها أو أسمائها البديلة) إلى df"""
+        indicators = self.get(symbol, timeframe, df, params)
+        for column in columns or list(indicators.columns) + list(COLUMN_ALIASES):
+            df[column] = indicators[COLUMN_ALIASES.get(column, column)].to_numpy()
+        return df
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,272 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from .trend import trend_scores, classify_trend, TREND_LABELS
+
+# جميع الدوال التالية تعمل على مصفوفات (عملات × شموع) على طول المحور الأخير،
+# وتعيد NaN حيث لا تكفي البيانات، بنفس معادلات pandas_ta الافتراضية.
+
+def _first_valid(x: np.ndarray) -> np.ndarray:
+    """فهرس أول قيمة صالحة في كل صف (طول الصف إن لم توجد)"""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+
+def rolling_sum(x: np.ndarray, length: int) -> np.ndarray:
+    """مثل rolling(length).sum(): NaN إذا احتوت النافذة على قيمة ناقصة"""
+    if length <= 32:
+        # جمع مباشر للنوافذ القصيرة لتجنب أخطاء التقريب في الفروق التراكمية
+        out = np.full_like(x, np.nan)
+        if x.shape[1] >= length:
+            out[:, length - 1:] = sliding_window_view(x, length, axis=1).sum(axis=-1)
+        return out
+
+    filled = np.nan_to_num(x)
+    total = np.cumsum(filled, axis=1)
+    missing = np.cumsum(np.isnan(x), axis=1)
+    out = np.full_like(total, np.nan)
+    out[:, length - 1:] = total[:, length - 1:]
+    out[:, length:] -= total[:, :-length]
+    window_missing = missing[:, length - 1:].copy()
+    window_missing[:, 1:] -= missing[:, :-length]
+    out[:, length - 1:][window_missing > 0] = np.nan
+    return out
+
+def sma(x: np.ndarray, length: int) -> np.ndarray:
+    return rolling_sum(x, length) / length
+
+def rolling_std(x: np.ndarray, length: int) -> np.ndarray:
+    """انحراف معياري متحرك بـ ddof=0 كما في ta.bbands"""
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= length:
+        out[:, length - 1:] = sliding_window_view(x, length, axis=1).std(axis=-1)
+    return out
+
+def rolling_extreme(x: np.ndarray, length: int, largest: bool) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= length:
+        windows = sliding_window_view(x, length, axis=1)
+        out[:, length - 1:] = windows.max(axis=-1) if largest else windows.min(axis=-1)
+    return out
+
+def ema(x: np.ndarray, length: int) -> np.ndarray:
+    """متوسط أسي مبدوء بمتوسط أول `length` قيمة صالحة في كل صف، مثل ta.ema"""
+    rows, bars = x.shape
+    alpha = 2 / (length + 1)
+    seed_index = _first_valid(x) + length - 1
+    has_seed = seed_index < bars
+    out = np.full_like(x, np.nan)
+    if not has_seed.any():
+        return out
+
+    columns = np.arange(bars)
+    after_seed = columns[None, :] > seed_index[:, None]
+    inputs = np.where(after_seed, alpha * np.nan_to_num(x), 0.0)
+    seeded_rows = np.flatnonzero(has_seed)
+    sums = rolling_sum(x, length)
+    inputs[seeded_rows, seed_index[seeded_rows]] = sums[seeded_rows, seed_index[seeded_rows]] / length
+
+    filtered = lfilter([1.0], [1.0, -(1 - alpha)], inputs, axis=1)
+    return np.where(columns[None, :] >= seed_index[:, None], filtered, np.nan)
+
+def rma(x: np.ndarray, length: int) -> np.ndarray:
+    """متوسط Wilder: ewm(alpha=1/length, adjust=True, min_periods=length) كما في ta.rma"""
+    decay = 1 - 1 / length
+    valid = ~np.isnan(x)
+    started = np.cumsum(valid, axis=1) > 0
+    numerator = lfilter([1.0], [1.0, -decay], np.where(valid, x, 0.0), axis=1)
+    denominator = lfilter([1.0], [1.0, -decay], valid.astype(np.float64), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = numerator / denominator
+    enough = np.cumsum(valid, axis=1) >= length
+    return np.where(started & enough, out, np.nan)
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[:, 1:] = x[:, :-1]
+    return out
+
+class MarketPanel:
+    """بيانات عدة عملات كمصفوفات NumPy متراصفة بالشكل (عملات × شموع)
+
+    يتم حساب المؤشرات واتجاه السوق لكل العملات في عمليات متجهة واحدة بدلاً من
+    DataFrame منفصل لكل عملة. الشموع الناقصة داخل السجل تملأ بسعر الإغلاق
+    السابق وحجم صفري.
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, symbols: List[str], timestamps: np.ndarray, open: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        self.symbols = list(symbols)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.open, self.high, self.low, self.close, self.volume = (
+            np.asarray(values, dtype=np.float64) for values in (open, high, low, close, volume)
+        )
+        self.indicators: Dict[str, np.ndarray] = {}
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_ohlcv(cls, ohlcv_by_symbol: Dict[str, list], limit: Optional[int] = None) -> 'MarketPanel':
+        """بناء لوحة من شموع خام لكل عملة، متراصفة على اتحاد الطوابع الزمنية"""
+        symbols = list(ohlcv_by_symbol)
+        arrays = [np.asarray(ohlcv_by_symbol[symbol], dtype=np.float64).reshape(-1, 6) for symbol in symbols]
+        timestamps = np.unique(np.concatenate([rows[:, 0] for rows in arrays])) if arrays else np.empty(0)
+        if limit is not None:
+            timestamps = timestamps[-limit:]
+
+        data = np.full((5, len(symbols), len(timestamps)), np.nan)
+        for i, rows in enumerate(arrays):
+            positions = np.searchsorted(timestamps, rows[:, 0])
+            inside = (positions < len(timestamps)) & (timestamps[np.minimum(positions, len(timestamps) - 1)] == rows[:, 0])
+            data[:, i, positions[inside]] = rows[inside, 1:].T
+
+        cls._fill_gaps(data)
+        return cls(symbols, timestamps.astype(np.int64), *data)
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], limit: Optional[int] = None) -> 'MarketPanel':
+        """بناء لوحة من إطارات DataFrame بفهرس زمني وأعمدة OHLCV"""
+        ohlcv = {
+            symbol: np.column_stack([
+                df.index.values.astype('datetime64[ms]').astype(np.int64),
+                df[list(cls.FIELDS)].to_numpy(dtype=np.float64)
+            ])
+            for symbol, df in frames.items()
+        }
+        return cls.from_ohlcv(ohlcv, limit)
+
+    @staticmethod
+    def _fill_gaps(data: np.ndarray) -> None:
+        """ملء الشموع الناقصة بعد أول شمعة لكل عملة بسعر الإغلاق السابق"""
+        close = data[3]
+        bars = close.shape[1]
+        valid = ~np.isnan(close)
+        last_valid = np.maximum.accumulate(np.where(valid, np.arange(bars)[None, :], -1), axis=1)
+        gaps = ~valid & (last_valid >= 0)
+        if not gaps.any():
+            return
+        previous_close = np.take_along_axis(close, np.maximum(last_valid, 0), axis=1)
+        for field in range(4):
+            data[field][gaps] = previous_close[gaps]
+        data[4][gaps] = 0.0
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.close.shape
+
+    def compute_indicators(self) -> Dict[str, np.ndarray]:
+        """حساب جميع المؤشرات لكل العملات دفعة واحدة"""
+        high, low, close, volume = self.high, self.low, self.close, self.volume
+        prev_close, prev_high, prev_low = _shift(close), _shift(high), _shift(low)
+        ind = {}
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # المتوسطات المتحركة
+            ind['EMA_9'] = ema(close, 9)
+            ind['EMA_21'] = ema(close, 21)
+            ind['SMA_50'] = sma(close, 50)
+            ind['SMA_200'] = sma(close, 200)
+
+            # RSI
+            change = close - prev_close
+            gain = rma(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), 14)
+            loss = rma(np.where(change < 0, change, np.where(np.isnan(change), np.nan, 0.0)), 14)
+            ind['RSI'] = 100 * gain / (gain + np.abs(loss))
+
+            # MACD
+            macd = ema(close, 12) - ema(close, 26)
+            ind['MACD'] = macd
+            ind['MACD_Signal'] = ema(macd, 9)
+
+            # Bollinger Bands
+            middle = sma(close, 20)
+            deviation = rolling_std(close, 20)
+            ind['BB_upper'] = middle + 2 * deviation
+            ind['BB_middle'] = middle
+            ind['BB_lower'] = middle - 2 * deviation
+
+            # الحجم: المتوسط و OBV و MFI
+            ind['Volume_MA'] = sma(volume, 20)
+            direction = np.sign(np.nan_to_num(change))
+            first = _first_valid(close)
+            has_data = first < close.shape[1]
+            direction[has_data, first[has_data]] = 1.0
+            ind['OBV'] = np.nancumsum(direction * volume, axis=1)
+            ind['OBV'][np.isnan(volume)] = np.nan
+
+            typical = (high + low + close) / 3
+            money_flow = typical * volume
+            typical_change = typical - _shift(typical)
+            positive_flow = rolling_sum(np.where(typical_change > 0, money_flow, np.where(np.isnan(money_flow), np.nan, 0.0)), 14)
+            negative_flow = rolling_sum(np.where(typical_change < 0, money_flow, np.where(np.isnan(money_flow), np.nan, 0.0)), 14)
+            ind['MFI'] = 100 * positive_flow / (positive_flow + negative_flow)
+
+            # ATR و ADX
+            true_range = np.fmax(np.abs(high - low), np.fmax(np.abs(high - prev_close), np.abs(prev_close - low)))
+            true_range[np.isnan(prev_close)] = np.nan
+            atr = rma(true_range, 14)
+            ind['ATR'] = atr
+
+            up = high - prev_high
+            down = prev_low - low
+            dm_pos = np.where((up > down) & (up > 0), up, 0.0)
+            dm_neg = np.where((down > up) & (down > 0), down, 0.0)
+            dm_pos[np.isnan(up)] = np.nan
+            dm_neg[np.isnan(down)] = np.nan
+            k = 100 / atr
+            di_plus = k * rma(dm_pos, 14)
+            di_minus = k * rma(dm_neg, 14)
+            ind['DIplus'] = di_plus
+            ind['DIminus'] = di_minus
+            ind['ADX'] = rma(100 * np.abs(di_plus - di_minus) / (di_plus + di_minus), 14)
+
+            # Stochastic
+            lowest = rolling_extreme(low, 14, largest=False)
+            highest = rolling_extreme(high, 14, largest=True)
+            price_range = highest - lowest
+            stoch = np.where(price_range > 0, 100 * (close - lowest) / np.where(price_range > 0, price_range, 1.0), 0.0)
+            stoch[np.isnan(price_range)] = np.nan
+            ind['SO_K'] = sma(stoch, 3)
+            ind['SO_D'] = sma(ind['SO_K'], 3)
+
+        self.indicators = ind
+        return ind
+
+    def analyze_trend(self, thresholds: Dict[str, float]) -> Dict[str, np.ndarray]:
+        """قوة الاتجاه والثقة ورمز الاتجاه لكل العملات في عملية واحدة"""
+        if not self.indicators:
+            self.compute_indicators()
+        ind = self.indicators
+        strength, confidence = trend_scores(
+            ind['ADX'], ind['DIplus'], ind['DIminus'], ind['RSI'], ind['MACD'],
+            ind['MACD_Signal'], ind['EMA_9'], ind['EMA_21'], ind['SMA_50']
+        )
+        ind['trend_strength'] = strength
+        ind['trend_confidence'] = confidence
+        ind['trend_code'] = classify_trend(strength, thresholds)
+        return ind
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """إطار DataFrame لعملة واحدة بأعمدة OHLCV والمؤشرات المحسوبة"""
+        i = self._index[symbol]
+        columns = {field: getattr(self, field)[i] for field in self.FIELDS}
+        columns.update({name: values[i] for name, values in self.indicators.items() if name != 'trend_code'})
+        df = pd.DataFrame(columns, index=pd.to_datetime(self.timestamps, unit='ms'))
+        if 'trend_code' in self.indicators:
+            df['market_trend'] = pd.Categorical.from_codes(
+                self.indicators['trend_code'][i], categories=TREND_LABELS, ordered=True
+            )
+        return df
+
+    def latest(self) -> pd.DataFrame:
+        """آخر قيمة لكل مؤشر لكل عملة (عملات × مؤشرات)"""
+        columns = {name: values[:, -1] for name, values in self.indicators.items() if name != 'trend_code'}
+        df = pd.DataFrame(columns, index=self.symbols)
+        if 'trend_code' in self.indicators:
+            df['market_trend'] = [TREND_LABELS[code] for code in self.indicators['trend_code'][:, -1]]
+        return df
@@ -0,0 +1,124 @@
+import logging
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+import numpy as np
+from .candle_buffer import timeframe_to_ms
+from .resampler import WEEK_OFFSET_MS
+
+class QualityReport(NamedTuple):
+    """نتيجة فحص دفعة شموع واحدة"""
+    rows: int           # عدد الشموع المستلمة
+    out_of_order: int   # شموع أقدم من سابقتها في الترتيب المستلم
+    duplicates: int     # طوابع زمنية مكررة (تبقى آخر نسخة)
+    misaligned: int     # طوابع لا تقع على شبكة الإطار الزمني (تحذف)
+    invalid: int        # شموع بقيم غير صالحة (تحذف ثم تملأ)
+    gaps: int           # عدد الفجوات في الشبكة
+    filled: int         # الشموع المضافة لملء الفجوات
+
+    @property
+    def clean(self) -> bool:
+        return not any(self[1:])
+
+
+def _invalid_mask(rows: np.ndarray) -> np.ndarray:
+    """الشموع ذات القيم المفقودة أو السالبة أو غير المتسقة (high/low)"""
+    open_, high, low, close, volume = rows[:, 1], rows[:, 2], rows[:, 3], rows[:, 4], rows[:, 5]
+    with np.errstate(invalid='ignore'):
+        return (
+            ~np.isfinite(rows).all(axis=1)
+            | (np.minimum.reduce([open_, high, low, close]) <= 0)
+            | (volume < 0)
+            | (high < np.maximum(open_, close))
+            | (low > np.minimum(open_, close))
+        )
+
+def repair_ohlcv(ohlcv, timeframe: str) -> Tuple[np.ndarray, np.ndarray, QualityReport]:
+    """ترتيب الشموع وإزالة المكرر والمعطوب وملء الفجوات على شبكة الإطار الزمني
+
+    الشموع المضافة تأخذ سعر إغلاق الشمعة السابقة لكل من OHLC مع حجم صفر. تعاد
+    المصفوفة المصلحة (n, 6) وقناع الشموع المضافة وتقرير بما تم. كل الخطوات
+    عمليات NumPy على المصفوفة كاملة دون حلقات.
+    """
+    rows = np.asarray(ohlcv, dtype=np.float64)
+    rows = rows.reshape(len(rows), -1)[:, :6]
+    received = len(rows)
+    if not received:
+        return rows, np.zeros(0, dtype=bool), QualityReport(0, 0, 0, 0, 0, 0, 0)
+
+    timestamps = rows[:, 0].astype(np.int64)
+    out_of_order = int(np.count_nonzero(np.diff(timestamps) < 0))
+    if out_of_order:
+        order = np.argsort(timestamps, kind='stable')
+        rows, timestamps = rows[order], timestamps[order]
+
+    # الإبقاء على آخر نسخة لكل طابع زمني
+    keep = np.append(timestamps[1:] != timestamps[:-1], True)
+    duplicates = int(len(keep) - np.count_nonzero(keep))
+
+    # الإطار الشهري غير منتظم الطول فلا يفحص على شبكة ثابتة
+    regular = not timeframe.endswith('M')
+    step = timeframe_to_ms(timeframe)
+    offset = WEEK_OFFSET_MS if timeframe.endswith('w') else 0
+    aligned = (timestamps - offset) % step == 0 if regular else np.ones(len(rows), dtype=bool)
+    misaligned = int(np.count_nonzero(keep & ~aligned))
+
+    invalid_rows = _invalid_mask(rows)
+    invalid = int(np.count_nonzero(keep & aligned & invalid_rows))
+
+    valid = keep & aligned & ~invalid_rows
+    rows, timestamps = rows[valid], timestamps[valid]
+    if not len(rows) or not regular:
+        report = QualityReport(received, out_of_order, duplicates, misaligned, invalid, 0, 0)
+        return rows, np.zeros(len(rows), dtype=bool), report
+
+    positions = (timestamps - timestamps[0]) // step
+    total = int(positions[-1]) + 1
+    gaps = int(np.count_nonzero(np.diff(positions) > 1))
+    filled_mask = np.ones(total, dtype=bool)
+    filled_mask[positions] = False
+
+    repaired = np.empty((total, 6), dtype=np.float64)
+    repaired[:, 0] = timestamps[0] + np.arange(total, dtype=np.int64) * step
+    # لكل موضع: فهرس آخر شمعة حقيقية سابقة له
+    source = np.zeros(total, dtype=np.int64)
+    source[positions] = np.arange(len(rows))
+    source = np.maximum.accumulate(np.where(filled_mask, 0, source))
+    repaired[:, 1:5] = rows[source, 4:5]
+    repaired[:, 5] = 0.0
+    repaired[positions, 1:] = rows[:, 1:]
+
+    report = QualityReport(received, out_of_order, duplicates, misaligned, invalid,
+                           gaps, int(total - len(rows)))
+    return repaired, filled_mask, report
+
+
+class DataQualityMonitor:
+    """مرحلة فحص وإصلاح بين الجلب وحساب المؤشرات مع عدادات تراكمية لكل عملة"""
+
+    COUNTERS = QualityReport._fields
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def process(self, symbol: str, timeframe: str, ohlcv) -> Tuple[np.ndarray, np.ndarray]:
+        """إصلاح دفعة شموع وتسجيل نتيجتها وإرجاع الشموع الصالحة مع قناع الشموع المضافة"""
+        repaired, filled, report = repair_ohlcv(ohlcv, timeframe)
+        with self._lock:
+            counters = self._counters.setdefault((symbol, timeframe), dict.fromkeys(self.COUNTERS, 0))
+            for name, value in zip(self.COUNTERS, report):
+                counters[name] += value
+        if not report.clean:
+            logging.warning(
+                f"مشاكل جودة في بيانات {symbol} {timeframe}: "
+                f"{', '.join(f'{name}={value}' for name, value in report._asdict().items() if value and name != 'rows')}"
+            )
+        return repaired, filled
+
+    def counters(self, symbol: Optional[str] = None) -> Dict[Tuple[str, str], Dict[str, int]]:
+        """العدادات التراكمية لكل (عملة، إطار زمني)، أو لعملة واحدة"""
+        with self._lock:
+            return {
+                key: dict(values) for key, values in self._counters.items()
+                if symbol is None or key[0] == symbol
+            }
@@ -0,0 +1,112 @@
+from typing import List, Optional
+from .candle_buffer import CandleBuffer, timeframe_to_ms
+
+# الأسبوع في Binance يبدأ يوم الاثنين 00:00 UTC، بينما بداية epoch يوم خميس
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+def bucket_start(timestamp: int, timeframe: str) -> int:
+    """بداية شمعة الإطار الأعلى التي تنتمي إليها الشمعة ذات الطابع `timestamp`"""
+    if timeframe.endswith('M'):
+        raise ValueError("الإطار الشهري غير مدعوم في التجميع المحلي")
+    step = timeframe_to_ms(timeframe)
+    offset = WEEK_OFFSET_MS if timeframe.endswith('w') else 0
+    return (timestamp - offset) // step * step + offset
+
+
+class TimeframeResampler:
+    """تجميع تزايدي لشموع إطار أساسي (مثل 1h) إلى إطار أعلى (4h أو 1d أو 1w)
+
+    يحتفظ بمجمع الشموع الأساسية المثبتة في الفترة الحالية إضافة إلى الشمعة
+    الأساسية قيد التكوين، فكل تحديث يكلف O(1) ويمكن تعديل الشمعة الأخيرة مراراً.
+    """
+
+    def __init__(self, base_timeframe: str, target_timeframe: str, capacity: int = 1000):
+        base_ms = timeframe_to_ms(base_timeframe)
+        target_ms = timeframe_to_ms(target_timeframe)
+        if target_ms <= base_ms or target_ms % base_ms:
+            raise ValueError(f"لا يمكن تجميع {base_timeframe} إلى {target_timeframe}")
+        self.base_timeframe = base_timeframe
+        self.target_timeframe = target_timeframe
+        self.buffer = CandleBuffer(capacity)
+        self.history_seeded = False  # هل أضيفت شموع أقدم من المنصة قبل أول شمعة مجمعة
+        self._bucket: Optional[int] = None
+        self._committed: Optional[list] = None  # [open, high, low, close, volume]
+        self._forming: Optional[list] = None
+
+    @property
+    def last_base_timestamp(self) -> Optional[int]:
+        return int(self._forming[0]) if self._forming is not None else None
+
+    def update(self, candle: list) -> Optional[list]:
+        """إضافة أو تحديث شمعة أساسية وإرجاع شمعة الإطار الأعلى المحدثة"""
+        timestamp = int(candle[0])
+        if self._forming is not None:
+            if timestamp < self._forming[0]:
+                return None  # تحديث قديم
+            if timestamp > self._forming[0]:
+                self._commit(self._forming)
+
+        bucket = bucket_start(timestamp, self.target_timeframe)
+        if bucket != self._bucket:
+            self._bucket = bucket
+            self._committed = None
+        self._forming = list(candle[:6])
+
+        bar = [bucket] + self._combine(self._committed, self._forming[1:])
+        self.buffer.merge([bar])
+        return bar
+
+    def update_many(self, ohlcv: List[list]) -> int:
+        """تغذية الشموع الأساسية الأحدث فقط؛ تعيد البناء إذا انقطع التسلسل"""
+        if not ohlcv:
+            return 0
+        last = self.last_base_timestamp
+        rows = ohlcv
+        if last is not None:
+            newer = [row for row in ohlcv if row[0] >= last]
+            if newer and newer[0][0] == last:
+                rows = newer
+            elif not newer:
+                return 0
+            else:
+                self._reset()
+        if self.last_base_timestamp is None:
+            rows = self._skip_partial_bucket(rows)
+        for row in rows:
+            self.update(row)
+        return len(rows)
+
+    def tail(self, limit: int) -> List[list]:
+        return self.buffer.tail(limit)
+
+    def prepend_history(self, ohlcv: List[list]) -> None:
+        """إضافة شموع أقدم للإطار الأعلى (مجلوبة مرة واحدة) قبل أول شمعة مجمعة محلياً"""
+        derived = self.buffer.tail(self.buffer.capacity)
+        first = derived[0][0] if derived else None
+        older = [list(row[:6]) for row in ohlcv if first is None or row[0] < first]
+        if older:
+            self.buffer.merge(older + derived)
+        self.history_seeded = True
+
+    def _skip_partial_bucket(self, rows: List[list]) -> List[list]:
+        """تجاهل الشموع الأولى التي لا تغطي فترة الإطار الأعلى من بدايتها"""
+        for index, row in enumerate(rows):
+            if bucket_start(int(row[0]), self.target_timeframe) == row[0]:
+                return rows[index:]
+        return []
+
+    def _commit(self, candle: list) -> None:
+        if bucket_start(int(candle[0]), self.target_timeframe) == self._bucket:
+            self._committed = self._combine(self._committed, candle[1:])
+
+    def _reset(self) -> None:
+        self.buffer = CandleBuffer(self.buffer.capacity)
+        self.history_seeded = False
+        self._bucket = self._committed = self._forming = None
+
+    @staticmethod
+    def _combine(aggregate: Optional[list], values: list) -> list:
+        open_, high, low, close, volume = (float(value) for value in values[:5])
+        if aggregate is None:
+            return [open_, high, low, close, volume]
+        return [aggregate[0], max(aggregate[1], high), min(aggregate[2], low), close, aggregate[4] + volume]
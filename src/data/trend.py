@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+
+TREND_LABELS = ['STRONG_DOWNTREND', 'DOWNTREND', 'SIDEWAYS', 'UPTREND', 'STRONG_UPTREND']
+
+def trend_scores(adx, di_plus, di_minus, rsi, macd, macd_signal,
+                 ema_9, ema_21, sma_50) -> Tuple[np.ndarray, np.ndarray]:
+    """حساب قوة الاتجاه والثقة لمصفوفات مؤشرات بأي شكل (سلسلة واحدة أو عدة عملات)
+
+    القيم الناقصة (NaN) تعامل كما في المقارنات العادية: أي مقارنة معها خاطئة.
+    يتم الجمع بنفس ترتيب الحلقة الأصلية لتطابق النتائج حتى آخر بت.
+    """
+    adx, di_plus, di_minus, rsi, macd, macd_signal, ema_9, ema_21, sma_50 = (
+        np.asarray(values, dtype=np.float64)
+        for values in (adx, di_plus, di_minus, rsi, macd, macd_signal, ema_9, ema_21, sma_50)
+    )
+    with np.errstate(invalid='ignore'):
+        strong_adx = adx > 25
+        # تحليل ADX
+        strength = np.where(strong_adx, np.where(di_plus > di_minus, 0.3, -0.3), 0.0)
+        confidence = np.where(strong_adx, 0.2, 0.0)
+
+        # تحليل RSI
+        strength = strength + np.where(rsi > 70, -0.2, np.where(rsi < 30, 0.2, 0.0))
+        confidence = confidence + 0.1
+
+        # تحليل MACD
+        strength = strength + np.where(macd > macd_signal, 0.2, -0.2)
+        confidence = confidence + 0.2
+
+        # تحليل المتوسطات المتحركة
+        aligned_up = (ema_9 > ema_21) & (ema_21 > sma_50)
+        aligned_down = (ema_9 < ema_21) & (ema_21 < sma_50)
+        strength = strength + np.where(aligned_up, 0.2, np.where(aligned_down, -0.2, 0.0))
+        confidence = confidence + 0.1
+
+    return strength, confidence
+
+def classify_trend(strength, thresholds: Dict[str, float]) -> np.ndarray:
+    """رمز الاتجاه (فهرس في TREND_LABELS) لكل قيمة قوة، بحدود مغلقة من اليمين مثل pd.cut"""
+    edges = [-thresholds['strong_uptrend'], -thresholds['uptrend'],
+             thresholds['uptrend'], thresholds['strong_uptrend']]
+    return np.digitize(np.asarray(strength), edges, right=True)
+
+def analyze_trend(df: pd.DataFrame, thresholds: Dict[str, float]) -> pd.DataFrame:
+    """إضافة أعمدة trend_strength و trend_confidence و market_trend إلى الإطار"""
+    strength, confidence = trend_scores(
+        df['ADX'], df['DIplus'], df['DIminus'], df['RSI'],
+        df['MACD'], df['MACD_Signal'], df['EMA_9'], df['EMA_21'], df['SMA_50']
+    )
+    df['trend_strength'] = strength
+    df['trend_confidence'] = confidence
+    df['market_trend'] = pd.Categorical.from_codes(
+        classify_trend(strength, thresholds), categories=TREND_LABELS, ordered=True
+    )
+    return df
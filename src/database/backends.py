@@ -0,0 +1,378 @@
+import json
+import os
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from heapq import merge
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+# المجموعات التي تحفظ كسجلات مرتبة بالوقت وتستعلم بمدى زمني
+DOCUMENT_COLLECTIONS = ('technical_analysis', 'news_analysis', 'trades')
+
+class StorageBackend:
+    """الواجهة التي يعتمد عليها DatabaseManager لأي مخزن بيانات"""
+
+    # True إذا كانت الكتابة المجمعة عبر الطابور المؤجل تفيد هذا المخزن
+    buffered = False
+
+    def upsert_candles(self, candles: List[Dict]) -> None:
+        """إضافة أو استبدال شموع بالمفتاح (symbol, timeframe, timestamp)"""
+        raise NotImplementedError
+
+    def last_candle_timestamp(self, symbol: str, timeframe: str) -> Optional[datetime]:
+        raise NotImplementedError
+
+    def recent_candles(self, symbol: str, limit: int, timeframe: Optional[str] = None) -> List[Dict]:
+        """أحدث الشموع أولاً، لإطار واحد أو لكل الإطارات"""
+        raise NotImplementedError
+
+    def upsert_latest_indicators(self, documents: List[Dict]) -> None:
+        """استبدال وثيقة آخر المؤشرات لكل (symbol, timeframe)"""
+        raise NotImplementedError
+
+    def latest_indicators(self, symbol: str) -> Optional[Dict]:
+        """أحدث وثيقة مؤشرات للعملة عبر كل الإطارات"""
+        raise NotImplementedError
+
+    def insert(self, collection: str, documents: List[Dict]) -> None:
+        raise NotImplementedError
+
+    def find_range(self, collection: str, start: datetime, end: datetime) -> List[Dict]:
+        """سجلات المجموعة ضمن [start, end] الأحدث أولاً"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class _SortedSeries:
+    """سجلات مرتبة بالوقت مع فهرس طوابع زمنية للبحث الثنائي وحد أقصى للاحتفاظ"""
+
+    def __init__(self, retention: int):
+        self.retention = retention
+        self.timestamps: List[datetime] = []
+        self.rows: List[Dict] = []
+
+    def upsert(self, timestamp: datetime, row: Dict) -> None:
+        # الحالة الشائعة: سجل أحدث أو استبدال الأخير، دون إزاحة
+        if not self.timestamps or timestamp > self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.rows.append(row)
+        else:
+            index = bisect_left(self.timestamps, timestamp)
+            if index < len(self.timestamps) and self.timestamps[index] == timestamp:
+                self.rows[index] = row
+            else:
+                self.timestamps.insert(index, timestamp)
+                self.rows.insert(index, row)
+        self._evict()
+
+    def append(self, timestamp: datetime, row: Dict) -> None:
+        """إضافة سجل دون استبدال (للمجموعات التي قد تتكرر فيها الطوابع الزمنية)"""
+        index = bisect_right(self.timestamps, timestamp)
+        self.timestamps.insert(index, timestamp)
+        self.rows.insert(index, row)
+        self._evict()
+
+    def _evict(self) -> None:
+        # الحذف من البداية على دفعات (ربع الحد) حتى لا تتكرر إزاحة القائمة مع كل إضافة
+        overflow = len(self.rows) - self.retention
+        if overflow >= max(self.retention // 4, 1):
+            del self.timestamps[:overflow]
+            del self.rows[:overflow]
+
+    def tail(self, limit: int) -> List[Dict]:
+        """آخر `limit` سجل ضمن حد الاحتفاظ، الأحدث أولاً"""
+        limit = min(limit, self.retention)
+        return self.rows[:-limit - 1:-1] if limit > 0 else []
+
+    def range(self, start: datetime, end: datetime) -> List[Dict]:
+        lo = max(bisect_left(self.timestamps, start), len(self.rows) - self.retention)
+        hi = bisect_right(self.timestamps, end)
+        return self.rows[lo:hi][::-1]
+
+
+class MemoryBackend(StorageBackend):
+    """مخزن في الذاكرة بفهرس زمني لكل عملة وإطار، مع حد احتفاظ لكل سلسلة"""
+
+    def __init__(self, candle_retention: Optional[int] = None, document_retention: Optional[int] = None):
+        self.candle_retention = candle_retention or Config.MEMORY_CANDLE_RETENTION
+        self.document_retention = document_retention or Config.MEMORY_DOCUMENT_RETENTION
+        self._candles: Dict[Tuple[str, str], _SortedSeries] = {}
+        self._timeframes: Dict[str, List[str]] = {}
+        self._latest: Dict[str, Dict[str, Dict]] = {}
+        self._documents = {name: _SortedSeries(self.document_retention) for name in DOCUMENT_COLLECTIONS}
+        self._lock = threading.RLock()
+
+    def upsert_candles(self, candles: List[Dict]) -> None:
+        with self._lock:
+            for candle in candles:
+                key = (candle['symbol'], candle['timeframe'])
+                series = self._candles.get(key)
+                if series is None:
+                    series = self._candles[key] = _SortedSeries(self.candle_retention)
+                    self._timeframes.setdefault(key[0], []).append(key[1])
+                series.upsert(candle['timestamp'], candle)
+
+    def last_candle_timestamp(self, symbol: str, timeframe: str) -> Optional[datetime]:
+        with self._lock:
+            series = self._candles.get((symbol, timeframe))
+            return series.timestamps[-1] if series and series.timestamps else None
+
+    def recent_candles(self, symbol: str, limit: int, timeframe: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            timeframes = [timeframe] if timeframe is not None else self._timeframes.get(symbol, [])
+            tails = [self._candles[(symbol, tf)].tail(limit) for tf in timeframes if (symbol, tf) in self._candles]
+            if len(tails) == 1:
+                return tails[0]
+            return list(islice(merge(*tails, key=lambda row: row['timestamp'], reverse=True), limit))
+
+    def upsert_latest_indicators(self, documents: List[Dict]) -> None:
+        with self._lock:
+            for document in documents:
+                self._latest.setdefault(document['symbol'], {})[document['timeframe']] = document
+
+    def latest_indicators(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            documents = self._latest.get(symbol)
+            return max(documents.values(), key=lambda doc: doc['timestamp']) if documents else None
+
+    def insert(self, collection: str, documents: List[Dict]) -> None:
+        with self._lock:
+            series = self._documents[collection]
+            for document in documents:
+                series.append(document['timestamp'], dict(document))
+
+    def find_range(self, collection: str, start: datetime, end: datetime) -> List[Dict]:
+        with self._lock:
+            return self._documents[collection].range(start, end)
+
+
+class MongoBackend(StorageBackend):
+    """MongoDB: مجموعة candles بمفتاح فريد، ووثيقة latest_indicators لكل عملة وإطار"""
+
+    buffered = True
+
+    def __init__(self, url: str, database: str = 'crypto_trading'):
+        from pymongo import MongoClient
+        self.client = MongoClient(url)
+        self.db = self.client[database]
+
+        # candles: وثيقة لكل شمعة (عملة، إطار زمني، وقت الافتتاح) بدلاً من نسخة كاملة للإطار كل دورة
+        self.candles = self.db['candles']
+        self.latest = self.db['latest_indicators']
+        self.collections = {name: self.db[name] for name in DOCUMENT_COLLECTIONS}
+
+        # إنشاء Indexes (أول عملية تتصل بالخادم فتفشل هنا إن لم يكن متاحاً)
+        self.candles.create_index([("symbol", 1), ("timeframe", 1), ("timestamp", -1)], unique=True)
+        self.latest.create_index([("symbol", 1), ("timeframe", 1)], unique=True)
+        self.latest.create_index([("symbol", 1), ("timestamp", -1)])
+        self.collections['technical_analysis'].create_index([("symbol", 1), ("timestamp", -1)])
+        self.collections['news_analysis'].create_index([("symbol", 1), ("timestamp", -1)])
+        self.collections['trades'].create_index([("timestamp", -1)])
+
+    def upsert_candles(self, candles: List[Dict]) -> None:
+        from pymongo import UpdateOne
+        # عند تكرار نفس الشمعة في الدفعة تبقى آخر نسخة (الكتابة غير مرتبة)
+        latest = {(c['symbol'], c['timeframe'], c['timestamp']): c for c in candles}
+        if latest:
+            self.candles.bulk_write([
+                UpdateOne(
+                    {'symbol': symbol, 'timeframe': timeframe, 'timestamp': timestamp},
+                    {'$set': candle},
+                    upsert=True
+                )
+                for (symbol, timeframe, timestamp), candle in latest.items()
+            ], ordered=False)
+
+    def last_candle_timestamp(self, symbol: str, timeframe: str) -> Optional[datetime]:
+        latest = self.candles.find_one(
+            {'symbol': symbol, 'timeframe': timeframe},
+            {'_id': 0, 'timestamp': 1},
+            sort=[('timestamp', -1)]
+        )
+        return latest['timestamp'] if latest else None
+
+    def recent_candles(self, symbol: str, limit: int, timeframe: Optional[str] = None) -> List[Dict]:
+        query = {'symbol': symbol}
+        if timeframe is not None:
+            query['timeframe'] = timeframe
+        return list(self.candles.find(query, {'_id': 0}).sort('timestamp', -1).limit(limit))
+
+    def upsert_latest_indicators(self, documents: List[Dict]) -> None:
+        from pymongo import ReplaceOne
+        latest = {(doc['symbol'], doc['timeframe']): doc for doc in documents}
+        if latest:
+            self.latest.bulk_write([
+                ReplaceOne({'symbol': symbol, 'timeframe': timeframe}, doc, upsert=True)
+                for (symbol, timeframe), doc in latest.items()
+            ], ordered=False)
+
+    def latest_indicators(self, symbol: str) -> Optional[Dict]:
+        return self.latest.find_one({'symbol': symbol}, {'_id': 0}, sort=[('timestamp', -1)])
+
+    def insert(self, collection: str, documents: List[Dict]) -> None:
+        # insert_many يضيف _id إلى الوثائق نفسها فتمرر نسخ منها
+        self.collections[collection].insert_many([dict(document) for document in documents])
+
+    def find_range(self, collection: str, start: datetime, end: datetime) -> List[Dict]:
+        return list(self.collections[collection].find(
+            {'timestamp': {'$gte': start, '$lte': end}},
+            {'_id': 0}
+        ).sort('timestamp', -1))
+
+    def close(self) -> None:
+        self.client.close()
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _to_micros(timestamp: datetime) -> int:
+    """datetime (أو pandas.Timestamp) إلى ميكروثانية منذ 1970 بتوقيت UTC"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+def _encode(document: Dict) -> str:
+    # الوقت يخزن في عمود مفهرس منفصل
+    return json.dumps({k: v for k, v in document.items() if k not in ('timestamp', '_id')}, default=_json_default)
+
+def _decode(timestamp: int, document: str) -> Dict:
+    return {**json.loads(document), 'timestamp': _from_micros(timestamp)}
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    symbol TEXT NOT NULL, timeframe TEXT NOT NULL, timestamp INTEGER NOT NULL, document TEXT NOT NULL,
+    PRIMARY KEY (symbol, timeframe, timestamp)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS candles_symbol_timestamp ON candles (symbol, timestamp);
+CREATE TABLE IF NOT EXISTS latest_indicators (
+    symbol TEXT NOT NULL, timeframe TEXT NOT NULL, timestamp INTEGER NOT NULL, document TEXT NOT NULL,
+    PRIMARY KEY (symbol, timeframe)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS latest_indicators_symbol_timestamp ON latest_indicators (symbol, timestamp);
+""" + "".join(f"""
+CREATE TABLE IF NOT EXISTS {name} (
+    id INTEGER PRIMARY KEY, symbol TEXT, timestamp INTEGER NOT NULL, document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {name}_timestamp ON {name} (timestamp);
+CREATE INDEX IF NOT EXISTS {name}_symbol_timestamp ON {name} (symbol, timestamp);
+""" for name in DOCUMENT_COLLECTIONS)
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite مضمن بوضع WAL لتشغيل البوت على جهاز واحد دون خادم MongoDB
+
+    لكل خيط اتصاله الخاص (WAL يسمح بالقراءة أثناء الكتابة)، ويغلق اتصال الخيط بعد
+    انتهائه عند فتح اتصال جديد فلا تتراكم اتصالات خيوط الكتابة. نصوص الاستعلامات ثابتة
+    فيعيد sqlite3 استخدام نسخها المحضرة، وكل دفعة تكتب في معاملة واحدة. الوثائق
+    تحفظ JSON مع الوقت في عمود INTEGER (ميكروثانية) تغطيه الفهارس.
+    """
+
+    buffered = True
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        self._connection().executescript(_SQLITE_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, cached_statements=256)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')  # آمن مع WAL ويتجنب fsync لكل معاملة
+            self._local.connection = connection
+            with self._connections_lock:
+                for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = connection
+        return connection
+
+    def _write(self, sql: str, rows: List[Tuple]) -> None:
+        if rows:
+            connection = self._connection()
+            with connection:
+                connection.executemany(sql, rows)
+
+    def upsert_candles(self, candles: List[Dict]) -> None:
+        self._write(
+            'INSERT OR REPLACE INTO candles (symbol, timeframe, timestamp, document) VALUES (?, ?, ?, ?)',
+            [(c['symbol'], c['timeframe'], _to_micros(c['timestamp']), _encode(c)) for c in candles]
+        )
+
+    def last_candle_timestamp(self, symbol: str, timeframe: str) -> Optional[datetime]:
+        row = self._connection().execute(
+            'SELECT MAX(timestamp) FROM candles WHERE symbol = ? AND timeframe = ?', (symbol, timeframe)
+        ).fetchone()
+        return _from_micros(row[0]) if row[0] is not None else None
+
+    def recent_candles(self, symbol: str, limit: int, timeframe: Optional[str] = None) -> List[Dict]:
+        if timeframe is not None:
+            rows = self._connection().execute(
+                'SELECT timestamp, document FROM candles WHERE symbol = ? AND timeframe = ? '
+                'ORDER BY timestamp DESC LIMIT ?', (symbol, timeframe, limit)
+            )
+        else:
+            rows = self._connection().execute(
+                'SELECT timestamp, document FROM candles WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?',
+                (symbol, limit)
+            )
+        return [_decode(timestamp, document) for timestamp, document in rows]
+
+    def upsert_latest_indicators(self, documents: List[Dict]) -> None:
+        self._write(
+            'INSERT OR REPLACE INTO latest_indicators (symbol, timeframe, timestamp, document) VALUES (?, ?, ?, ?)',
+            [(d['symbol'], d['timeframe'], _to_micros(d['timestamp']), _encode(d)) for d in documents]
+        )
+
+    def latest_indicators(self, symbol: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            'SELECT timestamp, document FROM latest_indicators WHERE symbol = ? ORDER BY timestamp DESC LIMIT 1',
+            (symbol,)
+        ).fetchone()
+        return _decode(*row) if row else None
+
+    def insert(self, collection: str, documents: List[Dict]) -> None:
+        if collection not in DOCUMENT_COLLECTIONS:
+            raise KeyError(collection)
+        self._write(
+            f'INSERT INTO {collection} (symbol, timestamp, document) VALUES (?, ?, ?)',
+            [(d.get('symbol'), _to_micros(d['timestamp']), _encode(d)) for d in documents]
+        )
+
+    def find_range(self, collection: str, start: datetime, end: datetime) -> List[Dict]:
+        if collection not in DOCUMENT_COLLECTIONS:
+            raise KeyError(collection)
+        rows = self._connection().execute(
+            f'SELECT timestamp, document FROM {collection} WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp DESC',
+            (_to_micros(start), _to_micros(end))
+        )
+        return [_decode(timestamp, document) for timestamp, document in rows]
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,55 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from config import Config
+
+class LatestStateCache:
+    """نموذج قراءة لآخر حالة لكل عملة: يحدث عند الكتابة ويقرأ من المخزن عند الحاجة فقط
+
+    كل إدخال يحمل وثيقة آخر المؤشرات (عبر كل الأطر الزمنية) ووقت تحميله. بعد
+    `ttl` ثانية يعاد التحقق من المخزن لالتقاط كتابات عمليات أخرى (مثل عملية
+    collect منفصلة)، مع الإبقاء على الوثيقة الأحدث حتى لا تغطي قراءة قديمة على
+    كتابة محلية لم يفرغها الطابور المؤجل بعد.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[Dict]], ttl: Optional[float] = None):
+        self.loader = loader
+        self.ttl = Config.LATEST_STATE_TTL if ttl is None else ttl
+        self._entries: Dict[str, Dict] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def update(self, document: Dict) -> None:
+        """تسجيل وثيقة مكتوبة للتو إن كانت أحدث من الموجودة"""
+        symbol = document['symbol']
+        with self._lock:
+            self._store(symbol, document)
+            self._loaded_at.setdefault(symbol, time.monotonic())
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            loaded_at = self._loaded_at.get(symbol)
+            if loaded_at is not None and time.monotonic() - loaded_at < self.ttl:
+                return self._entries.get(symbol)
+
+        # القراءة من المخزن خارج القفل حتى لا تنتظر الكتابات استعلام قاعدة البيانات
+        document = self.loader(symbol)
+        with self._lock:
+            if document is not None:
+                self._store(symbol, document)
+            self._loaded_at[symbol] = time.monotonic()
+            return self._entries.get(symbol)
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """إجبار القراءة التالية على الرجوع للمخزن (لعملة واحدة أو للجميع)"""
+        with self._lock:
+            if symbol is None:
+                self._loaded_at.clear()
+            else:
+                self._loaded_at.pop(symbol, None)
+
+    def _store(self, symbol: str, document: Dict) -> None:
+        current = self._entries.get(symbol)
+        if current is None or document['timestamp'] >= current.get('timestamp', datetime.min):
+            self._entries[symbol] = document
@@ -1,103 +1,161 @@
-from pymongo import MongoClient
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 import logging
 import os
+import threading
+from config import Config
+from .backends import MemoryBackend, MongoBackend, SQLiteBackend, StorageBackend
+from .latest_state import LatestStateCache
+from .write_behind import WriteBehindQueue
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, backend: Optional[StorageBackend] = None):
         try:
-            # Using environment variable for MongoDB connection
-            mongo_url = os.getenv('MONGODB_URL', 'mongodb://localhost:27017/')
-            self.client = MongoClient(mongo_url)
-            self.db = self.client['crypto_trading']
-
-            # إنشاء Collections
-            self.market_data = self.db['market_data']
-            self.technical_analysis = self.db['technical_analysis']
-            self.news_analysis = self.db['news_analysis']
-            self.trades = self.db['trades']
-
-            # إنشاء Indexes
-            self.market_data.create_index([("symbol", 1), ("timestamp", -1)])
-            self.technical_analysis.create_index([("symbol", 1), ("timestamp", -1)])
-            self.news_analysis.create_index([("symbol", 1), ("timestamp", -1)])
-
-            logging.info("تم الاتصال بقاعدة البيانات MongoDB بنجاح")
+            self.backend = backend or self._open_backend()
         except Exception as e:
             logging.error(f"خطأ في الاتصال بقاعدة البيانات: {e}")
-            # Initialize empty collections for testing
-            self._initialize_test_collections()
-
-    def _initialize_test_collections(self):
-        """Initialize empty collections for testing when MongoDB is not available"""
-        self.market_data = []
-        self.technical_analysis = []
-        self.news_analysis = []
-        self.trades = []
-        logging.info("تم تهيئة مجموعات البيانات للاختبار")
+            # مخزن مفهرس في الذاكرة بنفس الواجهة عند تعذر فتح قاعدة البيانات
+            self.backend = MemoryBackend()
+            logging.info("تم تهيئة مخزن البيانات في الذاكرة")
+
+        # آخر شمعة محفوظة لكل (عملة، إطار زمني) لكتابة الشموع الجديدة فقط؛ تتقدم
+        # بعد تأكيد الكتابة في المخزن وليس عند إضافتها إلى الطابور
+        self._candle_watermarks: Dict[Tuple[str, str], datetime] = {}
+        self._watermark_lock = threading.Lock()
+
+        # كتابة مؤجلة لبيانات السوق والتحليل؛ الصفقات تكتب مباشرة دائماً
+        self.write_behind = WriteBehindQueue({
+            'candles': self._write_candles,
+            'latest_indicators': self.backend.upsert_latest_indicators,
+            'technical_analysis': partial(self.backend.insert, 'technical_analysis'),
+            'news_analysis': partial(self.backend.insert, 'news_analysis')
+        }) if Config.DB_WRITE_BEHIND and self.backend.buffered else None
+
+        # آخر حالة لكل عملة: قراءة O(1) للاتجاه والمؤشرات دون استعلام قاعدة البيانات
+        self.latest_state = LatestStateCache(self.backend.latest_indicators)
+
+    @staticmethod
+    def _open_backend() -> StorageBackend:
+        """اختيار المخزن حسب Config.DB_BACKEND"""
+        if Config.DB_BACKEND == 'memory':
+            return MemoryBackend()
+        if Config.DB_BACKEND == 'sqlite':
+            backend = SQLiteBackend(Config.SQLITE_PATH)
+            logging.info(f"تم فتح قاعدة البيانات SQLite: {Config.SQLITE_PATH}")
+            return backend
+
+        # Using environment variable for MongoDB connection
+        mongo_url = os.getenv('MONGODB_URL', 'mongodb://localhost:27017/')
+        backend = MongoBackend(mongo_url)
+        logging.info("تم الاتصال بقاعدة البيانات MongoDB بنجاح")
+        return backend
+
+    def _submit(self, kind: str, item: Dict, handler) -> None:
+        """تمرير الكتابة إلى الطابور المؤجل إن وجد، وإلا كتابتها مباشرة"""
+        if self.write_behind is not None:
+            self.write_behind.put(kind, item)
+        else:
+            handler([item])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """انتظار كتابة كل العمليات المؤجلة"""
+        return self.write_behind.flush(timeout) if self.write_behind is not None else True
+
+    def close(self) -> None:
+        if self.write_behind is not None:
+            self.write_behind.close()
+        self.backend.close()
+
+    def write_stats(self) -> Dict:
+        """مقاييس طابور الكتابة المؤجلة (العمق، الانتظار، الأخطاء...)"""
+        return self.write_behind.stats() if self.write_behind is not None else {}
 
     def save_market_data(self, symbol: str, data: Dict) -> None:
-        """حفظ بيانات السوق مع المؤشرات الفنية"""
-        try:
-            market_data = {
-                'symbol': symbol,
-                'timestamp': datetime.now(),
-                'data': data['data'],
-                'technical_indicators': {
-                    'trend': {
-                        'direction': data.get('market_trend', 'UNKNOWN'),
-                        'strength': data.get('trend_strength', 0),
-                        'confidence': data.get('trend_confidence', 0)
-                    },
-                    'moving_averages': {
-                        'ema_9': data.get('EMA_9', 0),
-                        'ema_21': data.get('EMA_21', 0),
-                        'sma_50': data.get('SMA_50', 0),
-                        'sma_200': data.get('SMA_200', 0)
-                    },
-                    'momentum': {
-                        'rsi': data.get('RSI', 0),
-                        'macd': data.get('MACD', 0),
-                        'macd_signal': data.get('MACD_Signal', 0)
-                    },
-                    'volume': {
-                        'current': data.get('volume', 0),
-                        'ma': data.get('Volume_MA', 0),
-                        'mfi': data.get('MFI', 0),
-                        'obv': data.get('OBV', 0)
-                    }
-                }
-            }
+        """حفظ شموع السوق مع مؤشراتها وتحديث وثيقة آخر المؤشرات
 
-            if isinstance(self.market_data, list):
-                self.market_data.append(market_data)
-            else:
-                self.market_data.insert_one(market_data)
+        `data['data']` سجلات الشموع (مع الحقل timestamp لوقت افتتاح الشمعة)،
+        و`data['interval']` الإطار الزمني، و`data['indicators']` آخر قيم المؤشرات.
+        """
+        try:
+            timeframe = data.get('interval', 'unknown')
+            self.save_candles(symbol, timeframe, data.get('data', []))
+            if data.get('indicators'):
+                self.save_latest_indicators(symbol, timeframe, data['indicators'])
         except Exception as e:
             logging.error(f"خطأ في حفظ بيانات السوق: {e}")
 
+    def last_candle_timestamp(self, symbol: str, timeframe: str) -> Optional[datetime]:
+        """وقت آخر شمعة محفوظة، ويقرأ من قاعدة البيانات عند أول طلب بعد التشغيل"""
+        key = (symbol, timeframe)
+        if key not in self._candle_watermarks:
+            latest = self.backend.last_candle_timestamp(symbol, timeframe)
+            if latest is not None:
+                self._advance_watermark(key, latest)
+        return self._candle_watermarks.get(key)
+
+    def _advance_watermark(self, key: Tuple[str, str], timestamp: datetime) -> None:
+        with self._watermark_lock:
+            current = self._candle_watermarks.get(key)
+            if current is None or timestamp > current:
+                self._candle_watermarks[key] = timestamp
+
+    def save_candles(self, symbol: str, timeframe: str, records: List[Dict]) -> int:
+        """كتابة الشموع بعمليات upsert مجمعة؛ تتجاهل ما هو أقدم من آخر شمعة محفوظة
+
+        الشمعة الأخيرة المحفوظة قد تكون قيد التكوين فيعاد كتابتها، وتكرار الكتابة
+        آمن لأن المفتاح (العملة، الإطار، وقت الافتتاح) فريد. آخر شمعة محفوظة لا
+        تتقدم إلا بعد نجاح الكتابة، فالدفعة التي تفشل يعاد إرسالها في الدورة التالية.
+        """
+        watermark = self.last_candle_timestamp(symbol, timeframe)
+        candles = [
+            {**record, 'symbol': symbol, 'timeframe': timeframe}
+            for record in records
+            if watermark is None or record['timestamp'] >= watermark
+        ]
+        if not candles:
+            return 0
+
+        self._submit('candles', candles, self._write_candles)
+        return len(candles)
+
+    def save_latest_indicators(self, symbol: str, timeframe: str, indicators: Dict) -> None:
+        """وثيقة صغيرة واحدة لكل (عملة، إطار زمني) بآخر قيم المؤشرات"""
+        document = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'timestamp': datetime.now(),
+            'technical_indicators': indicators
+        }
+        self.latest_state.update(document)
+        self._submit('latest_indicators', document, self.backend.upsert_latest_indicators)
+
+    def _write_candles(self, batches: List[List[Dict]]) -> None:
+        """دمج دفعات الشموع في عملية upsert واحدة ثم تقديم آخر شمعة محفوظة"""
+        candles = [candle for batch in batches for candle in batch]
+        self.backend.upsert_candles(candles)
+
+        latest: Dict[Tuple[str, str], datetime] = {}
+        for candle in candles:
+            key = (candle['symbol'], candle['timeframe'])
+            if key not in latest or candle['timestamp'] > latest[key]:
+                latest[key] = candle['timestamp']
+        for key, timestamp in latest.items():
+            self._advance_watermark(key, timestamp)
+
     def save_technical_analysis(self, symbol: str, analysis: Dict) -> None:
         """حفظ نتائج التحليل الفني"""
         try:
-            if isinstance(self.technical_analysis, list):
-                self.technical_analysis.append({**analysis, 'symbol': symbol, 'timestamp': datetime.now()})
-            else:
-                analysis['symbol'] = symbol
-                analysis['timestamp'] = datetime.now()
-                self.technical_analysis.insert_one(analysis)
+            document = {**analysis, 'symbol': symbol, 'timestamp': datetime.now()}
+            self._submit('technical_analysis', document, partial(self.backend.insert, 'technical_analysis'))
         except Exception as e:
             logging.error(f"خطأ في حفظ التحليل الفني: {e}")
 
     def save_news_analysis(self, symbol: str, news_data: Dict) -> None:
         """حفظ تحليل الأخبار"""
         try:
-            if isinstance(self.news_analysis, list):
-                self.news_analysis.append({**news_data, 'symbol': symbol, 'timestamp': datetime.now()})
-            else:
-                news_data['symbol'] = symbol
-                news_data['timestamp'] = datetime.now()
-                self.news_analysis.insert_one(news_data)
+            document = {**news_data, 'symbol': symbol, 'timestamp': datetime.now()}
+            self._submit('news_analysis', document, partial(self.backend.insert, 'news_analysis'))
         except Exception as e:
             logging.error(f"خطأ في حفظ تحليل الأخبار: {e}")
 
@@ -116,23 +174,16 @@ class DatabaseManager:
                 'strategy_type': trade_data.get('strategy_type')
             }
 
-            if isinstance(self.trades, list):
-                self.trades.append(trade_record)
-            else:
-                self.trades.insert_one(trade_record)
+            # كتابة مباشرة ومؤكدة: لا تمر الصفقات عبر الطابور المؤجل
+            self.backend.insert('trades', [trade_record])
         except Exception as e:
             logging.error(f"خطأ في حفظ معلومات التداول: {e}")
 
-    def get_recent_market_data(self, symbol: str, limit: int = 100) -> List[Dict]:
-        """استرجاع أحدث بيانات السوق"""
+    def get_recent_market_data(self, symbol: str, limit: int = 100,
+                               timeframe: Optional[str] = None) -> List[Dict]:
+        """استرجاع أحدث الشموع المحفوظة (الأحدث أولاً)"""
         try:
-            if isinstance(self.market_data, list):
-                return sorted([item for item in self.market_data if item.get('symbol') == symbol], 
-                            key=lambda x: x['timestamp'], reverse=True)[:limit]
-            return list(self.market_data.find(
-                {'symbol': symbol},
-                {'_id': 0}
-            ).sort('timestamp', -1).limit(limit))
+            return self.backend.recent_candles(symbol, limit, timeframe)
         except Exception as e:
             logging.error(f"خطأ في استرجاع بيانات السوق: {e}")
             return []
@@ -140,16 +191,8 @@ class DatabaseManager:
     def get_latest_technical_analysis(self, symbol: str) -> Optional[Dict]:
         """استرجاع آخر تحليل فني مع اتجاه السوق"""
         try:
-            if isinstance(self.market_data, list):
-                items = [item for item in self.market_data if item.get('symbol') == symbol]
-                return items[0]['technical_indicators'] if items else None
-
-            latest_data = self.market_data.find_one(
-                {'symbol': symbol},
-                {'_id': 0, 'technical_indicators': 1}
-            )
-            return latest_data.get('technical_indicators') if latest_data else None
-
+            latest = self.latest_state.get(symbol)
+            return latest.get('technical_indicators') if latest else None
         except Exception as e:
             logging.error(f"خطأ في استرجاع التحليل الفني: {e}")
             return None
@@ -166,19 +209,7 @@ class DatabaseManager:
     def get_trades_report(self, start_date: datetime, end_date: datetime) -> List[Dict]:
         """استرجاع تقرير التداولات"""
         try:
-            if isinstance(self.trades, list):
-                return sorted([item for item in self.trades 
-                             if start_date <= item.get('timestamp') <= end_date],
-                            key=lambda x: x['timestamp'], reverse=True)
-            return list(self.trades.find(
-                {
-                    'timestamp': {
-                        '$gte': start_date,
-                        '$lte': end_date
-                    }
-                },
-                {'_id': 0}
-            ).sort('timestamp', -1))
+            return self.backend.find_range('trades', start_date, end_date)
         except Exception as e:
             logging.error(f"خطأ في استرجاع تقرير التداولات: {e}")
             return []
\ No newline at end of file
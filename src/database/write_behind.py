@@ -0,0 +1,133 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import Config
+
+class WriteBehindQueue:
+    """طابور كتابة مؤجلة: المستدعي يضيف العملية ويعود فوراً، وخيط خلفي يكتبها دفعات
+
+    تجمع العمليات حسب نوعها وتمرر كل مجموعة إلى معالجها (مثل insert_many أو
+    bulk_write) عند بلوغ `batch_size` أو مرور `flush_interval` ثانية. عند امتلاء
+    الطابور ينتظر المستدعي حتى `put_timeout` ثم يكتب العملية بنفسه حتى لا تضيع.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[List[Any]], None]],
+                 max_size: Optional[int] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, put_timeout: Optional[float] = None):
+        self.handlers = handlers
+        self.batch_size = batch_size or Config.DB_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.DB_FLUSH_INTERVAL
+        self.put_timeout = Config.DB_PUT_TIMEOUT if put_timeout is None else put_timeout
+        self._queue: 'queue.Queue[Tuple[str, Any]]' = queue.Queue(max_size or Config.DB_QUEUE_SIZE)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0, 'written': 0, 'batches': 0, 'errors': 0,
+            'blocked_puts': 0, 'blocked_seconds': 0.0, 'inline_writes': 0,
+            'max_depth': 0, 'last_flush_seconds': 0.0
+        }
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='db-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, kind: str, item: Any) -> None:
+        """إضافة عملية كتابة؛ تنتظر فقط إذا كان الطابور ممتلئاً"""
+        if self._stopped.is_set():
+            self._write(kind, [item])
+            return
+        try:
+            self._queue.put_nowait((kind, item))
+        except queue.Full:
+            started = time.perf_counter()
+            try:
+                self._queue.put((kind, item), timeout=self.put_timeout)
+                queued = True
+            except queue.Full:
+                queued = False
+            with self._stats_lock:
+                self._stats['blocked_puts'] += 1
+                self._stats['blocked_seconds'] += time.perf_counter() - started
+            if not queued:
+                self._count('inline_writes')
+                self._write(kind, [item])
+                return
+
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], self._queue.qsize())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """انتظار كتابة كل العمليات المضافة حتى الآن"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self) -> None:
+        """إيقاف الخيط بعد كتابة ما تبقى في الطابور"""
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self._queue.put((None, None))  # إيقاظ الخيط إن كان ينتظر
+            self._thread.join()
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            return {**self._stats, 'depth': self._queue.qsize()}
+
+    def _run(self) -> None:
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                continue
+
+            # تجميع دفعة حتى الحد الأقصى أو انتهاء مهلة التجميع
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stopped.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._flush_batch(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _flush_batch(self, batch: List[Tuple[str, Any]]) -> None:
+        started = time.perf_counter()
+        groups: Dict[str, List[Any]] = {}
+        for kind, item in batch:
+            if kind is not None:
+                groups.setdefault(kind, []).append(item)
+        for kind, items in groups.items():
+            self._write(kind, items)
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['last_flush_seconds'] = time.perf_counter() - started
+
+    def _write(self, kind: str, items: List[Any]) -> None:
+        try:
+            self.handlers[kind](items)
+            with self._stats_lock:
+                self._stats['written'] += len(items)
+        except Exception as e:
+            self._count('errors')
+            logging.error(f"خطأ في الكتابة المؤجلة ({kind}، {len(items)} عملية): {e}")
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
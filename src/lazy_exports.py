@@ -0,0 +1,22 @@
+import sys
+from importlib import import_module
+from typing import Callable, Dict, List, Tuple
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """Module `__getattr__` and `__dir__` (PEP 562) that import an export's submodule on first use
+
+    `exports` maps each public name to its relative submodule, e.g. '.data_collector'.
+    """
+    module = sys.modules[package]
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(exports[name], package), name)
+        setattr(module, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(module)) | set(exports))
+
+    return __getattr__, __dir__
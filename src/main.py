@@ -1,24 +1,17 @@
 import sys
 import os
+import argparse
 import logging
 import time
 from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import numpy as np
 np.NaN = np.nan  # إصلاح مشكلة pandas_ta
 
-from connection.binance_client import BinanceClient
-from data.data_collector import DataCollector
-from analysis.technical_analyzer import TechnicalAnalyzer
-from analysis.ml_analyzer import MLAnalyzer
-from analysis.news_analyzer import NewsAnalyzer
-from trading.strategy import TradingStrategy
-from trading.advanced_strategies import StrategySelector
-from trading.trade_manager import TradeManager
-from visualization.dashboard import Dashboard
+# المكونات الثقيلة (pandas_ta و sklearn و streamlit ...) تستورد داخل كل وضع تشغيل
+# عند الحاجة فقط، حتى لا يدفع وضع التداول أو الجمع ثمن استيراد واجهة المستخدم
 from config import Config
-from database.models import DatabaseManager
 
 def setup_logging():
     """إعداد التسجيل"""
@@ -34,10 +27,25 @@ def setup_logging():
 class TradingBot:
     def __init__(self):
         setup_logging()
+        from connection.binance_client import BinanceClient
+        from data.data_collector import DataCollector
+        from data.indicator_cache import IndicatorCache
+        from analysis.advanced_indicators import AdvancedIndicators
+        from analysis.technical_analyzer import TechnicalAnalyzer
+        from analysis.ml_analyzer import MLAnalyzer
+        from analysis.news_analyzer import NewsAnalyzer
+        from trading.strategy import TradingStrategy
+        from trading.advanced_strategies import StrategySelector
+        from trading.trade_manager import TradeManager
+        from database.models import DatabaseManager
         try:
             self.db_manager = DatabaseManager()
             self.binance_client = BinanceClient()
-            self.data_collector = DataCollector(self.binance_client, self.db_manager)
+            # ذاكرة مؤشرات واحدة يشترك فيها جامع البيانات والمؤشرات المتقدمة
+            self.indicator_cache = IndicatorCache()
+            self.data_collector = DataCollector(self.binance_client, self.db_manager,
+                                                indicator_cache=self.indicator_cache)
+            self.advanced_indicators = AdvancedIndicators(self.indicator_cache)
             self.technical_analyzer = TechnicalAnalyzer()
             self.ml_analyzer = MLAnalyzer()
             self.news_analyzer = NewsAnalyzer()
@@ -64,15 +72,25 @@ class TradingBot:
 
             # تحليل العملات النشطة باستخدام Threading
             active_pairs = [pair for pair, active in self.active_pairs.items() if active]
+
+            # تشغيل البث المباشر للشموع والأسعار بدلاً من الاستعلام الدوري
+            if Config.USE_STREAMING:
+                self.binance_client.start_stream(active_pairs, Config.TIMEFRAME)
+                if self.binance_client.stream is not None:
+                    self.binance_client.stream.subscribe(self.data_collector.on_stream_event)
             market_data = self.data_collector.fetch_multiple_symbols(
                 active_pairs, Config.TIMEFRAME
             )
 
-            # تدريب نموذج التعلم الآلي وتحليل الأخبار
+            # تحليل الأخبار لجميع العملات بشكل متزامن
+            sentiments = self.news_analyzer.get_market_sentiments(list(market_data))
+
+            # تدريب نموذج التعلم الآلي؛ العملة التي فشل تحليل أخبارها يتم إيقافها
             for symbol, df in market_data.items():
                 try:
                     self.ml_analyzer.train_model(df)
-                    self.news_analyzer.get_market_sentiment(symbol)
+                    if symbol not in sentiments:
+                        raise RuntimeError("تعذر تحليل الأخبار")
                     logging.info(f"تم تهيئة {symbol} بنجاح")
                 except Exception as e:
                     logging.error(f"خطأ في تهيئة {symbol}: {e}")
@@ -86,6 +104,13 @@ class TradingBot:
             logging.error(f"خطأ في تهيئة النظام: {e}")
             raise
 
+    def close(self):
+        """إيقاف البث ومجمع عمليات التحليل وخيوط الأخبار وكتابة البيانات المؤجلة عند الخروج"""
+        self.binance_client.stop_stream()
+        self.data_collector.close()
+        self.news_analyzer.close()
+        self.db_manager.close()
+
     def _filter_trading_pairs(self):
         """تصفية أزواج التداول بناءً على الحجم"""
         for symbol in Config.TRADING_PAIRS:
@@ -149,6 +174,9 @@ class TradingBot:
                     # تحليل السوق وتحديد الاستراتيجية المناسبة
                     strategy_analysis = self.strategy_selector.select_strategy(df)
                     ml_prediction = self.ml_analyzer.predict(df)
+                    indicators = self.advanced_indicators.calculate_all_indicators(
+                        df, symbol, Config.TIMEFRAME
+                    )
                     current_price = self.binance_client.get_symbol_price(symbol)
 
                     ranked_pairs.append({
@@ -156,6 +184,7 @@ class TradingBot:
                         'current_price': current_price,
                         'strategy_analysis': strategy_analysis,
                         'ml_prediction': ml_prediction,
+                        'indicators': indicators,
                         'market_data': df
                     })
 
@@ -173,6 +202,7 @@ class TradingBot:
 
 def run_dashboard():
     """تشغيل واجهة المستخدم"""
+    bot = None
     try:
         logging.info("بدء تشغيل واجهة المستخدم")
         setup_logging()
@@ -194,15 +224,20 @@ def run_dashboard():
         )
 
         # تشغيل لوحة التحكم
+        from visualization.dashboard import Dashboard
         dashboard = Dashboard(bot.trade_manager)
         dashboard.render_main_page(bot.ranked_pairs)
 
     except Exception as e:
         logging.error(f"خطأ في تشغيل واجهة المستخدم: {e}")
         sys.exit(1)
+    finally:
+        if bot is not None:
+            bot.close()
 
 def run_trading_bot():
     """تشغيل نظام التداول"""
+    bot = None
     try:
         logging.info("بدء تشغيل نظام التداول")
         setup_logging()
@@ -210,12 +245,147 @@ def run_trading_bot():
         bot = TradingBot()
         bot.initialize()
         bot.run(automatic_trading=True)
+    except KeyboardInterrupt:
+        logging.info("تم إيقاف نظام التداول")
     except Exception as e:
         logging.error(f"خطأ في تشغيل نظام التداول: {e}")
         sys.exit(1)
+    finally:
+        if bot is not None:
+            bot.close()
 
-if __name__ == "__main__":
-    if "--dashboard" in sys.argv:
+def run_collector(interval: float = 60.0):
+    """جمع البيانات وتحليلها وحفظها دورياً دون تداول أو تعلم آلي"""
+    binance_client = data_collector = db_manager = None
+    try:
+        logging.info("بدء تشغيل جمع البيانات")
+        setup_logging()
+
+        from connection.binance_client import BinanceClient
+        from data.data_collector import DataCollector
+        from database.models import DatabaseManager
+        db_manager = DatabaseManager()
+        binance_client = BinanceClient()
+        data_collector = DataCollector(binance_client, db_manager)
+
+        if Config.USE_STREAMING:
+            binance_client.start_stream(Config.TRADING_PAIRS, Config.TIMEFRAME)
+            if binance_client.stream is not None:
+                binance_client.stream.subscribe(data_collector.on_stream_event)
+
+        while True:
+            market_data = data_collector.fetch_multiple_symbols(Config.TRADING_PAIRS, Config.TIMEFRAME)
+            logging.info(f"تم جمع بيانات {len(market_data)} من العملات")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        logging.info("تم إيقاف جمع البيانات")
+    except Exception as e:
+        logging.error(f"خطأ في تشغيل جمع البيانات: {e}")
+        sys.exit(1)
+    finally:
+        # نفس ترتيب TradingBot.close: البث ثم مجمع التحليل ثم الكتابة المؤجلة
+        if binance_client is not None:
+            binance_client.stop_stream()
+        if data_collector is not None:
+            data_collector.close()
+        if db_manager is not None:
+            db_manager.close()
+
+def _simulate_trend_trades(df) -> List[float]:
+    """صفقات شراء عند بداية اتجاه صاعد والخروج عند وقف الخسارة أو الهدف أو انعكاس الاتجاه"""
+    from data.trend import TREND_LABELS
+    uptrend, downtrend = TREND_LABELS.index('UPTREND'), TREND_LABELS.index('DOWNTREND')
+    codes = df['market_trend'].cat.codes.to_numpy()
+    high, low, close = (df[column].to_numpy() for column in ('high', 'low', 'close'))
+    fee = Config.SIMULATOR_FEE_RATE
+
+    returns = []
+    entry = None
+    for i in range(1, len(df)):
+        if entry is None:
+            if codes[i] >= uptrend > codes[i - 1]:
+                entry = close[i]
+            continue
+        stop, target = entry * (1 - Config.STOP_LOSS), entry * (1 + Config.PROFIT_THRESHOLD)
+        exit_price = stop if low[i] <= stop else target if high[i] >= target else \
+            close[i] if 0 <= codes[i] <= downtrend else None
+        if exit_price is not None:
+            returns.append(exit_price / entry * (1 - fee) ** 2 - 1)
+            entry = None
+    return returns
+
+def run_backtest(symbols: List[str], timeframe: str, start: Optional[int] = None, end: Optional[int] = None):
+    """اختبار تاريخي على الشموع المخزنة محلياً (املأها أولاً عبر data.backfill)"""
+    data_collector = None
+    try:
+        setup_logging()
+        logging.info("بدء الاختبار التاريخي")
+
+        from connection.binance_client import BinanceClient
+        from data.candle_buffer import CandleBuffer
+        from data.candle_store import CandleStore
+        from data.data_collector import DataCollector
+        store = CandleStore()
+        # الاختبار يقرأ من المخزن المحلي فقط: عميل وهمي بلا اتصال بالمنصة
+        data_collector = DataCollector(BinanceClient(use_mock=True), None, candle_store=store)
+
+        results = {}
+        for symbol in symbols:
+            rows = store.read(symbol, timeframe, start, end)
+            if not len(rows):
+                logging.warning(f"لا توجد شموع محلية لـ {symbol} {timeframe}، شغّل data.backfill أولاً")
+                continue
+            buffer = CandleBuffer(len(rows))
+            buffer.merge(rows)
+            df = data_collector.add_technical_indicators(buffer.frame(), symbol, timeframe)
+            df = data_collector.analyze_market_trend(df)
+
+            returns = _simulate_trend_trades(df)
+            wins = sum(1 for r in returns if r > 0)
+            results[symbol] = {
+                'trades': len(returns),
+                'win_rate': wins / len(returns) if returns else 0.0,
+                'total_return': float(np.prod([1 + r for r in returns]) - 1)
+            }
+            logging.info(f"{symbol}: {results[symbol]}")
+        return results
+    except Exception as e:
+        logging.error(f"خطأ في الاختبار التاريخي: {e}")
+        sys.exit(1)
+    finally:
+        if data_collector is not None:
+            data_collector.close()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="نظام التداول الآلي")
+    parser.add_argument('--dashboard', action='store_true', help="مرادف لـ dashboard (للتوافق)")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('trade', help="التداول الآلي (الافتراضي)")
+    collect = commands.add_parser('collect', help="جمع البيانات وحفظها فقط")
+    collect.add_argument('--interval', type=float, default=60.0, help="ثوانٍ بين كل جولة جمع")
+    backtest = commands.add_parser('backtest', help="اختبار تاريخي على الشموع المحلية")
+    backtest.add_argument('--symbols', nargs='+', default=Config.TRADING_PAIRS)
+    backtest.add_argument('--timeframe', default=Config.TIMEFRAME)
+    backtest.add_argument('--start', help='YYYY-MM-DD')
+    backtest.add_argument('--end', help='YYYY-MM-DD')
+    commands.add_parser('dashboard', help="واجهة المستخدم")
+    return parser.parse_args(argv)
+
+def _parse_date(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    return int(datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.dashboard or args.command == 'dashboard':
         run_dashboard()
+    elif args.command == 'collect':
+        run_collector(args.interval)
+    elif args.command == 'backtest':
+        run_backtest(args.symbols, args.timeframe, _parse_date(args.start), _parse_date(args.end))
     else:
-        run_trading_bot()
\ No newline at end of file
+        run_trading_bot()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 """Initialize trading package"""
-from .strategy import TradingStrategy
-from .trader import Trader
-from .advanced_strategies import StrategySelector
-from .trade_manager import TradeManager
+from lazy_exports import lazy_exports
 
-__all__ = ['TradingStrategy', 'Trader', 'StrategySelector', 'TradeManager']
\ No newline at end of file
+_EXPORTS = {
+    'TradingStrategy': '.strategy',
+    'Trader': '.trader',
+    'StrategySelector': '.advanced_strategies',
+    'TradeManager': '.trade_manager'
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,5 +1,10 @@
 """Initialize visualization package"""
-from .dashboard import Dashboard
-from .chart_manager import ChartManager
+from lazy_exports import lazy_exports
 
-__all__ = ['Dashboard', 'ChartManager']
\ No newline at end of file
+_EXPORTS = {
+    'Dashboard': '.dashboard',
+    'ChartManager': '.chart_manager'
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
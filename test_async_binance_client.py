@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import tempfile
+import threading
+import time
+from config import Config
+from connection.async_binance_client import AsyncBinanceClient
+from connection.market_metadata import MarketMetadata
+from connection.request_scheduler import RequestScheduler, REQUEST_WEIGHTS, kline_weight
+
+logging.basicConfig(level=logging.INFO)
+
+class StubExchange:
+    """Awaitable stand-in for ccxt.async_support.binance"""
+
+    def __init__(self, used_weight=0):
+        self.calls = []
+        self.markets = None
+        self.market_loads = 0
+        self.last_response_headers = {'X-MBX-USED-WEIGHT-1M': str(used_weight)}
+
+    def set_markets(self, markets):
+        self.markets = markets
+
+    async def load_markets(self, reload=False):
+        self.market_loads += 1
+        return {'BTC/USDT': {'id': 'BTCUSDT'}}
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        self.calls.append((symbol, timeframe, since, limit))
+        await asyncio.sleep(0.01)
+        return [[1_700_000_000_000, 1.0, 2.0, 0.5, 1.5, 10.0]]
+
+    async def close(self):
+        pass
+
+def _client(exchange, scheduler, metadata=None):
+    metadata = metadata or MarketMetadata(f"{tempfile.mkdtemp()}/markets.json", lambda: {'BTC/USDT': {}})
+    client = AsyncBinanceClient(scheduler=scheduler, market_metadata=metadata)
+    client.use_mock = False
+    client.client = exchange
+    return client
+
+def test_fan_out_is_charged_to_the_scheduler():
+    scheduler = RequestScheduler(max_weight_per_minute=6000)
+    exchange = StubExchange()
+    client = _client(exchange, scheduler)
+    symbols = [f"SYM{i}USDT" for i in range(20)]
+
+    async def fan_out():
+        return await asyncio.gather(*(client.fetch_ohlcv(symbol, '1h', 500) for symbol in symbols))
+
+    results = asyncio.run(fan_out())
+    assert all(len(rows) == 1 for rows in results)
+    assert len(exchange.calls) == 20
+    metrics = scheduler.get_metrics()
+    assert metrics['lanes']['history']['submitted'] == 20
+    assert metrics['used_weight'] == 20 * kline_weight(500)
+
+def test_budget_throttles_async_requests():
+    # Two requests of weight 5 fit per 0.3 s window; the next two must wait for it to roll
+    scheduler = RequestScheduler(max_weight_per_minute=10, order_reserve=0.0, window=0.3)
+    client = _client(StubExchange(), scheduler)
+
+    async def fan_out():
+        await asyncio.gather(*(client.fetch_ohlcv('BTCUSDT', '1h', 500) for _ in range(4)))
+
+    started = time.monotonic()
+    asyncio.run(fan_out())
+    assert time.monotonic() - started >= 0.3
+
+def test_waiting_requests_hold_no_threads():
+    scheduler = RequestScheduler(max_weight_per_minute=10, order_reserve=0.0, window=0.3)
+    client = _client(StubExchange(), scheduler)
+
+    async def fan_out():
+        await client.fetch_ohlcv('BTCUSDT', '1h', 500)  # markets are loaded before the test starts
+        threads = threading.active_count()
+        tasks = [asyncio.create_task(client.fetch_ohlcv('BTCUSDT', '1h', 500)) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        assert scheduler.get_metrics()['lanes']['history']['queue_depth'] >= 18
+        assert threading.active_count() == threads
+
+        # A cancelled request leaves the queue and the rest still complete
+        tasks[-1].cancel()
+        await asyncio.sleep(0)
+        assert scheduler.get_metrics()['lanes']['history']['queue_depth'] <= 18
+        return await asyncio.gather(*tasks[:4])
+
+    assert all(len(rows) == 1 for rows in asyncio.run(fan_out()))
+
+def test_cached_markets_are_handed_to_ccxt():
+    scheduler = RequestScheduler(max_weight_per_minute=6000)
+    exchange = StubExchange()
+    client = _client(exchange, scheduler)
+    client.market_metadata = MarketMetadata(f"{tempfile.mkdtemp()}/markets.json", client._load_markets)
+
+    async def fetch_twice():
+        await asyncio.gather(*(client.fetch_ohlcv('BTCUSDT', '1h', 50) for _ in range(2)))
+        await client.fetch_ohlcv('BTCUSDT', '1h', 50)
+
+    asyncio.run(fetch_twice())
+    # exchangeInfo went out once, through the scheduler, and ccxt never loads markets itself
+    assert exchange.market_loads == 1
+    assert exchange.markets == {'BTC/USDT': {'id': 'BTCUSDT'}}
+    metrics = scheduler.get_metrics()
+    assert metrics['lanes']['price']['submitted'] == 1
+    assert metrics['used_weight'] == REQUEST_WEIGHTS['exchange_info'] + 3 * kline_weight(50)
+
+def test_server_weight_header_is_synced():
+    scheduler = RequestScheduler(max_weight_per_minute=6000)
+    client = _client(StubExchange(used_weight=1200), scheduler)
+    asyncio.run(client.fetch_ohlcv('BTCUSDT', '1h', 50))
+    assert scheduler.get_metrics()['used_weight'] == 1200
+
+def test_testnet_options_and_no_ccxt_rate_limiter():
+    saved = Config.API_KEY, Config.API_SECRET, Config.USE_TESTNET
+    Config.API_KEY, Config.API_SECRET, Config.USE_TESTNET = 'key', 'secret', True
+    try:
+        client = AsyncBinanceClient()
+        assert not client.use_mock
+        assert client.client.enableRateLimit is False
+        assert 'testnet.binance.vision' in str(client.client.urls['api'])
+        asyncio.run(client.close())
+    finally:
+        Config.API_KEY, Config.API_SECRET, Config.USE_TESTNET = saved
+
+if __name__ == "__main__":
+    test_fan_out_is_charged_to_the_scheduler()
+    test_budget_throttles_async_requests()
+    test_waiting_requests_hold_no_threads()
+    test_cached_markets_are_handed_to_ccxt()
+    test_server_weight_header_is_synced()
+    test_testnet_options_and_no_ccxt_rate_limiter()
@@ -0,0 +1,97 @@
+import logging
+import tempfile
+from connection.binance_client import BinanceClient
+from connection.market_metadata import MarketMetadata
+from config import Config
+from data.backfill import HistoricalBackfill, main
+from data.candle_store import CandleStore
+
+logging.basicConfig(level=logging.INFO)
+
+HOUR = 3_600_000
+
+class StubClient:
+    """Exchange stand-in: one hourly bar per hour, with optional failing pages"""
+
+    def __init__(self, fail_pages=()):
+        self.fail_pages = set(fail_pages)
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=500, since=None, raise_errors=False):
+        self.calls.append(since)
+        if since in self.fail_pages:
+            raise ConnectionError(f"page {since} unavailable")
+        return [[t, 1.0, 2.0, 0.5, 1.5, 10.0] for t in range(since, since + limit * HOUR, HOUR)]
+
+def _backfill(root, client):
+    return HistoricalBackfill(client, CandleStore(f"{root}/candles"), checkpoint_dir=f"{root}/backfill",
+                              max_workers=2, page_limit=10)
+
+def test_pages_cover_range_without_overlap():
+    with tempfile.TemporaryDirectory() as root:
+        client = StubClient()
+        backfill = _backfill(root, client)
+        written = backfill.run(['BTCUSDT'], '1h', 5 * HOUR + 1, 32 * HOUR)
+
+        # Pages start on a bar boundary; the last page stops at the end of the range
+        assert sorted(client.calls) == [5 * HOUR, 15 * HOUR, 25 * HOUR]
+        assert written == {'BTCUSDT': 27}
+        assert backfill.store.read('BTCUSDT', '1h')[:, 0].tolist() == [i * HOUR for i in range(5, 32)]
+
+def test_failed_page_is_not_written_and_resumes():
+    with tempfile.TemporaryDirectory() as root:
+        failing = StubClient(fail_pages={10 * HOUR})
+        written = _backfill(root, failing).run(['BTCUSDT'], '1h', 0, 30 * HOUR)
+        assert written == {'BTCUSDT': 20}
+        stored = CandleStore(f"{root}/candles").read('BTCUSDT', '1h')[:, 0].tolist()
+        assert 10 * HOUR not in stored and len(stored) == 20
+
+        # A rerun fetches only the page that failed
+        client = StubClient()
+        assert _backfill(root, client).run(['BTCUSDT'], '1h', 0, 30 * HOUR) == {'BTCUSDT': 10}
+        assert client.calls == [10 * HOUR]
+        assert CandleStore(f"{root}/candles").read('BTCUSDT', '1h')[:, 0].tolist() == [i * HOUR for i in range(30)]
+
+def test_mock_client_is_refused():
+    with tempfile.TemporaryDirectory() as root:
+        try:
+            _backfill(root, BinanceClient(use_mock=True))
+            assert False, "a mock client must not fill the candle store"
+        except RuntimeError:
+            pass
+        assert CandleStore(f"{root}/candles").last_timestamp('BTCUSDT', '1h') is None
+
+    # Without API keys the command exits before fetching anything
+    saved = Config.API_KEY, Config.API_SECRET
+    Config.API_KEY = Config.API_SECRET = ''
+    try:
+        main(['--symbols', 'BTCUSDT', '--start', '2024-01-01', '--end', '2024-01-02'])
+        assert False, "expected the command to exit"
+    except SystemExit as e:
+        assert e.code == 1
+    finally:
+        Config.API_KEY, Config.API_SECRET = saved
+
+def test_client_raises_instead_of_returning_mock_candles():
+    class BrokenExchange:
+        markets = {'BTC/USDT': {}}
+
+        def fetch_ohlcv(self, **kwargs):
+            raise ConnectionError("exchange unreachable")
+
+    client = BinanceClient()
+    client.use_mock, client.client = False, BrokenExchange()
+    client.market_metadata = MarketMetadata(f"{tempfile.mkdtemp()}/markets.json", lambda: BrokenExchange.markets)
+    client._markets = client.market_metadata.ensure_loaded()
+    try:
+        client.fetch_ohlcv('BTCUSDT', '1h', 10, since=0, raise_errors=True)
+        assert False, "expected the request error"
+    except ConnectionError:
+        pass
+    assert len(client.fetch_ohlcv('BTCUSDT', '1h', 10)) == 10
+
+if __name__ == "__main__":
+    test_pages_cover_range_without_overlap()
+    test_failed_page_is_not_written_and_resumes()
+    test_mock_client_is_refused()
+    test_client_raises_instead_of_returning_mock_candles()
@@ -0,0 +1,89 @@
+import logging
+import random
+import numpy as np
+from data.candle_buffer import CandleBuffer, CandleBufferPool, timeframe_to_ms
+
+logging.basicConfig(level=logging.INFO)
+
+HOUR = 3_600_000
+
+def _candle(i, close=100.0):
+    return [i * HOUR, close, close + 1, close - 1, close, 10.0]
+
+def test_merge_overwrites_forming_bar():
+    buffer = CandleBuffer(capacity=10)
+    buffer.merge([_candle(i) for i in range(5)])
+    assert len(buffer) == 5
+    assert buffer.last_timestamp == 4 * HOUR
+
+    # The last stored bar was still forming: it is revised and a new bar is added
+    buffer.merge([_candle(4, close=105.0), _candle(5, close=106.0)])
+    assert len(buffer) == 6
+    assert buffer.tail(2) == [_candle(4, close=105.0), _candle(5, close=106.0)]
+
+def test_merge_trims_to_capacity():
+    buffer = CandleBuffer(capacity=3)
+    buffer.merge([_candle(i) for i in range(5)])
+    assert [row[0] for row in buffer.tail(10)] == [2 * HOUR, 3 * HOUR, 4 * HOUR]
+
+def test_merge_matches_list_reference():
+    # Random overlapping merges force the compaction path many times
+    rng = random.Random(7)
+    buffer = CandleBuffer(capacity=50)
+    reference = {}
+    last = 0
+    for _ in range(300):
+        start = max(last - rng.randint(0, 3), 0)
+        batch = [_candle(i, close=rng.uniform(90, 110)) for i in range(start, start + rng.randint(1, 20))]
+        buffer.merge(batch)
+        reference = {ts: row for ts, row in reference.items() if ts < batch[0][0]}
+        reference.update({row[0]: row for row in batch})
+        last = start + len(batch) - 1
+    expected = [reference[ts] for ts in sorted(reference)][-50:]
+    assert buffer.tail(50) == expected
+    assert len(buffer) == 50
+
+def test_frame_is_zero_copy_view():
+    buffer = CandleBuffer(capacity=10)
+    buffer.merge([_candle(i) for i in range(5)])
+    df = buffer.frame(3)
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert np.shares_memory(df['close'].to_numpy(), buffer.arrays()[1])
+    assert df.index[-1].value // 1_000_000 == 4 * HOUR
+
+    # Adding columns to the view leaves the buffer untouched
+    df['RSI'] = 50.0
+    assert buffer.tail(1) == [_candle(4)]
+
+def test_float32_buffer():
+    buffer = CandleBuffer(capacity=10, dtype=np.float32)
+    buffer.merge([_candle(i, close=100.1) for i in range(5)])
+    assert buffer.frame()['close'].dtype == np.float32
+    assert buffer.last_timestamp == 4 * HOUR
+    assert buffer.nbytes < CandleBuffer(capacity=10).nbytes
+
+def test_pool_evicts_least_recently_used():
+    evicted = []
+    size = CandleBuffer(capacity=100).nbytes
+    pool = CandleBufferPool(max_bytes=size * 2, on_evict=evicted.append)
+    pool.create(('BTCUSDT', '1h'), 100)
+    pool.create(('ETHUSDT', '1h'), 100)
+    assert pool.get(('BTCUSDT', '1h')) is not None  # BTC becomes the most recently used
+    pool.create(('BNBUSDT', '1h'), 100)
+    assert evicted == [('ETHUSDT', '1h')]
+    assert ('BTCUSDT', '1h') in pool and ('ETHUSDT', '1h') not in pool
+    assert pool.nbytes == size * 2
+
+def test_timeframe_to_ms():
+    assert timeframe_to_ms('1m') == 60_000
+    assert timeframe_to_ms('4h') == 4 * HOUR
+    assert timeframe_to_ms('1w') == 7 * 24 * HOUR
+
+if __name__ == "__main__":
+    test_merge_overwrites_forming_bar()
+    test_merge_trims_to_capacity()
+    test_merge_matches_list_reference()
+    test_frame_is_zero_copy_view()
+    test_float32_buffer()
+    test_pool_evicts_least_recently_used()
+    test_timeframe_to_ms()
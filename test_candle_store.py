@@ -0,0 +1,61 @@
+import logging
+import tempfile
+import numpy as np
+from data.candle_store import CandleStore
+
+logging.basicConfig(level=logging.INFO)
+
+HOUR = 3_600_000
+
+def _rows(start, stop, close=100.0):
+    return [[i * HOUR, close, close + 1, close - 1, close, 10.0] for i in range(start, stop)]
+
+def test_append_and_revise_forming_bar():
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        store.write('BTCUSDT', '1h', _rows(0, 5))
+        store.write('BTCUSDT', '1h', _rows(4, 7, close=105.0))
+
+        data = store.read('BTCUSDT', '1h')
+        assert data[:, 0].tolist() == [i * HOUR for i in range(7)]
+        assert data[4, 4] == 105.0 and data[3, 4] == 100.0
+        assert store.last_timestamp('BTCUSDT', '1h') == 6 * HOUR
+
+def test_out_of_order_pages_are_merged():
+    # Parallel backfill writes pages in any order
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        for start in (20, 0, 10, 5):
+            store.write('ETHUSDT', '1h', _rows(start, start + 10))
+        data = store.read('ETHUSDT', '1h')
+        assert data[:, 0].tolist() == [i * HOUR for i in range(30)]
+
+def test_range_read_is_memory_mapped_view():
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        store.write('BTCUSDT', '1h', _rows(0, 2000))
+        window = store.read('BTCUSDT', '1h', start=100 * HOUR, end=200 * HOUR)
+        assert len(window) == 100 and window[0, 0] == 100 * HOUR
+        assert isinstance(window, np.memmap) and not window.flags.writeable
+
+        # A new instance (e.g. after a restart) reads the same data from disk
+        reopened = CandleStore(root)
+        assert reopened.tail('BTCUSDT', '1h', 3)[:, 0].tolist() == [1997 * HOUR, 1998 * HOUR, 1999 * HOUR]
+        assert reopened.read('SOLUSDT', '1h').shape == (0, 6)
+
+def test_reads_do_not_see_later_revisions_of_the_forming_bar():
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        store.write('BTCUSDT', '1h', _rows(0, 5))
+        tail, full = store.tail('BTCUSDT', '1h', 2), store.read('BTCUSDT', '1h')
+        store.write('BTCUSDT', '1h', _rows(4, 5, close=105.0))  # rewritten in place
+
+        assert tail[-1, 4] == 100.0 and full[-1, 4] == 100.0
+        assert not tail.flags.writeable and not full.flags.writeable
+        assert store.tail('BTCUSDT', '1h', 1)[0, 4] == 105.0
+
+if __name__ == "__main__":
+    test_append_and_revise_forming_bar()
+    test_out_of_order_pages_are_merged()
+    test_range_read_is_memory_mapped_view()
+    test_reads_do_not_see_later_revisions_of_the_forming_bar()
@@ -0,0 +1,221 @@
+import logging
+import tempfile
+import threading
+import pandas as pd
+from config import Config
+from connection.binance_client import BinanceClient
+from data.candle_store import CandleStore
+from data.data_collector import DataCollector
+from database.backends import MemoryBackend
+from database.models import DatabaseManager
+import main
+
+logging.basicConfig(level=logging.INFO)
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT']
+
+def _collector():
+    return DataCollector(BinanceClient(use_mock=True), DatabaseManager(backend=MemoryBackend()))
+
+def test_incremental_pipeline_runs_without_process_pool():
+    collector = _collector()
+    analyzed_on = []
+    analyze_symbol = collector._analyze_symbol
+    collector._analyze_symbol = lambda *args: analyzed_on.append(threading.current_thread()) or analyze_symbol(*args)
+    results = collector.fetch_multiple_symbols(SYMBOLS, '1h', limit=300)
+    assert sorted(results) == SYMBOLS
+    assert collector._analysis_pool is None
+
+    # Analysis ran on its own stage, not on the coordinating thread
+    assert len(analyzed_on) == 2 and threading.current_thread() not in analyzed_on
+    assert all(thread.name.startswith('analysis') for thread in analyzed_on)
+    assert results['BTCUSDT']['RSI'].notna().any() and 'market_trend' in results['BTCUSDT']
+
+    # The writer thread persisted every symbol before the pipeline returned
+    assert collector.db_manager.flush(timeout=10)
+    for symbol in SYMBOLS:
+        assert len(collector.db_manager.get_recent_market_data(symbol, limit=300, timeframe='1h')) == 300
+    collector.close()
+
+def test_close_shuts_down_analysis_pool():
+    incremental, processes = Config.INCREMENTAL_INDICATORS, Config.ANALYSIS_PROCESSES
+    Config.INCREMENTAL_INDICATORS, Config.ANALYSIS_PROCESSES = False, 2
+    try:
+        collector = _collector()
+        pool = collector._get_analysis_pool()
+        assert pool is not None and collector._get_analysis_pool() is pool
+        collector.close()
+        assert collector._analysis_pool is None
+        try:
+            pool.submit(len, [])
+            assert False, "pool should be shut down"
+        except RuntimeError:
+            pass
+    finally:
+        Config.INCREMENTAL_INDICATORS, Config.ANALYSIS_PROCESSES = incremental, processes
+
+def test_trading_bot_is_closed_on_exit():
+    closed = []
+
+    class StubBot:
+        def initialize(self):
+            pass
+
+        def run(self, automatic_trading=True):
+            raise KeyboardInterrupt
+
+        def close(self):
+            closed.append(True)
+
+    trading_bot, setup_logging = main.TradingBot, main.setup_logging
+    main.TradingBot, main.setup_logging = StubBot, lambda: None
+    try:
+        main.run_trading_bot()
+    finally:
+        main.TradingBot, main.setup_logging = trading_bot, setup_logging
+    assert closed == [True]
+
+def test_collector_and_backtest_release_resources_on_exit():
+    import connection.binance_client
+    import data.data_collector
+    import database.models
+    closed = []
+
+    class StubClient:
+        stream = None
+        def __init__(self, use_mock=None):
+            pass
+        def stop_stream(self):
+            closed.append('stream')
+
+    class StubCollector:
+        def __init__(self, *args, **kwargs):
+            pass
+        def fetch_multiple_symbols(self, symbols, interval):
+            raise KeyboardInterrupt
+        def close(self):
+            closed.append('collector')
+
+    class StubDatabase:
+        def close(self):
+            closed.append('database')
+
+    modules = (connection.binance_client, 'BinanceClient', StubClient), \
+        (data.data_collector, 'DataCollector', StubCollector), (database.models, 'DatabaseManager', StubDatabase), \
+        (main, 'setup_logging', lambda: None)
+    saved = [getattr(module, name) for module, name, _ in modules]
+    streaming, local_dir = Config.USE_STREAMING, Config.LOCAL_DATA_DIR
+    try:
+        for module, name, stub in modules:
+            setattr(module, name, stub)
+        Config.USE_STREAMING = False
+        main.run_collector(interval=0)
+        assert closed == ['stream', 'collector', 'database']
+
+        closed.clear()
+        with tempfile.TemporaryDirectory() as root:
+            Config.LOCAL_DATA_DIR = root
+            assert main.run_backtest(['BTCUSDT'], '1h') == {}
+        assert closed == ['collector']
+    finally:
+        for (module, name, _), original in zip(modules, saved):
+            setattr(module, name, original)
+        Config.USE_STREAMING, Config.LOCAL_DATA_DIR = streaming, local_dir
+
+def test_short_derived_history_is_fetched_once():
+    collector = _collector()
+    assert collector.fetch_historical_data('BTCUSDT', '1h', limit=300) is not None
+    requests = []
+    fetch_ohlcv = collector.client.fetch_ohlcv
+    collector.client.fetch_ohlcv = lambda *args, **kwargs: requests.append(args) or fetch_ohlcv(*args, **kwargs)
+
+    # 300 hourly bars derive 4h bars locally, without a request
+    df = collector.get_resampled_data('BTCUSDT', '4h', base_interval='1h', limit=50)
+    assert len(df) == 50 and requests == []
+
+    # but not 200 of them: the older bars come from the exchange, once
+    df = collector.get_resampled_data('BTCUSDT', '4h', base_interval='1h', limit=200)
+    assert len(df) == 200 and [args[:2] for args in requests] == [('BTCUSDT', '4h')]
+    assert len(collector.get_resampled_data('BTCUSDT', '4h', base_interval='1h', limit=200)) == 200
+    assert len(requests) == 1
+
+def test_resampler_is_fed_only_new_base_bars():
+    collector = _collector()
+    collector.fetch_historical_data('BTCUSDT', '1h', limit=300)
+    collector.get_resampled_data('BTCUSDT', '4h', base_interval='1h', limit=50)
+
+    fed = []
+    resampler = collector.resamplers[('BTCUSDT', '1h', '4h')]
+    update_many = resampler.update_many
+    resampler.update_many = lambda rows: fed.append(len(rows)) or update_many(rows)
+    buffer = collector.candle_buffers[('BTCUSDT', '1h')]
+    last = buffer.tail(1)[0]
+    buffer.merge([[last[0] + i * 3_600_000, 2.0, 2.0, 2.0, 2.0, 2.0] for i in range(3)])
+
+    df = collector.get_resampled_data('BTCUSDT', '4h', base_interval='1h', limit=50)
+    # The revised forming bar and the two new ones, not the whole buffer
+    assert fed == [3] and df['close'].iloc[-1] == 2.0
+
+def test_returned_frames_are_independent_of_the_buffer():
+    collector = _collector()
+    first = collector.fetch_historical_data('BTCUSDT', '1h', limit=100)
+    snapshot = first.to_numpy().copy()
+    first.iloc[-1, first.columns.get_loc('close')] = 1.0  # callers may edit their frame
+
+    # A later sync revises the forming bar and appends new ones in the same buffer
+    buffer = collector.candle_buffers[('BTCUSDT', '1h')]
+    last = buffer.tail(1)[0]
+    buffer.merge([[last[0] + i * 3_600_000, 2.0, 2.0, 2.0, 2.0, 2.0] for i in range(50)])
+    assert (first.to_numpy()[:-1] == snapshot[:-1]).all()
+    assert buffer.tail(1)[0][4] == 2.0
+
+def test_failed_live_fetch_is_not_persisted():
+    class BrokenExchange:
+        markets = {'BTC/USDT': {}}
+
+        def fetch_ohlcv(self, **kwargs):
+            raise ConnectionError("exchange unreachable")
+
+    client = BinanceClient(use_mock=False)
+    client.client = BrokenExchange()
+    client._ensure_markets = lambda: None
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        collector = DataCollector(client, DatabaseManager(backend=MemoryBackend()), candle_store=store)
+        assert collector.fetch_historical_data('BTCUSDT', '1h', limit=100) is None
+        assert ('BTCUSDT', '1h') not in collector.candle_buffers
+        assert store.last_timestamp('BTCUSDT', '1h') is None
+
+def test_gap_filled_bars_are_never_persisted():
+    with tempfile.TemporaryDirectory() as root:
+        client = BinanceClient(use_mock=False)
+        rows = client.mock_data.get_mock_ohlcv('BTCUSDT', 120, timeframe='1h')
+        gap = [row[0] for row in rows[50:53]]
+        client.fetch_ohlcv = lambda *args, **kwargs: [row for row in rows if row[0] not in gap]
+
+        store = CandleStore(root)
+        collector = DataCollector(client, DatabaseManager(backend=MemoryBackend()), candle_store=store)
+        df = collector.fetch_multiple_symbols(['BTCUSDT'], '1h', limit=100)['BTCUSDT']
+        assert len(df) == 100 and pd.Timestamp(gap[1], unit='ms') in df.index  # filled in memory
+
+        stored = store.read('BTCUSDT', '1h')[:, 0].tolist()
+        assert len(stored) == 117 and not set(gap) & set(stored)
+        assert collector.db_manager.flush(timeout=10)
+        saved = collector.db_manager.get_recent_market_data('BTCUSDT', limit=200, timeframe='1h')
+        assert len(saved) == 97 and not {int(c['timestamp'].timestamp() * 1000) for c in saved} & set(gap)
+
+        # After a restart the buffer is seeded from disk and the gap is filled again, still unsaved
+        restarted = DataCollector(client, DatabaseManager(backend=MemoryBackend()), candle_store=store)
+        assert len(restarted._load_from_store('BTCUSDT', '1h', 100)) == 120
+        assert restarted._filled_bars[('BTCUSDT', '1h')] == frozenset(gap)
+
+if __name__ == "__main__":
+    test_incremental_pipeline_runs_without_process_pool()
+    test_close_shuts_down_analysis_pool()
+    test_trading_bot_is_closed_on_exit()
+    test_collector_and_backtest_release_resources_on_exit()
+    test_short_derived_history_is_fetched_once()
+    test_resampler_is_fed_only_new_base_bars()
+    test_returned_frames_are_independent_of_the_buffer()
+    test_failed_live_fetch_is_not_persisted()
+    test_gap_filled_bars_are_never_persisted()
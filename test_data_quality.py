@@ -0,0 +1,71 @@
+import logging
+import numpy as np
+import pandas as pd
+from data.quality import DataQualityMonitor, repair_ohlcv
+
+logging.basicConfig(level=logging.INFO)
+
+HOUR = 3_600_000
+
+def _clean(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = np.roll(close, 1)
+    open_[0] = close[0]
+    high = np.maximum(open_, close) + rng.random(n)
+    low = np.minimum(open_, close) - rng.random(n)
+    return np.column_stack([np.arange(n) * HOUR, open_, high, low, close, rng.random(n) * 10])
+
+def _pandas_reference(rows):
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df = df.drop_duplicates('timestamp', keep='last').sort_values('timestamp').set_index('timestamp')
+    grid = np.arange(df.index[0], df.index[-1] + HOUR, HOUR)
+    df = df.reindex(grid)
+    close = df['close'].ffill()
+    for column in ('open', 'high', 'low', 'close'):
+        df[column] = df[column].fillna(close)
+    df['volume'] = df['volume'].fillna(0.0)
+    return df.reset_index().to_numpy()
+
+def test_repair_matches_pandas():
+    rows = _clean(500)
+    dirty = np.delete(rows, [10, 11, 12, 200], axis=0)         # two gaps
+    dirty = np.vstack([dirty, dirty[50:53] * [1, 1, 1, 1, 1, 2]])  # revised duplicates
+    dirty = np.random.default_rng(1).permutation(dirty)          # out of order
+
+    repaired, filled, report = repair_ohlcv(dirty, '1h')
+    np.testing.assert_array_equal(repaired, _pandas_reference(dirty))
+    assert report.duplicates == 3 and report.gaps == 2 and report.filled == 4
+    assert report.out_of_order > 0 and not report.clean
+    assert filled.sum() == 4 and filled[[10, 11, 12, 200]].all()
+
+def test_invalid_and_misaligned_bars_are_dropped():
+    rows = _clean(20)
+    rows[5, 2] = rows[5, 4] - 1      # high below close
+    rows[8, 4] = np.nan
+    rows = np.vstack([rows, [3 * HOUR + 1, 1, 1, 1, 1, 1]])
+    repaired, filled, report = repair_ohlcv(rows, '1h')
+    assert report.invalid == 2 and report.misaligned == 1
+    assert len(repaired) == 20 and filled[[5, 8]].all()
+    assert repaired[5, 1:5].tolist() == [rows[4, 4]] * 4
+
+def test_clean_data_is_unchanged():
+    rows = _clean(1000)
+    repaired, filled, report = repair_ohlcv(rows.tolist(), '1h')
+    np.testing.assert_array_equal(repaired, rows)
+    assert report.clean and not filled.any()
+
+def test_monitor_counters():
+    monitor = DataQualityMonitor()
+    rows = _clean(50)
+    monitor.process('BTCUSDT', '1h', np.delete(rows, 20, axis=0))
+    monitor.process('BTCUSDT', '1h', np.vstack([rows, rows[-1:]]))
+    counters = monitor.counters('BTCUSDT')[('BTCUSDT', '1h')]
+    assert counters['rows'] == 100 and counters['filled'] == 1 and counters['duplicates'] == 1
+    assert monitor.counters('ETHUSDT') == {}
+
+if __name__ == "__main__":
+    test_repair_matches_pandas()
+    test_invalid_and_misaligned_bars_are_dropped()
+    test_clean_data_is_unchanged()
+    test_monitor_counters()
@@ -0,0 +1,70 @@
+import logging
+import os
+from datetime import datetime, timedelta
+
+# Unreachable server with a short timeout so DatabaseManager falls back to memory quickly
+os.environ['MONGODB_URL'] = 'mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=100'
+
+from database.backends import MemoryBackend
+from database.models import DatabaseManager
+
+logging.basicConfig(level=logging.INFO)
+
+START = datetime(2024, 1, 1)
+
+def _records(start, stop, close=100.0):
+    return [{'timestamp': START + timedelta(hours=i), 'open': close, 'high': close + 1,
+             'low': close - 1, 'close': close, 'volume': 10.0, 'RSI': 50.0}
+            for i in range(start, stop)]
+
+def _indicators(direction):
+    return {'trend': {'direction': direction, 'strength': 0.5, 'confidence': 0.5}, 'technical': {'rsi': 50.0}}
+
+def test_candles_are_upserted_once_per_open_time():
+    db = DatabaseManager()
+    db.save_market_data('BTCUSDT', {'data': _records(0, 500), 'interval': '1h', 'indicators': _indicators('UPTREND')})
+    # The next cycle resends the whole window with a revised last bar and one new bar
+    db.save_market_data('BTCUSDT', {'data': _records(1, 499) + _records(499, 501, close=101.0), 'interval': '1h'})
+
+    candles = db.get_recent_market_data('BTCUSDT', limit=1000)
+    assert len(candles) == 501
+    assert candles[0]['timestamp'] == START + timedelta(hours=500)
+    assert candles[1]['close'] == 101.0 and candles[2]['close'] == 100.0
+    assert db.last_candle_timestamp('BTCUSDT', '1h') == START + timedelta(hours=500)
+
+def test_only_new_candles_are_written():
+    db = DatabaseManager()
+    assert db.save_candles('ETHUSDT', '1h', _records(0, 500)) == 500
+    # Only the forming bar and the new bar are written again
+    assert db.save_candles('ETHUSDT', '1h', _records(0, 501)) == 2
+    assert db.save_candles('ETHUSDT', '4h', _records(0, 10)) == 10
+
+def test_latest_indicators_document():
+    db = DatabaseManager()
+    db.save_market_data('BTCUSDT', {'data': _records(0, 3), 'interval': '1h', 'indicators': _indicators('SIDEWAYS')})
+    db.save_market_data('BTCUSDT', {'data': _records(3, 4), 'interval': '1h', 'indicators': _indicators('UPTREND')})
+    assert db.get_market_trend('BTCUSDT')['direction'] == 'UPTREND'
+    assert db.get_latest_technical_analysis('SOLUSDT') is None
+
+def test_latest_state_is_served_from_cache():
+    backend = MemoryBackend()
+    db, other_process = DatabaseManager(backend=backend), DatabaseManager(backend=backend)
+    db.save_latest_indicators('BTCUSDT', '1h', _indicators('UPTREND'))
+
+    # A write from another process is seen once the entry expires or is invalidated
+    other_process.save_latest_indicators('BTCUSDT', '4h', _indicators('DOWNTREND'))
+    assert db.get_market_trend('BTCUSDT')['direction'] == 'UPTREND'
+    db.latest_state.invalidate('BTCUSDT')
+    assert db.get_market_trend('BTCUSDT')['direction'] == 'DOWNTREND'
+
+    # A re-read never replaces a newer local write that the store has not seen yet
+    db.latest_state.ttl = 0
+    db.latest_state.update({'symbol': 'BTCUSDT', 'timeframe': '1h', 'timestamp': datetime.now() + timedelta(seconds=1),
+                            'technical_indicators': _indicators('SIDEWAYS')})
+    assert db.get_market_trend('BTCUSDT')['direction'] == 'SIDEWAYS'
+
+if __name__ == "__main__":
+    test_candles_are_upserted_once_per_open_time()
+    test_only_new_candles_are_written()
+    test_latest_indicators_document()
+    test_latest_state_is_served_from_cache()
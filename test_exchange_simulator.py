@@ -0,0 +1,128 @@
+import logging
+import sys
+import threading
+from connection.exchange_simulator import ExchangeSimulator, split_symbol
+
+logging.basicConfig(level=logging.INFO)
+
+def _simulator(price=100.0, **kwargs):
+    return ExchangeSimulator(price_source=lambda symbol: price, fee_rate=0.001, **kwargs)
+
+def test_market_order_fills_at_last_price_with_fee():
+    simulator = _simulator()
+    order = simulator.create_order('BTCUSDT', 'MARKET', 'BUY', 2.0)
+    assert order['status'] == 'closed' and order['filled'] == 2.0
+    assert order['average'] == order['price'] == 100.0
+    assert abs(order['fee']['cost'] - 0.2) < 1e-12 and order['fee']['currency'] == 'USDT'
+    assert order['trades'][0]['takerOrMaker'] == 'taker'
+    assert simulator.balances['BTC']['free'] == 2.0
+    assert abs(simulator.balances['USDT']['free'] + 200.2) < 1e-9
+    assert split_symbol('ETH/BTC') == ('ETH', 'BTC') and split_symbol('ETHBTC') == ('ETH', 'BTC')
+
+def test_limit_order_rests_then_fills_partially_by_volume():
+    simulator = _simulator()
+    order = simulator.create_order('BTCUSDT', 'limit', 'buy', 3.0, price=95.0)
+    assert order['status'] == 'open' and order['filled'] == 0.0
+
+    assert simulator.update_price('BTCUSDT', 96.0) == 0          # not crossed yet
+    assert simulator.update_price('BTCUSDT', 94.0, volume=1.0) == 1
+    order = simulator.fetch_order(order['id'])
+    assert order['filled'] == 1.0 and order['status'] == 'open'
+    assert order['trades'][0]['price'] == 95.0 and order['trades'][0]['takerOrMaker'] == 'maker'
+
+    simulator.update_price('BTCUSDT', 94.0, volume=10.0)
+    order = simulator.fetch_order(order['id'])
+    assert order['status'] == 'closed' and order['remaining'] == 0.0
+
+def test_crossing_limit_matches_resting_book_first():
+    simulator = _simulator()
+    ask = simulator.create_order('BTCUSDT', 'limit', 'sell', 1.0, price=101.0)
+    bid = simulator.create_order('BTCUSDT', 'limit', 'buy', 1.5, price=102.0)
+    # 1.0 trades against the resting ask at its price, the rest against the market
+    assert simulator.fetch_order(ask['id'])['status'] == 'closed'
+    assert [t['price'] for t in bid['trades']] == [101.0, 100.0]
+    assert bid['status'] == 'closed'
+
+def test_stop_orders_trigger_on_price_updates():
+    simulator = _simulator()
+    stop = simulator.create_order('BTCUSDT', 'stop_loss', 'sell', 1.0, stop_price=90.0)
+    stop_limit = simulator.create_order('BTCUSDT', 'stop_loss_limit', 'sell', 1.0, price=84.0, stop_price=85.0)
+    assert stop['status'] == stop_limit['status'] == 'open'
+    assert simulator.create_order('BTCUSDT', 'stop_loss', 'sell', 1.0, stop_price=100.0)['status'] == 'rejected'
+
+    simulator.update_price('BTCUSDT', 91.0)
+    assert simulator.fetch_order(stop['id'])['filled'] == 0.0
+
+    simulator.update_price('BTCUSDT', 89.0)
+    stop = simulator.fetch_order(stop['id'])
+    assert stop['status'] == 'closed' and stop['average'] == 89.0 and stop['type'] == 'market'
+
+    # Gaps below the limit price: the triggered limit rests instead of filling
+    simulator.update_price('BTCUSDT', 83.0)
+    stop_limit = simulator.fetch_order(stop_limit['id'])
+    assert stop_limit['type'] == 'limit' and stop_limit['filled'] == 0.0 and stop_limit['status'] == 'open'
+    simulator.update_price('BTCUSDT', 84.5)
+    assert simulator.fetch_order(stop_limit['id'])['status'] == 'closed'
+
+def test_cancel_order_releases_reserved_funds():
+    simulator = _simulator(balances={'USDT': {'free': 1000.0, 'used': 0.0, 'total': 1000.0}},
+                           enforce_balances=True)
+    order = simulator.create_order('BTCUSDT', 'limit', 'buy', 5.0, price=90.0)
+    assert simulator.balances['USDT']['used'] > 0
+    cancelled = simulator.cancel_order(order['id'], 'BTCUSDT')
+    assert cancelled['status'] == 'canceled'
+    assert simulator.balances['USDT'] == {'free': 1000.0, 'used': 0.0, 'total': 1000.0}
+
+    # Cancelled orders never fill; cancelling again or an unknown id changes nothing
+    simulator.update_price('BTCUSDT', 80.0)
+    assert simulator.fetch_order(order['id'])['filled'] == 0.0
+    assert simulator.cancel_order(order['id'])['status'] == 'canceled'
+    assert simulator.cancel_order('missing') == {}
+    assert simulator.create_order('BTCUSDT', 'limit', 'buy', 50.0, price=90.0)['status'] == 'rejected'
+    assert simulator.stats['cancels'] == 1
+
+def test_concurrent_price_feed_and_orders_keep_balances_consistent():
+    start = {'USDT': {'free': 1e6, 'used': 0.0, 'total': 1e6}, 'BTC': {'free': 1e4, 'used': 0.0, 'total': 1e4}}
+    simulator = _simulator(balances=start, enforce_balances=True)
+    done = threading.Event()
+
+    def feed():
+        tick = 0
+        while not done.is_set():
+            simulator.update_price('BTCUSDT', 99.0 if tick % 2 else 101.0, volume=0.5)
+            tick += 1
+
+    feeder = threading.Thread(target=feed)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # interleave the two threads as often as possible
+    feeder.start()
+    try:
+        for i in range(2000):
+            order = simulator.create_order('BTCUSDT', 'limit', 'buy' if i % 2 else 'sell', 1.0, price=100.0)
+            if i % 3 == 0:
+                simulator.cancel_order(order['id'])
+    finally:
+        done.set()
+        feeder.join()
+        sys.setswitchinterval(switch_interval)
+    for order in simulator.fetch_open_orders('BTCUSDT'):
+        simulator.cancel_order(order['id'])
+
+    # Every reservation was released exactly once and the fills account for every balance change
+    assert simulator._reserved == {}
+    orders = simulator.orders.values()
+    bought = sum(o['filled'] for o in orders if o['side'] == 'buy') - sum(o['filled'] for o in orders if o['side'] == 'sell')
+    spent = sum((o['cost'] + o['fee']['cost']) * (1 if o['side'] == 'buy' else -1) for o in orders) \
+        + 2 * sum(o['fee']['cost'] for o in orders if o['side'] == 'sell')
+    for asset, delta in (('BTC', bought), ('USDT', -spent)):
+        balance = simulator.balances[asset]
+        assert abs(balance['used']) < 1e-6 and abs(balance['free'] - balance['total']) < 1e-6
+        assert abs(balance['total'] - start[asset]['total'] - delta) < 1e-6
+
+if __name__ == "__main__":
+    test_market_order_fills_at_last_price_with_fee()
+    test_limit_order_rests_then_fills_partially_by_volume()
+    test_crossing_limit_matches_resting_book_first()
+    test_stop_orders_trigger_on_price_updates()
+    test_cancel_order_releases_reserved_funds()
+    test_concurrent_price_feed_and_orders_keep_balances_consistent()
@@ -0,0 +1,75 @@
+import logging
+import numpy as np
+import pandas as pd
+from connection.mock_data import MockBinanceData
+from data.incremental_indicators import IncrementalIndicators, IndicatorEngine
+
+logging.basicConfig(level=logging.INFO)
+
+def _candles(limit=600):
+    return MockBinanceData().get_mock_ohlcv('BTCUSDT', limit, timeframe='1h')
+
+def _pandas_ta_frame(rows):
+    """The full-frame computation DataCollector.add_technical_indicators performs"""
+    import pandas_ta  # noqa: F401 - registers the DataFrame.ta accessor
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df.index = pd.to_datetime(df.pop('timestamp'), unit='ms')
+    adx = df.ta.adx()
+    macd = df.ta.macd()
+    bbands = df.ta.bbands()
+    stoch = df.ta.stoch()
+    return pd.DataFrame({
+        'ADX': adx['ADX_14'], 'DIplus': adx['DMP_14'], 'DIminus': adx['DMN_14'],
+        'EMA_9': df.ta.ema(length=9), 'EMA_21': df.ta.ema(length=21),
+        'SMA_50': df.ta.sma(length=50), 'SMA_200': df.ta.sma(length=200),
+        'RSI': df.ta.rsi(length=14),
+        'MACD': macd['MACD_12_26_9'], 'MACD_Signal': macd['MACDs_12_26_9'],
+        'BB_upper': bbands['BBU_20_2.0'], 'BB_middle': bbands['BBM_20_2.0'], 'BB_lower': bbands['BBL_20_2.0'],
+        'Volume_MA': df.ta.sma(close=df['volume'], length=20),
+        'OBV': df.ta.obv(), 'MFI': df.ta.mfi(), 'ATR': df.ta.atr(length=14),
+        'SO_K': stoch['STOCHk_14_3_3'], 'SO_D': stoch['STOCHd_14_3_3']
+    }, index=df.index)
+
+def test_matches_pandas_ta():
+    rows = _candles()
+    state = IncrementalIndicators(history=len(rows))
+    for row in rows:
+        state.update(row)
+
+    expected = _pandas_ta_frame(rows)
+    result = state.frame()
+    # Compare after the longest warm-up (SMA 200) where every column is defined
+    for column in IncrementalIndicators.COLUMNS:
+        np.testing.assert_allclose(
+            result[column].values[200:], expected[column].values[200:], rtol=1e-6, err_msg=column
+        )
+
+def test_forming_bar_revisions_match_final_bar():
+    rows = _candles(300)
+    revised = IncrementalIndicators(history=len(rows))
+    direct = IncrementalIndicators(history=len(rows))
+    for row in rows:
+        # Partial updates of the forming bar must not leak into the committed state
+        revised.update([row[0], row[1], row[1], row[1], row[1], 0.0])
+        revised.update([row[0], row[1], row[2], row[1], row[4], row[5] / 2])
+        revised.update(row)
+        direct.update(row)
+    pd.testing.assert_frame_equal(revised.frame(), direct.frame())
+
+def test_engine_feeds_only_new_candles():
+    rows = _candles(400)
+    engine = IndicatorEngine(history=400)
+    engine.update('BTCUSDT', '1h', rows[:300])
+    # Overlapping window: the last known bar is revised and 100 new bars are added
+    state = engine.update('BTCUSDT', '1h', rows[200:])
+
+    full = IncrementalIndicators(history=400)
+    for row in rows:
+        full.update(row)
+    pd.testing.assert_frame_equal(state.frame(), full.frame())
+    logging.info(f"Latest indicators: {full.frame(1).iloc[-1].to_dict()}")
+
+if __name__ == "__main__":
+    test_matches_pandas_ta()
+    test_forming_bar_revisions_match_final_bar()
+    test_engine_feeds_only_new_candles()
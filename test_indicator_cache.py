@@ -0,0 +1,90 @@
+import logging
+import pandas as pd
+from connection.mock_data import MockBinanceData
+import analysis.advanced_indicators as advanced_indicators
+from analysis.advanced_indicators import AdvancedIndicators
+from data.incremental_indicators import IndicatorEngine
+from data.indicator_cache import IndicatorCache, GROUP_COLUMNS
+
+logging.basicConfig(level=logging.INFO)
+
+def _frame(symbol='BTCUSDT', limit=300):
+    rows = MockBinanceData().get_mock_ohlcv(symbol, limit, timeframe='1h')
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df.index = pd.to_datetime(df.pop('timestamp'), unit='ms')
+    return df
+
+def test_both_column_names_come_from_one_computation():
+    cache = IndicatorCache(max_entries=4)
+    df = _frame()
+    cache.apply('BTCUSDT', '1h', df, ['MACD_Signal', 'Volume_MA'])
+    other = _frame()
+    cache.apply('BTCUSDT', '1h', other, ['Signal', 'VOL_MA', 'ATR'])
+
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+    assert (df['MACD_Signal'].dropna() == other['Signal'].dropna()).all()
+    assert (df['Volume_MA'].dropna() == other['VOL_MA'].dropna()).all()
+
+def test_revised_forming_bar_is_recomputed():
+    cache = IndicatorCache(max_entries=4)
+    df = _frame()
+    cache.get('BTCUSDT', '1h', df)
+    df.iloc[-1, df.columns.get_loc('close')] *= 1.01
+    cache.get('BTCUSDT', '1h', df)
+    assert cache.stats()['misses'] == 2
+
+def test_least_recently_used_entry_is_evicted():
+    cache = IndicatorCache(max_entries=2)
+    frames = {symbol: _frame(symbol) for symbol in ('BTCUSDT', 'ETHUSDT', 'BNBUSDT')}
+    cache.get('BTCUSDT', '1h', frames['BTCUSDT'])
+    cache.get('ETHUSDT', '1h', frames['ETHUSDT'])
+    cache.get('BTCUSDT', '1h', frames['BTCUSDT'])
+    cache.get('BNBUSDT', '1h', frames['BNBUSDT'])  # evicts ETHUSDT
+
+    cache.get('BTCUSDT', '1h', frames['BTCUSDT'])
+    cache.get('ETHUSDT', '1h', frames['ETHUSDT'])
+    assert cache.stats() == {'entries': 2, 'hits': 2, 'misses': 4}
+
+def test_advanced_indicators_reuse_collector_results():
+    # DataCollector stores its incremental indicators; AdvancedIndicators reads them without recomputing
+    cache = IndicatorCache(max_entries=4)
+    df = _frame()
+    rows = MockBinanceData().get_mock_ohlcv('BTCUSDT', 300, timeframe='1h')
+    indicators = IndicatorEngine(history=300).update('BTCUSDT', '1h', rows).frame(len(df))
+    indicators.index = df.index
+    indicators['volatility'] = (indicators['ATR'] / df['close']) * 100
+    cache.put('BTCUSDT', '1h', df, indicators)
+
+    result = AdvancedIndicators(cache).calculate_all_indicators(_frame(), 'BTCUSDT', '1h')
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 0}
+    assert result['rsi'] == indicators['RSI'].iloc[-1]
+    assert result['macd_signal'] == indicators['MACD_Signal'].iloc[-1]
+
+def test_failing_indicator_only_empties_its_section():
+    def compute_indicators(df, params=None):
+        raise ValueError("MACD needs more bars")
+
+    def compute_indicator_group(df, group, params=None):
+        if group == 'momentum':
+            raise ValueError("MACD needs more bars")
+        return pd.DataFrame({column: 1.0 for column in GROUP_COLUMNS[group]}, index=df.index)
+
+    saved = advanced_indicators.compute_indicators, advanced_indicators.compute_indicator_group
+    advanced_indicators.compute_indicators = compute_indicators
+    advanced_indicators.compute_indicator_group = compute_indicator_group
+    try:
+        df = _frame()
+        df['RSI'] = 50.0  # a stale column from an earlier pass must not be reported
+        result = AdvancedIndicators().calculate_all_indicators(df)
+    finally:
+        advanced_indicators.compute_indicators, advanced_indicators.compute_indicator_group = saved
+
+    assert result['adx'] == 1.0 and result['atr'] == 1.0 and result['mfi'] == 1.0
+    assert 'rsi' not in result and 'macd' not in result and 'RSI' not in df
+
+if __name__ == "__main__":
+    test_both_column_names_come_from_one_computation()
+    test_revised_forming_bar_is_recomputed()
+    test_least_recently_used_entry_is_evicted()
+    test_advanced_indicators_reuse_collector_results()
+    test_failing_indicator_only_empties_its_section()
@@ -0,0 +1,71 @@
+import logging
+import os
+import tempfile
+from connection.market_metadata import MarketMetadata
+
+logging.basicConfig(level=logging.INFO)
+
+MARKETS = {
+    'BTC/USDT': {
+        'id': 'BTCUSDT',
+        'symbol': 'BTC/USDT',
+        'info': {'filters': [
+            {'filterType': 'PRICE_FILTER', 'tickSize': '0.01000000'},
+            {'filterType': 'LOT_SIZE', 'stepSize': '0.00001000', 'minQty': '0.00001000', 'maxQty': '9000.00000000'},
+            {'filterType': 'NOTIONAL', 'minNotional': '5.00000000'}
+        ]}
+    }
+}
+
+def test_markets_are_cached_on_disk():
+    calls = []
+    def loader():
+        calls.append(1)
+        return MARKETS
+
+    path = os.path.join(tempfile.mkdtemp(), 'markets.json')
+    MarketMetadata(path, loader).ensure_loaded()
+    metadata = MarketMetadata(path, loader)
+    assert metadata.get_rules('BTCUSDT').step_size == 0.00001
+    assert len(calls) == 1
+
+    # An expired cache is reloaded from the exchange
+    MarketMetadata(path, loader, refresh_interval=-1).ensure_loaded()
+    assert len(calls) == 2
+
+def test_expired_markets_are_refreshed_in_process():
+    markets = [MARKETS]
+    def loader():
+        if not markets:
+            raise ConnectionError("exchange unreachable")
+        return markets.pop()
+
+    metadata = MarketMetadata(os.path.join(tempfile.mkdtemp(), 'markets.json'), loader, refresh_interval=60)
+    assert metadata.get_rules('BTCUSDT') is not None
+
+    # Within the interval nothing is reloaded
+    listed = {**MARKETS, 'ETH/USDT': {**MARKETS['BTC/USDT'], 'id': 'ETHUSDT', 'symbol': 'ETH/USDT'}}
+    markets.append(listed)
+    assert metadata.get_rules('ETHUSDT') is None
+
+    # Once expired, the next use picks up the new listing
+    metadata.loaded_at -= 61
+    assert metadata.get_rules('ETHUSDT') is not None
+
+    # A failed refresh keeps the previous rules
+    metadata.loaded_at -= 61
+    assert metadata.get_rules('ETHUSDT') is not None
+    assert not metadata.expired()
+
+def test_order_rounding_and_filters():
+    metadata = MarketMetadata(os.path.join(tempfile.mkdtemp(), 'markets.json'), lambda: MARKETS)
+    assert metadata.round_quantity('BTCUSDT', 0.123456789) == 0.12345
+    assert metadata.round_price('BTC/USDT', 42123.456) == 42123.46
+    assert metadata.validate_order('BTCUSDT', 0.00001, 42000) is not None
+    assert metadata.validate_order('BTCUSDT', 0.001, 42000) is None
+    assert metadata.round_quantity('UNKNOWN', 1.234) == 1.234
+
+if __name__ == "__main__":
+    test_markets_are_cached_on_disk()
+    test_expired_markets_are_refreshed_in_process()
+    test_order_rounding_and_filters()
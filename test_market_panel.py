@@ -0,0 +1,56 @@
+import logging
+import numpy as np
+from connection.mock_data import MockBinanceData
+from data.incremental_indicators import IncrementalIndicators
+from data.panel import MarketPanel
+
+logging.basicConfig(level=logging.INFO)
+
+THRESHOLDS = {'strong_uptrend': 0.8, 'uptrend': 0.6, 'sideways': 0.4, 'downtrend': 0.3}
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'XRPUSDT']
+
+def _universe():
+    mock = MockBinanceData()
+    ohlcv = {symbol: mock.get_mock_ohlcv(symbol, 600, timeframe='1h') for symbol in SYMBOLS}
+    ohlcv['XRPUSDT'] = ohlcv['XRPUSDT'][250:]  # Listed later than the others
+    return ohlcv
+
+def test_panel_matches_per_symbol_indicators():
+    ohlcv = _universe()
+    panel = MarketPanel.from_ohlcv(ohlcv)
+    panel.compute_indicators()
+    assert panel.shape == (len(SYMBOLS), 600)
+
+    for symbol, rows in ohlcv.items():
+        state = IncrementalIndicators(history=len(rows))
+        for row in rows:
+            state.update(row)
+        expected = state.frame()
+        result = panel.frame(symbol).loc[expected.index]
+        for column in IncrementalIndicators.COLUMNS:
+            np.testing.assert_allclose(result[column].values, expected[column].values,
+                                       rtol=1e-9, atol=1e-9, err_msg=f"{symbol} {column}")
+
+def test_trend_for_all_symbols_in_one_pass():
+    panel = MarketPanel.from_ohlcv(_universe())
+    panel.analyze_trend(THRESHOLDS)
+    latest = panel.latest()
+    assert list(latest.index) == SYMBOLS
+    assert latest['market_trend'].isin(
+        ['STRONG_DOWNTREND', 'DOWNTREND', 'SIDEWAYS', 'UPTREND', 'STRONG_UPTREND']
+    ).all()
+    logging.info(f"Latest panel trend:\n{latest[['RSI', 'ADX', 'trend_strength', 'market_trend']]}")
+
+def test_missing_bars_are_filled_with_previous_close():
+    ohlcv = _universe()
+    del ohlcv['ETHUSDT'][300:302]
+    panel = MarketPanel.from_ohlcv(ohlcv)
+    row = panel.symbols.index('ETHUSDT')
+    assert not np.isnan(panel.close[row]).any()
+    assert panel.volume[row, 300] == 0.0
+    assert panel.open[row, 300] == panel.close[row, 299]
+
+if __name__ == "__main__":
+    test_panel_matches_per_symbol_indicators()
+    test_trend_for_all_symbols_in_one_pass()
+    test_missing_bars_are_filled_with_previous_close()
@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+from connection.binance_client import BinanceClient
+from connection.market_stream import MarketStream, ReplayServer
+
+logging.basicConfig(level=logging.INFO)
+
+def _candles(count, start=1_700_000_000_000, step=3_600_000, price=100.0):
+    return [
+        [start + i * step, price + i, price + i + 2, price + i - 1, price + i + 1, 10.0 + i]
+        for i in range(count)
+    ]
+
+def test_replay_stream():
+    history = _candles(10)
+    replay = _candles(15)[10:]
+
+    stream = MarketStream(['BTCUSDT'], '1h', source=ReplayServer({'BTCUSDT': replay}, '1h'))
+    stream.seed('BTCUSDT', history)
+
+    events = []
+    stream.subscribe(lambda event, symbol, data: events.append((event, symbol, data)))
+
+    # Consume the replay synchronously
+    for message in stream.source.messages(threading.Event()):
+        stream.handle_message(message)
+
+    ohlcv = stream.get_ohlcv('BTCUSDT', 15)
+    assert ohlcv is not None
+    assert [row[0] for row in ohlcv] == [row[0] for row in _candles(15)]
+    assert ohlcv[-1] == replay[-1]
+    assert stream.get_price('BTCUSDT') == replay[-1][4]
+    assert stream.get_24h_volume('BTCUSDT') is not None
+    assert stream.get_ohlcv('BTCUSDT', 16) is None
+
+    closed = [data for event, _, data in events if event == 'kline' and data['closed']]
+    assert len(closed) == len(replay)
+    logging.info(f"Replayed {stream.source.messages_sent} messages")
+
+def test_stale_updates_are_ignored():
+    stream = MarketStream(['ETHUSDT'], '1h', source=ReplayServer({}, '1h'), max_candles=5)
+    stream.seed('ETHUSDT', _candles(8))
+    assert len(stream.klines['ETHUSDT']) == 5
+
+    old = ReplayServer({'ETHUSDT': _candles(1)}, '1h')
+    for message in old.messages(threading.Event()):
+        stream.handle_message(message)
+    assert stream.klines['ETHUSDT'][-1] == _candles(8)[-1]
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_stale_stream_is_not_served():
+    # One frame, then the source idles: the stream is running but goes quiet
+    stream = MarketStream(['BTCUSDT'], '1h', source=ReplayServer({'BTCUSDT': _candles(1)}, '1h', interval=10))
+    stream.start()
+    try:
+        assert _wait_for(lambda: 'BTCUSDT' in stream.last_update)
+        assert stream.is_fresh('BTCUSDT', max_age=30)
+        stream.last_update['BTCUSDT'] -= 60
+        assert not stream.is_fresh('BTCUSDT', max_age=30)
+        assert not stream.is_fresh('ETHUSDT', max_age=30)
+    finally:
+        stream.stop()
+
+def test_dead_stream_falls_back_to_rest():
+    client = BinanceClient()
+    stream = MarketStream(['BTCUSDT'], '1h', source=ReplayServer({'BTCUSDT': _candles(3, price=1.0)}, '1h'))
+    stream.seed('BTCUSDT', _candles(600, price=1.0))
+    stream.start()
+    assert _wait_for(lambda: not stream.is_running())  # replay exhausted, thread exited
+    client.stream = stream
+
+    frozen_price = stream.get_price('BTCUSDT')
+    assert client.get_symbol_price('BTCUSDT') != frozen_price
+    assert client.stream is None
+    ohlcv = client.fetch_ohlcv('BTCUSDT', '1h', 500)
+    assert ohlcv[-1] != stream.get_ohlcv('BTCUSDT', 1)[-1]
+
+if __name__ == "__main__":
+    test_replay_stream()
+    test_stale_updates_are_ignored()
+    test_stale_stream_is_not_served()
+    test_dead_stream_falls_back_to_rest()
@@ -0,0 +1,88 @@
+import logging
+import numpy as np
+import pandas as pd
+from data.trend import analyze_trend
+
+logging.basicConfig(level=logging.INFO)
+
+THRESHOLDS = {'strong_uptrend': 0.8, 'uptrend': 0.6, 'sideways': 0.4, 'downtrend': 0.3}
+
+def loop_market_trend(df: pd.DataFrame, thresholds: dict) -> pd.DataFrame:
+    """The original row-by-row DataCollector.analyze_market_trend, kept as the reference"""
+    trend_strength = np.zeros(len(df))
+    confidence = np.zeros(len(df))
+
+    for i in range(len(df)):
+        if df['ADX'].iloc[i] > 25:
+            if df['DIplus'].iloc[i] > df['DIminus'].iloc[i]:
+                trend_strength[i] += 0.3
+            else:
+                trend_strength[i] -= 0.3
+            confidence[i] += 0.2
+
+        rsi = df['RSI'].iloc[i]
+        if rsi > 70:
+            trend_strength[i] -= 0.2
+        elif rsi < 30:
+            trend_strength[i] += 0.2
+        confidence[i] += 0.1
+
+        if df['MACD'].iloc[i] > df['MACD_Signal'].iloc[i]:
+            trend_strength[i] += 0.2
+        else:
+            trend_strength[i] -= 0.2
+        confidence[i] += 0.2
+
+        if df['EMA_9'].iloc[i] > df['EMA_21'].iloc[i] > df['SMA_50'].iloc[i]:
+            trend_strength[i] += 0.2
+        elif df['EMA_9'].iloc[i] < df['EMA_21'].iloc[i] < df['SMA_50'].iloc[i]:
+            trend_strength[i] -= 0.2
+        confidence[i] += 0.1
+
+    df['trend_strength'] = trend_strength
+    df['trend_confidence'] = confidence
+    df['market_trend'] = pd.cut(
+        trend_strength,
+        bins=[-np.inf, -thresholds['strong_uptrend'], -thresholds['uptrend'],
+              thresholds['uptrend'], thresholds['strong_uptrend'], np.inf],
+        labels=['STRONG_DOWNTREND', 'DOWNTREND', 'SIDEWAYS', 'UPTREND', 'STRONG_UPTREND']
+    )
+    return df
+
+def random_indicators(rows: int, seed: int = 0, nan_rows: int = 50) -> pd.DataFrame:
+    """Indicator frame covering every branch, with warm-up NaNs like real indicators"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    df = pd.DataFrame({
+        'ADX': rng.uniform(0, 60, rows),
+        'DIplus': rng.uniform(0, 40, rows),
+        'DIminus': rng.uniform(0, 40, rows),
+        'RSI': rng.uniform(0, 100, rows),
+        'MACD': rng.normal(0, 1, rows),
+        'MACD_Signal': rng.normal(0, 1, rows),
+        'EMA_9': close + rng.normal(0, 1, rows),
+        'EMA_21': close + rng.normal(0, 1, rows),
+        'SMA_50': close + rng.normal(0, 1, rows)
+    })
+    df.iloc[:min(nan_rows, rows)] = np.nan
+    return df
+
+def test_vectorized_trend_matches_loop():
+    for seed in range(3):
+        df = random_indicators(2000, seed)
+        expected = loop_market_trend(df.copy(), THRESHOLDS)
+        result = analyze_trend(df.copy(), THRESHOLDS)
+
+        np.testing.assert_array_equal(result['trend_strength'].values, expected['trend_strength'].values)
+        np.testing.assert_array_equal(result['trend_confidence'].values, expected['trend_confidence'].values)
+        pd.testing.assert_series_equal(result['market_trend'], expected['market_trend'])
+    logging.info(f"Trend distribution: {result['market_trend'].value_counts().to_dict()}")
+
+def test_every_trend_label_is_reachable():
+    df = random_indicators(5000, seed=7, nan_rows=0)
+    labels = set(analyze_trend(df, THRESHOLDS)['market_trend'].astype(str))
+    assert labels == {'STRONG_DOWNTREND', 'DOWNTREND', 'SIDEWAYS', 'UPTREND', 'STRONG_UPTREND'}
+
+if __name__ == "__main__":
+    test_vectorized_trend_matches_loop()
+    test_every_trend_label_is_reachable()
@@ -0,0 +1,70 @@
+import logging
+import threading
+import numpy as np
+from connection.mock_data import MockBinanceData, DEFAULT_ANCHOR_TS
+from connection.synthetic_market import SyntheticMarket
+
+logging.basicConfig(level=logging.INFO)
+
+HOUR = 3_600_000
+NOW = DEFAULT_ANCHOR_TS + 10_000 * HOUR + 1234
+
+def test_mock_ohlcv_is_reproducible():
+    first = MockBinanceData().get_mock_ohlcv('BTCUSDT', 500, now=NOW)
+    second = MockBinanceData().get_mock_ohlcv('BTCUSDT', 500, now=NOW)
+    assert first == second
+    assert len(first) == 500
+
+    timestamps = [row[0] for row in first]
+    assert timestamps == sorted(timestamps)
+    assert all(ts % HOUR == 0 for ts in timestamps)
+    assert timestamps[-1] == DEFAULT_ANCHOR_TS + 10_000 * HOUR
+
+    for _, open_, high, low, close, volume in first:
+        assert high >= max(open_, close) and low <= min(open_, close) and volume > 0
+
+def test_mock_ohlcv_since_matches_full_history():
+    data = MockBinanceData()
+    full = data.get_mock_ohlcv('ETHUSDT', 5000, now=NOW)
+    tail = data.get_mock_ohlcv('ETHUSDT', 10, since=full[-3][0], now=NOW)
+    assert tail == full[-3:]
+
+def test_concurrent_requests_agree_with_sequential():
+    late = DEFAULT_ANCHOR_TS + 40_000 * HOUR  # ten chunks into the series
+    expected = MockBinanceData().get_mock_ohlcv('BTCUSDT', 100, now=late)
+
+    data = MockBinanceData()
+    barrier = threading.Barrier(8)
+    results = []
+    def fetch():
+        barrier.wait()
+        results.append(data.get_mock_ohlcv('BTCUSDT', 100, now=late))
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(rows == expected for rows in results)
+    assert len(data._chunk_offsets[('BTCUSDT', '1h')]) == 40_000 // MockBinanceData.CHUNK_BARS + 1
+
+def test_latest_chunk_is_reused():
+    data = MockBinanceData()
+    first = data.get_mock_price('BTCUSDT')
+    built = []
+    chunk_returns = data._chunk_returns
+    data._chunk_returns = lambda *args: built.append(args) or chunk_returns(*args)
+    assert data.get_mock_price('BTCUSDT') == first
+    assert built == []
+
+def test_generate_universe_shape():
+    universe = SyntheticMarket(model='regime').generate_universe(50, 2000)
+    assert universe['close'].shape == (50, 2000)
+    assert universe['timestamp'].shape == (2000,)
+    assert np.all(universe['high'] >= universe['low'])
+
+if __name__ == "__main__":
+    test_mock_ohlcv_is_reproducible()
+    test_mock_ohlcv_since_matches_full_history()
+    test_concurrent_requests_agree_with_sequential()
+    test_latest_chunk_is_reused()
+    test_generate_universe_shape()
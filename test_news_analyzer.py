@@ -0,0 +1,87 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from analysis.http_session import get_session
+from analysis.news_analyzer import NewsAnalyzer
+from config import Config
+from main import TradingBot
+
+logging.basicConfig(level=logging.INFO)
+
+class FlakyNewsAnalyzer(NewsAnalyzer):
+    """Sentiment lookups without network access; ETHUSDT always fails"""
+
+    def get_market_sentiment(self, symbol):
+        if symbol == 'ETHUSDT':
+            raise ConnectionError("news service unreachable")
+        return {'sentiment_score': 0.5, 'sentiment': 'BULLISH', 'confidence': 0.5, 'news_count': 1}
+
+def test_one_session_per_thread():
+    assert get_session() is get_session()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        barrier = threading.Barrier(2)
+        def worker_session(_):
+            barrier.wait()
+            return get_session()
+        sessions = list(executor.map(worker_session, range(2)))
+    assert len({id(session) for session in sessions + [get_session()]}) == 3
+
+    analyzer = NewsAnalyzer()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(lambda: analyzer.session).result() is not analyzer.session
+    injected = object()
+    assert NewsAnalyzer(session=injected).session is injected
+
+def test_workers_and_sessions_outlive_each_call():
+    class RecordingAnalyzer(FlakyNewsAnalyzer):
+        def get_market_sentiment(self, symbol):
+            self.sessions.add(id(self.session))
+            return {'sentiment_score': 0.0, 'sentiment': 'NEUTRAL', 'confidence': 0.0, 'news_count': 0}
+
+    analyzer = RecordingAnalyzer()
+    analyzer.sessions = set()
+    symbols = [f"SYM{i}USDT" for i in range(50)]
+    analyzer.get_market_sentiments(symbols)
+    executor, sessions = analyzer.executor, set(analyzer.sessions)
+    analyzer.get_market_sentiments(symbols)
+
+    # The second cycle runs on the same workers, so no new sessions (or handshakes) appear
+    assert analyzer.executor is executor and analyzer.sessions == sessions
+    assert len(sessions) <= Config.NEWS_FETCH_WORKERS
+    analyzer.close()
+    assert analyzer._executor is None
+
+def test_failed_lookups_are_omitted():
+    sentiments = FlakyNewsAnalyzer().get_market_sentiments(['BTCUSDT', 'ETHUSDT', 'BNBUSDT'])
+    assert sorted(sentiments) == ['BNBUSDT', 'BTCUSDT']
+    assert sentiments['BTCUSDT']['sentiment'] == 'BULLISH'
+
+def test_initialize_deactivates_pairs_without_news():
+    class Stub:
+        def __init__(self, **methods):
+            self.__dict__.update(methods)
+
+    symbols = ['BTCUSDT', 'ETHUSDT']
+    bot = TradingBot.__new__(TradingBot)  # without the heavy analysis components
+    bot.active_pairs = {symbol: True for symbol in symbols}
+    bot.binance_client = Stub(get_24h_volume=lambda symbol: Config.MIN_VOLUME_24H * 2, stream=None,
+                              start_stream=lambda *args: None)
+    bot.data_collector = Stub(fetch_multiple_symbols=lambda pairs, interval: {symbol: None for symbol in pairs},
+                              on_stream_event=None)
+    bot.news_analyzer = FlakyNewsAnalyzer()
+    bot.ml_analyzer = Stub(train_model=lambda df: None)
+    bot.rank_trading_pairs = lambda: []
+
+    original_pairs = Config.TRADING_PAIRS
+    Config.TRADING_PAIRS = symbols
+    try:
+        bot.initialize()
+    finally:
+        Config.TRADING_PAIRS = original_pairs
+    assert bot.active_pairs == {'BTCUSDT': True, 'ETHUSDT': False}
+
+if __name__ == "__main__":
+    test_one_session_per_thread()
+    test_workers_and_sessions_outlive_each_call()
+    test_failed_lookups_are_omitted()
+    test_initialize_deactivates_pairs_without_news()
@@ -0,0 +1,49 @@
+import logging
+import threading
+import time
+from connection.request_scheduler import RequestScheduler, kline_weight
+
+logging.basicConfig(level=logging.INFO)
+
+def test_order_lane_bypasses_exhausted_history_budget():
+    scheduler = RequestScheduler(max_weight_per_minute=10, order_reserve=0.2, window=0.5)
+
+    # History may only use 8 of the 10 weight units
+    scheduler.submit('history', 8, lambda: None)
+
+    history_done = threading.Event()
+    worker = threading.Thread(
+        target=lambda: scheduler.submit('history', 1, history_done.set)
+    )
+    worker.start()
+    time.sleep(0.05)
+    assert not history_done.is_set()
+    assert scheduler.get_metrics()['lanes']['history']['queue_depth'] == 1
+
+    started = time.monotonic()
+    assert scheduler.submit('order', 1, lambda: 'filled') == 'filled'
+    assert time.monotonic() - started < 0.1
+
+    worker.join(2)
+    assert history_done.is_set()
+
+    metrics = scheduler.get_metrics()
+    assert metrics['lanes']['history']['max_wait'] >= 0.3
+    assert metrics['lanes']['order']['submitted'] == 1
+    logging.info(f"Scheduler metrics: {metrics}")
+
+def test_server_weight_is_reconciled():
+    scheduler = RequestScheduler(max_weight_per_minute=100)
+    scheduler.submit('price', 2, lambda: None)
+    scheduler.sync_used_weight(50)
+    assert scheduler.get_metrics()['used_weight'] == 50
+
+def test_kline_weight():
+    assert kline_weight(10) == 1
+    assert kline_weight(500) == 5
+    assert kline_weight(1500) == 10
+
+if __name__ == "__main__":
+    test_order_lane_bypasses_exhausted_history_budget()
+    test_server_weight_is_reconciled()
+    test_kline_weight()
@@ -0,0 +1,51 @@
+import logging
+import numpy as np
+import pandas as pd
+from connection.mock_data import MockBinanceData
+from data.resampler import TimeframeResampler, bucket_start
+
+logging.basicConfig(level=logging.INFO)
+
+HOUR = 3_600_000
+
+def _pandas_resample(rows, rule):
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df.index = pd.to_datetime(df.pop('timestamp'), unit='ms')
+    bars = df.resample(rule, label='left', closed='left').agg({
+        'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+    }).dropna()
+    return [[int(ts.value // 1_000_000)] + values for ts, values in zip(bars.index, bars.values.tolist())]
+
+def test_resampled_bars_match_pandas():
+    rows = MockBinanceData().get_mock_ohlcv('BTCUSDT', 1000, timeframe='1h')
+    for timeframe, rule in (('4h', '4h'), ('1d', '1D'), ('1w', 'W-MON')):
+        resampler = TimeframeResampler('1h', timeframe)
+        resampler.update_many(rows)
+        expected = _pandas_resample(rows, rule)
+        # The first pandas bucket may be partial; the resampler starts on a full one
+        result = resampler.tail(1000)
+        assert result[0][0] == bucket_start(result[0][0], timeframe)
+        expected = [bar for bar in expected if bar[0] >= result[0][0]]
+        np.testing.assert_allclose(np.array(result), np.array(expected), rtol=1e-12, err_msg=timeframe)
+
+def test_forming_base_bar_updates_higher_bar():
+    rows = MockBinanceData().get_mock_ohlcv('BTCUSDT', 48, timeframe='1h')
+    resampler = TimeframeResampler('1h', '4h')
+    resampler.update_many(rows[:-1])
+
+    last = rows[-1]
+    resampler.update([last[0], last[1], last[1] * 1.5, last[1], last[1], 1.0])
+    resampler.update(last)  # Revision of the same base bar replaces the spike
+    fresh = TimeframeResampler('1h', '4h')
+    fresh.update_many(rows)
+    assert resampler.tail(20) == fresh.tail(20)
+
+def test_weekly_bars_start_on_monday():
+    monday = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+    assert bucket_start(monday + 50 * HOUR, '1w') == monday
+    assert bucket_start(monday - HOUR, '1w') == monday - 7 * 24 * HOUR
+
+if __name__ == "__main__":
+    test_resampled_bars_match_pandas()
+    test_forming_base_bar_updates_higher_bar()
+    test_weekly_bars_start_on_monday()
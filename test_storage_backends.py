@@ -0,0 +1,134 @@
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from database.backends import MemoryBackend, SQLiteBackend
+from database.models import DatabaseManager
+
+logging.basicConfig(level=logging.INFO)
+
+START = datetime(2024, 1, 1)
+
+def _candle(symbol, timeframe, hour, close=100.0):
+    return {'symbol': symbol, 'timeframe': timeframe, 'timestamp': START + timedelta(hours=hour), 'close': close}
+
+def test_out_of_order_upserts_stay_sorted():
+    backend = MemoryBackend()
+    backend.upsert_candles([_candle('BTCUSDT', '1h', h) for h in (5, 1, 3, 2, 4)])
+    backend.upsert_candles([_candle('BTCUSDT', '1h', 3, close=101.0)])
+
+    candles = backend.recent_candles('BTCUSDT', limit=10, timeframe='1h')
+    assert [c['timestamp'].hour for c in candles] == [5, 4, 3, 2, 1]
+    assert candles[2]['close'] == 101.0
+    assert backend.last_candle_timestamp('BTCUSDT', '1h') == START + timedelta(hours=5)
+    assert backend.recent_candles('ETHUSDT', limit=10) == []
+
+def test_recent_candles_merge_timeframes():
+    backend = MemoryBackend()
+    backend.upsert_candles([_candle('BTCUSDT', '1h', h) for h in range(10)])
+    backend.upsert_candles([_candle('BTCUSDT', '4h', h) for h in range(0, 10, 4)])
+    backend.upsert_candles([_candle('ETHUSDT', '1h', h) for h in range(20)])
+
+    candles = backend.recent_candles('BTCUSDT', limit=4)
+    assert [(c['timeframe'], c['timestamp'].hour) for c in candles] == [('1h', 9), ('1h', 8), ('4h', 8), ('1h', 7)]
+
+def test_retention_evicts_oldest():
+    backend = MemoryBackend(candle_retention=100, document_retention=50)
+    backend.upsert_candles([_candle('BTCUSDT', '1h', h) for h in range(1000)])
+    candles = backend.recent_candles('BTCUSDT', limit=1000, timeframe='1h')
+    assert len(candles) == 100 and candles[-1]['timestamp'] == START + timedelta(hours=900)
+
+    backend.insert('trades', [{'timestamp': START + timedelta(minutes=m), 'side': 'BUY'} for m in range(200)])
+    trades = backend.find_range('trades', START, START + timedelta(days=1))
+    assert len(trades) == 50 and trades[0]['timestamp'] == START + timedelta(minutes=199)
+
+def test_trades_report_range_query():
+    db = DatabaseManager(backend=MemoryBackend())
+    for _ in range(3):
+        db.save_trade({'symbol': 'BTCUSDT', 'side': 'BUY', 'price': 100.0, 'quantity': 1.0})
+    report = db.get_trades_report(datetime.now() - timedelta(minutes=1), datetime.now())
+    assert len(report) == 3 and report[0]['timestamp'] >= report[-1]['timestamp']
+    assert db.get_trades_report(START, START + timedelta(days=1)) == []
+
+def test_sqlite_backend_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trading.db')
+        db = DatabaseManager(backend=SQLiteBackend(path))
+        records = [{'timestamp': pd.Timestamp(START) + pd.Timedelta(hours=i), 'close': np.float64(100 + i),
+                    'volume': np.int64(i), 'RSI': float('nan')} for i in range(300)]
+        assert db.save_candles('BTCUSDT', '1h', records) == 300
+        db.save_candles('BTCUSDT', '1h', [{**records[-1], 'close': np.float64(1.0)}])
+        db.save_latest_indicators('BTCUSDT', '1h', {'trend': {'direction': 'UPTREND'}})
+        db.save_trade({'symbol': 'BTCUSDT', 'side': 'BUY', 'price': 100.0, 'quantity': 1.0})
+        assert db.flush(timeout=10)
+        db.close()
+
+        # A new process sees everything through the indexes
+        db = DatabaseManager(backend=SQLiteBackend(path))
+        candles = db.get_recent_market_data('BTCUSDT', limit=2, timeframe='1h')
+        assert [c['close'] for c in candles] == [1.0, 398.0]
+        assert candles[0]['timestamp'] == START + timedelta(hours=299) and candles[0]['volume'] == 299
+        assert db.last_candle_timestamp('BTCUSDT', '1h') == START + timedelta(hours=299)
+        assert db.get_market_trend('BTCUSDT')['direction'] == 'UPTREND'
+        report = db.get_trades_report(datetime.now() - timedelta(minutes=1), datetime.now())
+        assert len(report) == 1 and report[0]['side'] == 'BUY'
+        db.close()
+
+def test_failed_candle_batch_is_resent():
+    class FlakySQLiteBackend(SQLiteBackend):
+        failures = 1
+
+        def upsert_candles(self, candles):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk I/O error")
+            super().upsert_candles(candles)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(backend=FlakySQLiteBackend(os.path.join(directory, 'trading.db')))
+        records = [{'timestamp': START + timedelta(hours=i), 'close': 100.0 + i} for i in range(10)]
+        assert db.save_candles('BTCUSDT', '1h', records) == 10
+        assert db.flush(timeout=10)
+        # The write failed, so the watermark did not move and the next cycle sends the batch again
+        assert db.last_candle_timestamp('BTCUSDT', '1h') is None
+        assert db.write_stats()['errors'] == 1
+
+        assert db.save_candles('BTCUSDT', '1h', records) == 10
+        assert db.flush(timeout=10)
+        assert db.last_candle_timestamp('BTCUSDT', '1h') == START + timedelta(hours=9)
+        assert len(db.get_recent_market_data('BTCUSDT', limit=20, timeframe='1h')) == 10
+        assert db.save_candles('BTCUSDT', '1h', records) == 1
+        db.close()
+
+def test_finished_threads_do_not_keep_connections():
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteBackend(os.path.join(directory, 'trading.db'))
+        db = DatabaseManager(backend=backend)
+        opened = []
+        for _ in range(20):
+            # A new short-lived thread per cycle, like the collector's writer
+            thread = threading.Thread(target=lambda: opened.append(backend._connection())
+                                      or db.last_candle_timestamp('BTCUSDT', '1h'))
+            thread.start()
+            thread.join()
+        assert len(backend._connections) <= 2
+        for connection in opened[:-1]:
+            try:
+                connection.execute("SELECT 1")
+                assert False, "connection of a finished thread should be closed"
+            except sqlite3.ProgrammingError:
+                pass
+        db.close()
+
+if __name__ == "__main__":
+    test_out_of_order_upserts_stay_sorted()
+    test_recent_candles_merge_timeframes()
+    test_retention_evicts_oldest()
+    test_trades_report_range_query()
+    test_sqlite_backend_round_trip()
+    test_failed_candle_batch_is_resent()
+    test_finished_threads_do_not_keep_connections()
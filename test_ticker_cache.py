@@ -0,0 +1,47 @@
+import logging
+import time
+from connection.ticker_cache import TickerCache
+
+logging.basicConfig(level=logging.INFO)
+
+TICKERS = {'BTC/USDT': {'last': 100.0, 'info': {'symbol': 'BTCUSDT'}}}
+
+def test_first_read_fetches_and_ttl_expires():
+    calls = []
+    cache = TickerCache(lambda: calls.append(1) or TICKERS, ttl=0.1)
+    # Stale from the start, however small time.monotonic() is
+    assert cache.is_stale()
+    assert cache.get('BTCUSDT')['last'] == 100.0 and cache.get('BTC/USDT')['last'] == 100.0
+    assert len(calls) == 1
+
+    time.sleep(0.15)
+    cache.get('BTCUSDT')
+    assert len(calls) == 2 and cache.refresh_count == 2
+    cache.invalidate()
+    assert cache.is_stale()
+
+def test_failed_refresh_backs_off_and_keeps_snapshot():
+    responses = [TICKERS, RuntimeError("418 I'm a teapot"), TICKERS]
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        response = responses[len(calls) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    cache = TickerCache(fetch, ttl=0.1)
+    cache.get('BTCUSDT')
+    time.sleep(0.15)
+    # The failed refresh serves the previous snapshot and waits a full TTL before retrying
+    assert cache.get('BTCUSDT')['last'] == 100.0
+    assert cache.get('BTCUSDT')['last'] == 100.0
+    assert len(calls) == 2
+    time.sleep(0.15)
+    cache.get('BTCUSDT')
+    assert len(calls) == 3 and cache.refresh_count == 2
+
+if __name__ == "__main__":
+    test_first_read_fetches_and_ttl_expires()
+    test_failed_refresh_backs_off_and_keeps_snapshot()
@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+from database.write_behind import WriteBehindQueue
+
+logging.basicConfig(level=logging.INFO)
+
+def test_writes_are_batched_per_kind():
+    calls = []
+    queue = WriteBehindQueue({'a': calls.append, 'b': calls.append},
+                             batch_size=100, flush_interval=0.05)
+    for i in range(10):
+        queue.put('a' if i % 2 else 'b', i)
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    assert sorted(sum(calls, [])) == list(range(10))
+    assert len(calls) <= 4  # grouped by kind instead of one call per write
+    stats = queue.stats()
+    assert stats['enqueued'] == stats['written'] == 10 and stats['depth'] == 0
+
+def test_size_threshold_flushes_before_interval():
+    calls = []
+    queue = WriteBehindQueue({'a': calls.append}, batch_size=5, flush_interval=60)
+    for i in range(5):
+        queue.put('a', i)
+    assert queue.flush(timeout=5)
+    queue.close()
+    assert calls == [[0, 1, 2, 3, 4]]
+
+def test_full_queue_blocks_then_writes_inline():
+    release = threading.Event()
+    written = []
+
+    def slow_handler(items):
+        release.wait()
+        written.extend(items)
+
+    queue = WriteBehindQueue({'a': slow_handler}, max_size=1, batch_size=1,
+                             flush_interval=0.01, put_timeout=0.05)
+    queue.put('a', 0)          # taken by the flusher, which then blocks
+    time.sleep(0.1)
+    queue.put('a', 1)          # fills the queue
+    started = time.perf_counter()
+    threading.Timer(0.2, release.set).start()
+    queue.put('a', 2)          # waits put_timeout, then writes on the caller thread
+    assert time.perf_counter() - started >= 0.05
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    stats = queue.stats()
+    assert sorted(written) == [0, 1, 2]
+    assert stats['blocked_puts'] == 1 and stats['inline_writes'] == 1
+
+def test_handler_errors_are_counted():
+    def failing(items):
+        raise RuntimeError("boom")
+    queue = WriteBehindQueue({'a': failing}, flush_interval=0.01)
+    queue.put('a', 1)
+    assert queue.flush(timeout=5)
+    queue.close()
+    assert queue.stats()['errors'] == 1
+
+if __name__ == "__main__":
+    test_writes_are_batched_per_kind()
+    test_size_threshold_flushes_before_interval()
+    test_full_queue_blocks_then_writes_inline()
+    test_handler_errors_are_counted()